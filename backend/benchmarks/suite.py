@@ -0,0 +1,601 @@
+#!/usr/bin/env python3
+"""The engine's hot paths, timed the same way every run, for comparing
+commits.
+
+Run from backend/:
+    python -m benchmarks.suite --out results.json
+    python -m benchmarks.suite --compare results.json --threshold 0.25
+
+Every benchmark has a name like "pathing/dijkstras_path/64x48/0.3" and is
+set up fresh (with fixed seeds) for each of a few runs, and only the timed
+part of a run counts.  Runs are compared by their fastest: the slower ones
+are the same work plus whatever else the machine was doing.
+
+  pathing      solving a board from scratch, sweeping can_build over every
+               tile, and building then removing a tower (can_build and the
+               path repair), across board sizes and wall densities; and
+               every solver's full solve of scattered walls and of a
+               serpentine maze, the flow field's worst case
+  update       GameplayState.update with towers x creeps that can't die,
+               with creep objects and (with NumPy) the creep store
+  creeps       GameplayState.update moving a horde over a board without
+               towers, with creep objects and the creep store
+  effects      GameplayState.update on a board a third covered in fire and
+               stun effects, and the effects on their own
+  modifiers    ModifierEngine.update with every creep slowed and a tenth
+               of them poisoned
+  targeting    every tower's CreepIndex.first_in_range on a 64x48 board
+  towers       GameplayState.update_towers, tower by tower and (with
+               NumPy) with TowerBatch, with creep objects and the store
+  projectiles  moving shots in flight (NumPy)
+  pieces       the attribute reads of a targeting loop over towers x
+               creeps, and the memory a creep and every kind of tower
+               take (in bytes, not seconds)
+  json         encoding a game_update message the way Network does
+  simulation   a headless two player game (engine/simulation.py)
+
+--out writes the results as JSON, along with the commit and the Python and
+NumPy versions.  --compare reads an earlier --out file and fails (exit
+status 1) when a benchmark got slower than its threshold allows: the
+--threshold for all of them, or a --threshold-for PATTERN=FRACTION for the
+names matching a shell-style pattern."""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from fnmatch import fnmatch
+from engine.build_index import articulation_points, FLIP
+from engine.grid_world import GridWorld, PATH_SOLVERS
+from engine.spatial_index import CreepIndex
+from engine.util import dump_obj_dict
+from game_pieces.creep import Creep
+from game_pieces.levels import Levels
+from game_pieces.tower_factory import Tower_factory, TOWER_CLASSES
+from game_states.gameplay_state import GameplayState, CreepStore, \
+    TowerBatch, Projectiles
+from modifiers.dot_modifier import Dot_modifier
+from modifiers.frozen_modifier import Frozen_modifier
+from modifiers.modifier_engine import ModifierEngine
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BOARDS = [(16, 12), (64, 48), (128, 96)]
+BIG_BOARD = (256, 256)  # only for what doesn't go over the whole board
+DENSITIES = [0.1, 0.3]
+UPDATE_SIZES = [(10, 100), (50, 500), (200, 2000)]
+HORDES = [100, 1000]
+CROWDS = [100, 1000, 10000]
+TARGETING_SIZES = [(50, 500), (200, 2000), (200, 8000)]
+TOWER_SIZES = [(50, 500), (200, 2000), (400, 4000)]
+TOWER_TYPES = ['laser_tower', 'ice_tower', 'gattling_tower', 'sniper_tower',
+               'fire_tower', 'poison_tower', 'stun_tower']
+TICK = 1.0 / 30.0
+
+
+class Benchmark:
+    """setup() makes a fresh context for a run, run(context) is what's
+    timed, number times in a row.  Reported per call of run."""
+
+    def __init__(self, name, setup, run, number=1):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.number = number
+
+    def measure(self, repeat):
+        times = []
+        for _ in range(repeat):
+            context = self.setup()
+            run = self.run
+            start = time.perf_counter()
+            for _ in range(self.number):
+                run(context)
+            times.append((time.perf_counter() - start) / self.number)
+        return {
+            'median': statistics.median(times),
+            'min': min(times),
+            'max': max(times),
+            'runs': repeat,
+            'number': self.number,
+            'unit': 'seconds',
+        }
+
+
+class Footprint:
+    """Memory instead of time: the bytes tracemalloc sees allocated for
+    each of number pieces made with make(i).  The same every run, so it's
+    only measured once."""
+
+    def __init__(self, name, make, number=10000):
+        self.name = name
+        self.make = make
+        self.number = number
+
+    def measure(self, repeat):
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        pieces = [self.make(i) for i in range(self.number)]
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        used = sum(stat.size_diff
+                   for stat in after.compare_to(before, 'filename'))
+        each = used / len(pieces)
+        return {
+            'median': each,
+            'min': each,
+            'max': each,
+            'runs': 1,
+            'number': self.number,
+            'unit': 'bytes',
+        }
+
+
+class Bank:
+    """Stands in for the game state where all a piece does with it is pay
+    out gold."""
+    gold = 0
+
+
+# pathing
+
+def walled_board(width, height, density, seed=0):
+    """A board with density of its tiles walled off at random, solved once.
+    The top row and the right column stay open so the spawn can always
+    reach the goal, and open tiles the walls cut off are filled in, so
+    every open tile is on the way to the goal like on a real board."""
+    rng = random.Random(seed)
+    world = GridWorld(width, height, (0, 0), (width - 1, height - 1),
+                      path_cache=None)
+    blocked = world.blocked
+    for tile in rng.sample(range(width * height), int(width * height * density)):
+        x, y = world.tile_table.coords[tile]
+        if y != 0 and x != width - 1:
+            blocked[tile] = 1
+    free = blocked.translate(FLIP)
+    reached, _ = articulation_points(free, world.tile_table.orthogonal,
+                                     world.goal)
+    for tile in range(width * height):
+        if not reached[tile]:
+            blocked[tile] = 1
+    world.update_pathing()
+    return world
+
+
+def sweep_can_build(world):
+    for y in range(world.height):
+        for x in range(world.width):
+            world.can_build(x, y)
+
+
+def build_and_remove(context):
+    world, locs = context
+    for x, y in locs:
+        world.build_tower(x, y)
+        world.remove_tower(x, y)
+
+
+def with_build_spots(world, count=10, seed=0):
+    """The board and count tiles a tower could go on."""
+    rng = random.Random(seed)
+    legal = [t for t in range(world.tile_table.size) if world.build_mask[t]]
+    spots = rng.sample(legal, min(count, len(legal)))
+    return world, [world.tile_table.coords[t] for t in spots]
+
+
+def scatter(world, rng):
+    """A fifth of the tiles walled off at random."""
+    size = world.tile_table.size
+    for _ in range(size // 5):
+        world.blocked[rng.randrange(size)] = 1
+
+
+def serpentine(world, rng):
+    """Walls every few columns with the gap alternating top and bottom,
+    so the path turns at every one of them."""
+    for x in range(2, world.width - 1, 3):
+        gap = world.height - 1 if (x // 3) % 2 else 0
+        for y in range(world.height):
+            if y != gap:
+                world.blocked[y * world.width + x] = 1
+
+
+def laid_out(width, height, layout, solver):
+    world = GridWorld(width, height, (0, 0), (width - 1, height - 1),
+                      solver=solver, path_cache=None)
+    layout(world, random.Random(0))
+    world.blocked[world.spawn] = world.blocked[world.goal] = 0
+    return world
+
+
+def pathing_benchmarks():
+    for width, height in BOARDS:
+        for density in DENSITIES:
+            board = '{}x{}/{}'.format(width, height, density)
+
+            def setup(width=width, height=height, density=density):
+                return walled_board(width, height, density)
+            yield Benchmark('pathing/dijkstras_path/' + board, setup,
+                            lambda world: world.dijkstras_path(world.blocked))
+            yield Benchmark('pathing/can_build/' + board, setup,
+                            sweep_can_build)
+            yield Benchmark('pathing/build_remove/' + board,
+                            lambda setup=setup: with_build_spots(setup()),
+                            build_and_remove)
+    width, height = BIG_BOARD
+    for density in DENSITIES:
+        yield Benchmark(
+            'pathing/build_remove/{}x{}/{}'.format(width, height, density),
+            lambda d=density: with_build_spots(
+                walled_board(width, height, d)),
+            build_and_remove)
+
+    for width, height in BOARDS + [BIG_BOARD]:
+        for solver in sorted(PATH_SOLVERS):
+            for layout in (scatter, serpentine):
+                yield Benchmark(
+                    'pathing/solve/{}/{}x{}/{}'.format(
+                        solver, width, height, layout.__name__),
+                    lambda w=width, h=height, l=layout, s=solver: laid_out(
+                        w, h, l, s),
+                    lambda world: world.path_solver.reset())
+
+
+# gameplay
+
+def board(towers, creeps, width=64, height=48, creep_store=False, seed=0):
+    """A GameplayState with towers built at random and creeps that can't
+    die scattered over the board."""
+    rng = random.Random(seed)
+    state = GameplayState(Levels(), width, height, 10 ** 9, 10 ** 9, 1,
+                          creep_store=creep_store)
+    built = 0
+    while built < towers:
+        loc = (rng.randrange(width), rng.randrange(height))
+        if state.build_tower(loc, rng.choice(TOWER_TYPES)):
+            built += 1
+    for i in range(creeps):
+        creep = Creep.factory('Strong', i)
+        creep.health = 10 ** 12  # nobody dies mid-benchmark
+        creep.loc = (rng.randrange(width), rng.randrange(height))
+        while (state.world.is_blocked(*creep.loc) or
+               creep.loc == state.world.endpoint):
+            creep.loc = (rng.randrange(width), rng.randrange(height))
+        if creep_store:
+            creep = state.creep_store.add(creep)
+        state.all_creeps.append(creep)
+        state.creep_index.add(creep)
+    state.update(TICK, [])  # first update sends the path and build mask
+    return state
+
+
+def effects_board(creeps, seed=0):
+    rng = random.Random(seed)
+    state = board(0, creeps, 16, 12, seed=seed)
+    world = state.world
+    for _ in range(16 * 12 // 3):
+        loc = (rng.randrange(16), rng.randrange(12))
+        world.add_effect(loc, 'fire')
+        if rng.random() < 0.3:
+            world.add_effect(loc, 'stun')
+    return state
+
+
+def update(state):
+    state.update(TICK, [])
+
+
+def crowd(amount, creep_store):
+    """A 16x12 board without towers and amount creeps on it from the
+    start, spread along the way to the goal."""
+    state = GameplayState(Levels(), 16, 12, 10 ** 9, 0, 1,
+                          creep_store=creep_store)
+    for i in range(amount):
+        creep = Creep.factory('Default', i)
+        creep.loc = state.world.tile_table.coords[i % 150]
+        if creep_store:
+            creep = state.creep_store.add(creep)
+        state.all_creeps.append(creep)
+        state.creep_index.add(creep)
+    return state
+
+
+def apply_effects(state):
+    state.world.apply_effects(state.all_creeps, state)
+
+
+def slowed(amount, seed=0):
+    """A ModifierEngine with amount creeps slowed for longer than any
+    benchmark runs, and a tenth of them poisoned too."""
+    rng = random.Random(seed)
+    engine = ModifierEngine()
+    for i in range(amount):
+        creep = Creep.factory('Strong', i)
+        creep.health = 10 ** 9  # nobody dies mid-benchmark
+        engine.add(creep, Frozen_modifier(10 ** 6))
+        if rng.random() < 0.1:
+            engine.add(creep, Dot_modifier(10 ** 6, 10 ** 6))
+    return engine
+
+
+def scattered_towers(towers, creeps, seed=0):
+    """Towers (not built, just made) and an index of creeps at random on
+    a 64x48 board."""
+    rng = random.Random(seed)
+    placed = [Tower_factory.factory(rng.choice(TOWER_TYPES),
+                                    (rng.randrange(64), rng.randrange(48)), i)
+              for i in range(towers)]
+    index = CreepIndex(64, 48)
+    for i in range(creeps):
+        creep = Creep.factory('Default', i)
+        creep.loc = (rng.randrange(64), rng.randrange(48))
+        index.add(creep)
+    return placed, index
+
+
+def find_targets(context):
+    towers, index = context
+    for tower in towers:
+        x, y = tower.loc
+        index.first_in_range(x, y, tower.fire_range)
+
+
+def armed(towers, creeps, tower_batch, creep_store):
+    state = board(towers, creeps, creep_store=creep_store)
+    if tower_batch:
+        state.tower_batch = TowerBatch(state.world.width, state.world.height)
+    return state
+
+
+def update_towers(state):
+    state.counter += TICK
+    state.update_towers()
+
+
+def volley(amount, seed=0):
+    """amount shots, each after its own creep, too far away to land."""
+    rng = random.Random(seed)
+    projectiles = Projectiles()
+    tower = Tower_factory.factory('laser_tower', (0, 0), 0)
+    for i in range(amount):
+        creep = Creep.factory('Default', i)
+        creep.loc = (rng.randrange(1000, 2000), rng.randrange(1000, 2000))
+        projectiles.launch(tower, (0, 0), creep, 0.5)
+    return projectiles
+
+
+def pieces(towers, creeps):
+    made = [Tower_factory.factory('ice_tower', (i % 16, i % 12), i)
+            for i in range(towers)]
+    return made, [Creep.factory('Default', i) for i in range(creeps)]
+
+
+def read_loop(context):
+    """The reads of a tower's targeting loop: every tower looks at every
+    creep's live flag and location, and its own range and cooldown."""
+    towers, creeps = context
+    seen = 0
+    for tower in towers:
+        x2, y2 = tower.loc
+        reach2 = tower.fire_range * tower.fire_range
+        ready = tower.time_since_last_fire >= tower.cooldown
+        for creep in creeps:
+            if creep.live:
+                x1, y1 = creep.loc
+                if ready and (x1 - x2) ** 2 + (y1 - y2) ** 2 <= reach2:
+                    seen += 1
+    return seen
+
+
+def encode(context):
+    json.dumps(context, default=dump_obj_dict)
+
+
+def gameplay_benchmarks():
+    stores = [False] + ([True] if CreepStore is not None else [])
+    for creep_store in stores:
+        group = 'update_store' if creep_store else 'update'
+        for towers, creeps in UPDATE_SIZES:
+            yield Benchmark(
+                '{}/{}x{}'.format(group, towers, creeps),
+                lambda t=towers, c=creeps, s=creep_store: board(
+                    t, c, creep_store=s),
+                update, number=30)
+    for creep_store in stores:
+        group = 'creeps/store' if creep_store else 'creeps/objects'
+        for creeps in CROWDS:
+            yield Benchmark('{}/{}'.format(group, creeps),
+                            lambda c=creeps, s=creep_store: crowd(c, s),
+                            update, number=10)
+    for creeps in HORDES:
+        yield Benchmark('effects/{}'.format(creeps),
+                        lambda c=creeps: effects_board(c), update, number=30)
+    for creeps in HORDES + [5000]:
+        yield Benchmark('effects/apply/{}'.format(creeps),
+                        lambda c=creeps: effects_board(c), apply_effects,
+                        number=20)
+    for creeps in CROWDS:
+        yield Benchmark('modifiers/{}'.format(creeps),
+                        lambda c=creeps: slowed(c),
+                        lambda engine: engine.update(Bank()), number=200)
+    for towers, creeps in TARGETING_SIZES:
+        yield Benchmark('targeting/{}x{}'.format(towers, creeps),
+                        lambda t=towers, c=creeps: scattered_towers(t, c),
+                        find_targets, number=10)
+    batches = [False] + ([True] if TowerBatch is not None else [])
+    for creep_store in stores:
+        for tower_batch in batches:
+            group = 'towers/{}{}'.format(
+                'batched' if tower_batch else 'by_tower',
+                '_store' if creep_store else '')
+            for towers, creeps in TOWER_SIZES:
+                yield Benchmark(
+                    '{}/{}x{}'.format(group, towers, creeps),
+                    lambda t=towers, c=creeps, b=tower_batch, s=creep_store:
+                        armed(t, c, b, s),
+                    update_towers, number=30)
+    if Projectiles is not None:
+        for shots in CROWDS:
+            yield Benchmark('projectiles/{}'.format(shots),
+                            lambda n=shots: volley(n),
+                            lambda projectiles: projectiles.update(Bank()),
+                            number=20)
+    yield Benchmark('pieces/read_loop/50x2000', lambda: pieces(50, 2000),
+                    read_loop, number=5)
+    yield Footprint('pieces/bytes/creep',
+                    lambda i: Creep.factory('Default', i))
+    for tower_type in sorted(TOWER_CLASSES):
+        yield Footprint('pieces/bytes/' + tower_type,
+                        lambda i, t=tower_type: Tower_factory.factory(
+                            t, (i % 16, i % 12), i))
+    for towers, creeps in UPDATE_SIZES:
+        yield Benchmark('json/game_update/{}x{}'.format(towers, creeps),
+                        lambda t=towers, c=creeps: board(t, c).update(TICK, []),
+                        encode, number=20)
+
+
+def simulation_benchmarks():
+    from engine.simulation import Simulation, random_script
+
+    def setup():
+        return Simulation(players=[1, 2],
+                          script=random_script([1, 2], 900, seed=1))
+    yield Benchmark('simulation/2p/900', setup, lambda sim: sim.run(900))
+
+
+def benchmarks():
+    yield from pathing_benchmarks()
+    yield from gameplay_benchmarks()
+    yield from simulation_benchmarks()
+
+
+# results
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_all(patterns, repeat):
+    results = {}
+    for bench in benchmarks():
+        if patterns and not any(fnmatch(bench.name, p) for p in patterns):
+            continue
+        # the game prints as it goes; keep stdout for the results
+        with redirect_stdout(sys.stderr):
+            results[bench.name] = bench.measure(repeat)
+        print('{:<42} {}'.format(bench.name, shown(results[bench.name])),
+              file=sys.stderr)
+    return {
+        'meta': {
+            'commit': commit(),
+            'python': platform.python_version(),
+            'numpy': numpy.__version__ if numpy is not None else None,
+            'machine': platform.machine(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def shown(result, value=None):
+    """A result's fastest (or value, in its unit) for people to read."""
+    value = result['min'] if value is None else value
+    if result.get('unit') == 'bytes':
+        return '{:>12.0f} B '.format(value)
+    return '{:>12.4f} ms'.format(value * 1000)
+
+
+def threshold_for(name, default, overrides):
+    for pattern, threshold in overrides:
+        if fnmatch(name, pattern):
+            return threshold
+    return default
+
+
+def compare(base, new, default, overrides):
+    """(name, base fastest, new fastest, ratio, regressed) for every
+    benchmark in both."""
+    rows = []
+    for name, result in new['results'].items():
+        if name not in base['results']:
+            continue
+        old = base['results'][name]['min']
+        ratio = result['min'] / old if old else float('inf')
+        limit = 1 + threshold_for(name, default, overrides)
+        rows.append((name, old, result['min'], ratio, ratio > limit))
+    return rows
+
+
+def parse_override(text):
+    pattern, _, threshold = text.rpartition('=')
+    if not pattern:
+        raise argparse.ArgumentTypeError(
+            'expected PATTERN=FRACTION, got {!r}'.format(text))
+    return pattern, float(threshold)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Time the engine hot paths.')
+    parser.add_argument('patterns', nargs='*',
+                        help='only the benchmarks matching these '
+                             '(shell-style, e.g. "pathing/*")')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='runs per benchmark (default 5)')
+    parser.add_argument('--out', help='write the results to this file')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='results of an earlier --out to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='how much slower than the baseline counts as '
+                             'a regression, as a fraction (default 0.25, '
+                             'a busy machine is good for 15%% either way)')
+    parser.add_argument('--threshold-for', type=parse_override, default=[],
+                        action='append', metavar='PATTERN=FRACTION',
+                        help='a different threshold for the benchmarks '
+                             'matching PATTERN')
+    parser.add_argument('--list', action='store_true',
+                        help='list the benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for bench in benchmarks():
+            print(bench.name)
+        return 0
+
+    results = run_all(args.patterns, args.repeat)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(results, indent=2, sort_keys=True))
+
+    if not args.compare:
+        return 0
+    with open(args.compare) as f:
+        base = json.load(f)
+    rows = compare(base, results, args.threshold, args.threshold_for)
+    print('{:<42} {:>15} {:>15} {:>8}'.format(
+        'benchmark', 'base', 'now', 'ratio'), file=sys.stderr)
+    for name, old, now, ratio, regressed in rows:
+        result = results['results'][name]
+        print('{:<42} {} {} {:>7.2f}x{}'.format(
+            name, shown(result, old), shown(result, now), ratio,
+            '  REGRESSION' if regressed else ''), file=sys.stderr)
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Which tiles a tower can be built on without blocking the maze.
+
+A build is legal when, after the tile is blocked, every open tile can still
+reach the endpoint.  That is exactly "the tile is not an articulation point
+of the open tiles", so one Tarjan pass over the board answers the question
+for every tile at once.
+
+The corner-cutting rule doesn't have to be modelled here: a diagonal step
+is only allowed when one of the two tiles beside it is open, and that tile
+is orthogonally next to both ends of the step.  So every diagonal step can
+be replaced by two orthogonal ones, and the open tiles are connected with
+diagonals exactly when they are connected without them.
+
+A whole mask is a pass over the whole board, though, so a single tile on a
+board whose open tiles all reach the endpoint is checked with legal_build
+instead, which only looks as far as it has to."""
+from collections import deque
+
+# swaps 0 and 1, turning a blocked bytearray into an open one
+FLIP = bytes.maketrans(b'\x00\x01', b'\x01\x00')
+
+
+def legal_build_mask(blocked, table, spawn, goal):
+    """Returns (mask, stranded): a bytearray with one entry per tile, 1
+    where a tower can be built and 0 where it can't, and how many open
+    tiles already have no way to the endpoint."""
+    size = table.size
+    free = blocked.translate(FLIP)
+    reached, cut = articulation_points(free, table.orthogonal, goal)
+
+    # open tiles the search from the endpoint never reached are already cut
+    # off, and blocking one of them is only legal if it is the only one
+    stranded = [v for v in range(size) if free[v] and not reached[v]]
+
+    mask = bytearray(size)
+    if len(stranded) == 1:
+        mask[stranded[0]] = 1
+    elif not stranded:
+        for v in range(size):
+            if free[v] and not cut[v]:
+                mask[v] = 1
+
+    mask[goal] = 0
+    mask[spawn] = 0
+    return mask, len(stranded)
+
+
+def legal_build(blocked, table, tile):
+    """Whether blocking the open tile leaves every open tile a way to the
+    endpoint, on a board where they all have one.  Leaving out the spawn
+    and the endpoint is up to the caller.
+
+    The open tiles next to tile split into sides, one per run of open tiles
+    going round it.  With only one side, everything that went through tile
+    can go round it instead.  Otherwise the sides are searched outward in
+    step until they have all met up (legal) or one of them runs out of
+    tiles without meeting the rest (it would be cut off), so a tile that
+    closes off a small pocket costs about the size of the pocket."""
+    ring = table.ring[tile]
+    start = None
+    for i in range(8):
+        if ring[i] < 0 or blocked[ring[i]]:
+            start = i
+            break
+    if start is None:
+        return True
+
+    sides = []
+    counted = False  # whether the run we're in has a side already
+    for k in range(1, 9):
+        i = (start + k) % 8
+        n = ring[i]
+        if n < 0 or blocked[n]:
+            counted = False
+        elif i % 2 == 0 and not counted:  # the orthogonal ones
+            sides.append(n)
+            counted = True
+    if len(sides) < 2:
+        return True
+    return sides_meet(blocked, table.orthogonal, tile, sides)
+
+
+def sides_meet(blocked, adjacent, tile, sides):
+    """Breadth-first searches from every side at once, a tile each in
+    turn, that don't go through tile.  True once they've all met."""
+    owner = {tile: -1}  # tile -> the search that got there first
+    parent = list(range(len(sides)))  # searches that met are merged
+    frontiers = []
+    for g, side in enumerate(sides):
+        owner[side] = g
+        frontiers.append(deque([side]))
+    searches = len(sides)
+
+    while True:
+        for g in range(len(sides)):
+            if parent[g] != g:
+                continue
+            frontier = frontiers[g]
+            if not frontier:
+                return False
+            v = frontier.popleft()
+            for u in adjacent[v]:
+                if blocked[u]:
+                    continue
+                h = owner.get(u)
+                if h is None:
+                    owner[u] = g
+                    frontier.append(u)
+                elif h >= 0:
+                    while parent[h] != h:
+                        h = parent[h]
+                    if h != g:
+                        parent[h] = g
+                        frontier.extend(frontiers[h])
+                        frontiers[h] = None
+                        searches -= 1
+                        if searches == 1:
+                            return True
+
+
+def articulation_points(free, adjacent, root):
+    """Iterative Tarjan over the open tiles reachable from root.  Returns
+    (reached, cut) bytearrays; the root itself is never marked as cut."""
+    size = len(free)
+    disc = [0] * size
+    low = [0] * size
+    parent = [-1] * size
+    reached = bytearray(size)
+    cut = bytearray(size)
+
+    counter = 1
+    disc[root] = low[root] = counter
+    reached[root] = 1
+    stack = [(root, iter(adjacent[root]))]
+
+    while stack:
+        v, neighbors = stack[-1]
+        descended = False
+        for u in neighbors:
+            if not free[u]:
+                continue
+            if not disc[u]:
+                counter += 1
+                disc[u] = low[u] = counter
+                parent[u] = v
+                reached[u] = 1
+                stack.append((u, iter(adjacent[u])))
+                descended = True
+                break
+            elif u != parent[v] and disc[u] < low[v]:
+                low[v] = disc[u]
+
+        if not descended:
+            stack.pop()
+            if stack:
+                p = stack[-1][0]
+                if low[v] < low[p]:
+                    low[p] = low[v]
+                if low[v] >= disc[p] and p != root:
+                    cut[p] = 1
+
+    return reached, cut
@@ -0,0 +1,90 @@
+import copy
+import random
+import unittest
+from engine.grid_world import GridWorld
+
+
+class TestBuildIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.width = 7
+        self.height = 6
+        self.grid_world = GridWorld(self.width, self.height, (0, 0),
+                                    (self.width - 1, self.height - 1),
+                                    path_cache=None)
+
+    # the check can_build used to do: block the tile, solve the whole
+    # board, and make sure every open tile still has a path
+    def brute_force_can_build(self, x, y):
+        world = self.grid_world
+        if (x, y) in (world.endpoint, world.spawnpoint) or world.grid[y][x]:
+            return False
+        board = copy.deepcopy(world.grid)
+        board[y][x] = True
+        paths = world.dijkstras_path(board)
+        for i in range(self.width):
+            for j in range(self.height):
+                if not board[j][i] and (i, j) not in paths:
+                    return False
+        return True
+
+    def assertMatchesBruteForce(self):
+        for x in range(self.width):
+            for y in range(self.height):
+                self.assertEqual(self.grid_world.can_build(x, y),
+                                 self.brute_force_can_build(x, y), (x, y))
+
+    def test_empty_board(self):
+        self.assertMatchesBruteForce()
+
+    def test_random_boards(self):
+        rng = random.Random(3)
+        world = self.grid_world
+        for _ in range(60):
+            x = rng.randrange(self.width)
+            y = rng.randrange(self.height)
+            if world.grid[y][x]:
+                world.remove_tower(x, y)
+            else:
+                world.build_tower(x, y)
+            self.assertMatchesBruteForce()
+
+    def test_single_tiles_match_the_mask(self):
+        # can_build without a mask only searches around the tile; on a
+        # board walled into a maze that has to agree with a whole mask
+        world = GridWorld(20, 15, (0, 0), (19, 14), path_cache=None)
+        rng = random.Random(8)
+        for _ in range(200):
+            if not world.build_tower(rng.randrange(20), rng.randrange(15)):
+                continue
+            self.assertIsNone(world.current_mask)
+            fresh = [world.can_build(x, y)
+                     for y in range(15) for x in range(20)]
+            self.assertEqual(fresh, [b == 1 for b in world.build_mask])
+
+    def test_stranded_tile(self):
+        # a tile cut off by removing the tower inside a ring can only be
+        # filled back in
+        for x, y in [(2, 2), (2, 1), (1, 2), (3, 2), (2, 3)]:
+            self.assertTrue(self.grid_world.build_tower(x, y))
+        self.grid_world.remove_tower(2, 2)
+        self.assertMatchesBruteForce()
+        self.assertTrue(self.grid_world.can_build(2, 2))
+        self.assertFalse(self.grid_world.can_build(4, 4))
+
+    def test_out_of_bounds(self):
+        self.assertFalse(self.grid_world.can_build(-1, 0))
+        self.assertFalse(self.grid_world.can_build(0, -1))
+        self.assertFalse(self.grid_world.can_build(self.width, 0))
+
+    def test_mask_string(self):
+        mask = self.grid_world.get_build_mask()
+        self.assertEqual(len(mask), self.width * self.height)
+        self.assertEqual(mask[0], '0')  # spawnpoint
+        self.assertEqual(mask[-1], '0')  # endpoint
+        self.grid_world.build_tower(3, 0)
+        self.assertEqual(self.grid_world.get_build_mask()[3], '0')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,21 +1,119 @@
 import time
+from bisect import bisect_left
+
+# upper bounds of the histogram buckets, in seconds: 0.125 ms doubling up to
+# about 4 s, then everything slower
+BUCKETS = [0.000125 * 2 ** i for i in range(16)]
+# bucket bounds for counting things (messages, say) instead of timing them
+COUNTS = [2 ** i for i in range(12)]
+
+
+class Histogram:
+    """Counts of values (durations, in seconds) in doubling buckets, with the
+    count, total and maximum kept exactly.  Cheap enough to record every
+    tick."""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        """The upper bound of the bucket the p-th percentile (0 to 100) falls
+        in, so never less than the real value.  The maximum for the last
+        bucket."""
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
 
 
 class Clock:
-    """This is a convenience class which has a method that will sleep until a specific amount of time has passed since the last tick."""
+    """Paces a fixed-step simulation.  Every step is exactly tick_len long
+    in game time, whatever the real time between them was.
+
+    Steps are due on a fixed schedule of deadlines tick_len apart, measured
+    on a monotonic clock, so sleeping late doesn't push the later steps back
+    and nothing drifts.  A loop that falls behind runs every step that's due
+    to catch up (the accumulator), but at most max_catch_up at once; past
+    that the backlog is dropped and the schedule starts again from now, so
+    an overloaded server slows the game down instead of spiralling.
+
+    How late every wake up was and how long every step took are kept in
+    histograms, see stats()."""
 
-    def __init__(self, tick_len=1.0 / 30.0):
-        self.last_tick = time.time()
+    def __init__(self, tick_len=1.0 / 30.0, max_catch_up=5,
+                 now=time.monotonic, sleep=time.sleep):
         self.tick_len = tick_len
+        self.max_catch_up = max_catch_up
+        self.now = now
+        self.sleep = sleep
+        self.deadline = now() + tick_len  # when the next step is due
+        self.steps = 0  # steps run
+        self.dropped = 0  # steps skipped because the loop fell too far behind
+        self.lateness = Histogram()  # how long after its deadline each wait ended
+        self.step_time = Histogram()  # how long each step took to run
+
+    def wait(self):
+        """Sleep until the next step is due.  Returns how many steps are due
+        by then, from 1 up to max_catch_up."""
+        now = self.now()
+        if now < self.deadline:
+            self.sleep(self.deadline - now)
+            now = self.now()
+        late = max(0.0, now - self.deadline)
+        self.lateness.record(late)
+
+        due = 1 + int(late // self.tick_len)
+        if due > self.max_catch_up:
+            self.dropped += due - self.max_catch_up
+            due = self.max_catch_up
+            self.deadline = now + self.tick_len
+        else:
+            self.deadline += due * self.tick_len
+        return due
+
+    def run(self, step):
+        """Wait for the next step to be due, then call step(tick_len) for
+        every step that is.  Returns how many ran."""
+        due = self.wait()
+        for _ in range(due):
+            start = self.now()
+            step(self.tick_len)
+            self.step_time.record(self.now() - start)
+        self.steps += due
+        return due
 
-    def tick(self):
-        """sleep until 'tick_len' time has passed since last tick"""
-        cur_time = time.time()  # in seconds
-        dt = cur_time - self.last_tick
-        if dt < self.tick_len:
-            time.sleep(self.tick_len - dt)
-
-        final_time = time.time()
-        final_dt = final_time - self.last_tick
-        self.last_tick = final_time
-        return final_dt
+    def stats(self):
+        """What the clock has seen so far, all times in seconds."""
+        return {
+            'tick_len': self.tick_len,
+            'steps': self.steps,
+            'dropped': self.dropped,
+            'lateness': self.lateness.summary(),
+            'step_time': self.step_time.summary(),
+        }
@@ -0,0 +1,85 @@
+import unittest
+from engine.clock import Clock, Histogram
+
+
+class FakeTime:
+    """A clock that only moves when slept on or told to."""
+
+    def __init__(self):
+        self.t = 100.0
+
+    def now(self):
+        return self.t
+
+    def sleep(self, seconds):
+        self.t += seconds
+
+
+class TestClock(unittest.TestCase):
+
+    def setUp(self):
+        self.time = FakeTime()
+        self.clock = Clock(0.1, max_catch_up=3, now=self.time.now,
+                           sleep=self.time.sleep)
+        self.dts = []
+
+    def step(self, cost):
+        def step(dt):
+            self.dts.append(dt)
+            self.time.t += cost
+        return step
+
+    def test_on_time_steps_follow_the_deadlines(self):
+        for _ in range(10):
+            self.assertEqual(self.clock.run(self.step(0.01)), 1)
+        # no drift: ten steps end exactly ten ticks in, however long they took
+        self.assertAlmostEqual(self.time.t, 101.0 + 0.01)
+        self.assertEqual(self.dts, [0.1] * 10)
+        self.assertEqual(self.clock.dropped, 0)
+
+    def test_falling_behind_catches_up(self):
+        self.clock.run(self.step(0.25))  # the step ran past the next two deadlines
+        self.assertEqual(self.clock.run(self.step(0)), 2)
+        self.assertEqual(self.clock.steps, 3)
+        self.assertEqual(self.clock.dropped, 0)
+        # back on schedule
+        self.assertEqual(self.clock.run(self.step(0)), 1)
+
+    def test_catch_up_is_capped(self):
+        self.time.t += 1.05  # ten ticks due
+        self.assertEqual(self.clock.run(self.step(0)), 3)
+        self.assertEqual(self.clock.dropped, 7)
+        # the schedule restarts from when it woke up
+        self.assertAlmostEqual(self.clock.deadline, self.time.t + 0.1)
+        self.assertEqual(self.clock.run(self.step(0)), 1)
+
+    def test_stats(self):
+        self.clock.run(self.step(0.002))
+        self.time.t += 0.128  # wakes up 0.03 late
+        self.clock.run(self.step(0.002))
+        stats = self.clock.stats()
+        self.assertEqual(stats['steps'], 2)
+        self.assertEqual(stats['step_time']['count'], 2)
+        self.assertAlmostEqual(stats['step_time']['max'], 0.002)
+        self.assertEqual(stats['lateness']['count'], 2)
+        self.assertAlmostEqual(stats['lateness']['max'], 0.03)
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_percentiles_are_bucket_bounds(self):
+        h = Histogram([1, 2, 4, 8])
+        for value in [0.5] * 90 + [3] * 9 + [100]:
+            h.record(value)
+        self.assertEqual(h.percentile(50), 1)
+        self.assertEqual(h.percentile(95), 4)
+        self.assertEqual(h.percentile(100), 100)  # past the last bound
+        self.assertEqual(h.count, 100)
+        self.assertEqual(h.max, 100)
+
+    def test_empty(self):
+        self.assertEqual(Histogram().summary()['p99'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,36 +1,36 @@
-from modifiers.stun_modifier import *
+from modifiers.stun_modifier import Stun_modifier
 
 #This class is stores all the effects in the game.
-# Tile_effects.py holds an array that stores multiple effects (there can be more than 1 effect on a tile at a given time.
+# Tile_effects.py keeps the effects on each tile (there can be more than 1 effect on a tile at a given time, but only one of each type).
+# counter is how many ticks the effect lasts. Effects don't act on creeps themselves: every tick each one adds its damage
+# (and stun) to its tile in the damage/stun fields Tile_effects.py keeps, and creeps get hit from those all at once.
 class effects ():
+    stuns = False  # whether creeps on the tile get stunned
+
     def __init__(self):
         pass
 
-#fire sublcass. Contains a counter that decrements when update is called.
+    # the same type of effect was put on the tile again: take on its strength and start its duration over
+    def refresh(self, other):
+        self.counter = other.counter
+        self.damage = other.damage
+
+#fire sublcass. Burns for counter ticks.
 class fire(effects):
     def __init__(self, damage, counter=60):
         self.counter = counter;
         self.damage = damage;
         self.type = 'fire';
 
-    def update(self):
-        self.counter = self.counter-1
-        return self
-
-    def on_move(self, creep, state):
-        creep.take_damage(self.damage, state)
-        return self
-
 class stun(effects):
-    def init(self, damage, counter=15):
+    stuns = True
+
+    def __init__(self, damage, counter=15):
         self.counter = counter
         self.damage = damage
         self.type = 'stun';
 
-    def update(self):
-        self.counter = self.counter-1
-        return self
-
-    def on_move(self, creep, state):
-        creep.take_damage(self.damage, state)
-        creep.modify(Stun_modifier(creep))
\ No newline at end of file
+# stuns a creep standing on a stunning tile. Standing in the stun keeps the creep stunned: the modifier engine refreshes
+# the stun it has instead of piling on another every tick
+def stun_creep(creep, gameState):
+    gameState.modifier_engine.add(creep, Stun_modifier())
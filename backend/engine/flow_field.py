@@ -0,0 +1,197 @@
+"""NumPy flow-field path solver for GridWorld.
+
+Creeps only ever ask "which tile next?", so instead of a priority queue
+this computes the whole distance-to-endpoint field with vectorized sweeps
+and then picks every tile's next hop at once.
+
+A pass walks the board one row at a time.  Each row first takes the moves
+into the row before it, all at once, and is then scanned end to end in
+both directions, so a straight run along the row of any length settles in
+a single step.  A round is four passes: rows down, rows up, columns right
+and columns left.  After each round every move from every tile is tried
+at once; when none of them improves anything, every tile satisfies
+dist[v] = min(dist[u] + step cost), which has exactly one solution, so the
+field is the same one Dijkstra finds.  Costs are integers, so it matches
+to the last unit, and next_hop() picks the same tiles as
+pathing.next_hop().
+
+The scans use the running minimum trick: along a straight run,
+dist[j] = min over i <= j of (dist[i] + (j - i) * STEP), which is
+np.minimum.accumulate(dist - j * STEP) + j * STEP.  Runs stop at obstructed
+tiles; each run gets an offset big enough that nothing from an earlier run
+can win the minimum in a later one."""
+import numpy as np
+from array import array
+from engine.pathing import MOVES, STEP, INF
+
+# bigger than any difference between two values inside one run
+RUN_OFFSET = 4 * INF
+
+
+class FlowFieldSolver:
+
+    def __init__(self, world):
+        self.world = world
+        self.dist = None  # (height, width) array of distances
+        self.costs = None  # one (height, width) step cost array per move
+
+    def reset(self):
+        """Solve the whole board from scratch, rewriting world.next_hop in
+        place."""
+        world = self.world
+        self.solve(np.full((world.height, world.width), INF, dtype=np.int64))
+
+    def toggle(self, tile):
+        """Re-solve after tile was blocked or cleared."""
+        if self.world.blocked[tile]:
+            # distances can only grow, so the old field is no use
+            self.reset()
+        else:
+            # opening a tile only shortens paths, so the old field is an
+            # upper bound to start the sweeps from
+            self.solve(self.dist)
+
+    def distances(self):
+        return array('q', self.dist.tobytes())
+
+    def load(self, dist):
+        world = self.world
+        self.dist = np.frombuffer(dist, dtype=np.int64) \
+            .reshape(world.height, world.width).copy()
+
+    def solve(self, dist):
+        world = self.world
+        blocked = np.frombuffer(world.blocked, dtype=np.uint8) \
+            .reshape(world.height, world.width).astype(bool)
+        self.costs = step_costs(blocked)
+
+        dist = dist.copy()
+        dist[blocked] = INF
+        gx, gy = world.endpoint
+        dist[gy, gx] = 0
+        self.dist, options = relax(dist, blocked, self.costs)
+
+        hops = next_hop(self.dist, options, world.goal)
+        np.frombuffer(world.next_hop, dtype=np.int32)[:] = hops.ravel()
+
+
+def step_costs(blocked):
+    """For every move in MOVES order, the cost of making it from each tile,
+    or INF where it's illegal (off the board, from or onto an obstructed
+    tile, or cutting between two obstructed tiles)."""
+    height, width = blocked.shape
+    # pad with obstructed tiles so moves off the board are never legal
+    padded = np.ones((height + 2, width + 2), dtype=bool)
+    padded[1:-1, 1:-1] = blocked
+
+    def shifted(dx, dy):
+        return padded[1 + dy:height + 1 + dy, 1 + dx:width + 1 + dx]
+
+    costs = []
+    for dx, dy, cost in MOVES:
+        illegal = blocked | shifted(dx, dy)
+        if dx and dy:
+            illegal = illegal | (shifted(dx, 0) & shifted(0, dy))
+        costs.append(np.where(illegal, INF, cost).astype(np.int64))
+    return costs
+
+
+def relax(dist, blocked, costs):
+    """Run rounds of passes until nothing changes.  dist is updated in
+    place; returns it along with move_costs() for the final field."""
+    # a column pass is a row pass over the transposed board, with every
+    # move's dx and dy swapped
+    by_row = {(dx, dy): costs[k] for k, (dx, dy, _) in enumerate(MOVES)}
+    by_column = {(dy, dx): cost.T for (dx, dy), cost in by_row.items()}
+    rows = Passes(blocked, by_row)
+    columns = Passes(blocked.T, by_column)
+
+    while True:
+        rows.sweep(dist)
+        columns.sweep(dist.T)
+        options = move_costs(dist, costs)
+        if (options.min(axis=0) >= dist).all():
+            return dist, options
+
+
+class Passes:
+    """Everything a pass over the rows of one board needs, worked out once
+    per solve.  costs maps (along, across) move offsets to cost arrays."""
+
+    def __init__(self, blocked, costs):
+        lines, length = blocked.shape
+        # moves into the row before (or after) each row, as
+        # (offset along the row, step costs for this row)
+        self.from_previous = [
+            [(dx, cost[i]) for (dx, dy), cost in costs.items() if dy == -1]
+            for i in range(lines)]
+        self.from_next = [
+            [(dx, cost[i]) for (dx, dy), cost in costs.items() if dy == 1]
+            for i in range(lines)]
+        self.forward = scan_offsets(blocked)
+        self.backward = scan_offsets(blocked[:, ::-1])
+
+    def sweep(self, dist):
+        lines = len(dist)
+        for i in range(1, lines):
+            self.settle(dist[i], dist[i - 1], self.from_previous[i], i)
+        for i in range(lines - 2, -1, -1):
+            self.settle(dist[i], dist[i + 1], self.from_next[i], i)
+
+    def settle(self, line, previous, moves, i):
+        for offset, cost in moves:
+            if offset == 0:
+                np.minimum(line, previous + cost, out=line)
+            elif offset == 1:
+                np.minimum(line[:-1], previous[1:] + cost[:-1], out=line[:-1])
+            else:
+                np.minimum(line[1:], previous[:-1] + cost[1:], out=line[1:])
+
+        offsets = self.forward[i]
+        np.subtract(np.minimum.accumulate(line + offsets), offsets, out=line)
+        line = line[::-1]
+        offsets = self.backward[i]
+        np.subtract(np.minimum.accumulate(line + offsets), offsets, out=line)
+
+
+def scan_offsets(blocked):
+    """Per row, what to add before the running minimum along it (and take
+    away after): minus the step cost to each tile, plus a per-run offset
+    that keeps earlier runs out of later ones."""
+    lines, length = blocked.shape
+    # a run ends wherever a step along the row would enter or leave an
+    # obstructed tile
+    ends = np.zeros((lines, length), dtype=np.int64)
+    ends[:, 1:] = blocked[:, 1:] | blocked[:, :-1]
+    run = np.cumsum(ends, axis=1)
+    runs_after = run[:, -1:] - run
+    return runs_after * RUN_OFFSET - np.arange(length) * STEP
+
+
+def move_costs(dist, costs):
+    """A (moves, height, width) array: what each tile's distance would be
+    if it took each move, in MOVES order."""
+    height, width = dist.shape
+    padded = np.full((height + 2, width + 2), INF, dtype=np.int64)
+    padded[1:-1, 1:-1] = dist
+
+    options = np.empty((len(MOVES), height, width), dtype=np.int64)
+    for k, (dx, dy, _) in enumerate(MOVES):
+        np.add(padded[1 + dy:height + 1 + dy, 1 + dx:width + 1 + dx],
+               costs[k], out=options[k])
+    return options
+
+
+def next_hop(dist, options, goal):
+    """The next hop of every tile as a (height, width) array of tile ids,
+    -1 for the goal and tiles that can't reach it.  Ties go to the move
+    that comes first in MOVES."""
+    height, width = dist.shape
+    best = np.argmin(options, axis=0)
+
+    offsets = np.array([dy * width + dx for dx, dy, _ in MOVES])
+    tiles = np.arange(height * width).reshape(height, width)
+    hops = tiles + offsets[best]
+    hops[dist >= INF] = -1
+    hops.flat[goal] = -1
+    return hops
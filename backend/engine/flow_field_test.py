@@ -0,0 +1,72 @@
+import random
+import unittest
+from engine.grid_world import GridWorld
+
+
+class TestFlowField(unittest.TestCase):
+
+    def setUp(self):
+        self.width = 11
+        self.height = 8
+        # no path cache: a layout another solver has solved would come
+        # straight out of it, and be compared with itself
+        self.grid_world = GridWorld(self.width, self.height, (0, 0),
+                                    (self.width - 1, self.height - 1),
+                                    solver='flow_field', path_cache=None)
+
+    def assertMatchesDijkstra(self):
+        world = self.grid_world
+        self.assertEqual(world.tilePaths, world.dijkstras_path(world.grid))
+
+    def test_empty_board(self):
+        self.assertMatchesDijkstra()
+
+    def test_random_toggles(self):
+        rng = random.Random(11)
+        world = self.grid_world
+        for _ in range(150):
+            x = rng.randrange(self.width)
+            y = rng.randrange(self.height)
+            if world.grid[y][x]:
+                world.remove_tower(x, y)
+            else:
+                world.build_tower(x, y)
+            self.assertMatchesDijkstra()
+
+    def test_serpentine(self):
+        # walls with alternating gaps force the path back and forth, which
+        # takes several rounds of sweeps to settle
+        for x in range(1, self.width - 1, 2):
+            for y in range(self.height):
+                gap = self.height - 1 if (x // 2) % 2 == 0 else 0
+                if y != gap:
+                    self.assertTrue(self.grid_world.build_tower(x, y))
+        self.assertMatchesDijkstra()
+        self.grid_world.remove_tower(3, 4)
+        self.assertMatchesDijkstra()
+
+    def test_unreachable_tiles(self):
+        # unchecked walls around the spawnpoint, which build_tower refuses
+        for tile in [1, self.width, self.width + 1]:
+            self.grid_world.blocked[tile] = 1
+        self.grid_world.update_pathing()
+        self.assertNotIn((0, 0), self.grid_world.tilePaths)
+        self.assertMatchesDijkstra()
+
+    def test_distances_match_bit_for_bit(self):
+        world = self.grid_world
+        rng = random.Random(5)
+        for _ in range(25):
+            world.build_tower(rng.randrange(self.width),
+                              rng.randrange(self.height))
+        reference = GridWorld(self.width, self.height, (0, 0),
+                              (self.width - 1, self.height - 1),
+                              solver='dijkstra', path_cache=None)
+        reference.blocked[:] = world.blocked
+        reference.update_pathing()
+        self.assertEqual(list(world.path_solver.dist.ravel()),
+                         list(reference.path_solver.dist))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+"""Runs every game of the engine process from one loop.
+
+Instead of a thread (with its own sleep loop) per lobby, a GameHost owns
+all the GameRunners and, once a tick, steps each of them in turn: a game
+still in its lobby handles its lobby messages, a started one runs its
+game_loop.  The round starts one game further along every tick, so no game
+is always last.
+
+Each game gets a fair share of the tick for its messages (the tick split
+between the games), and the whole round has to fit in one tick.  If it
+doesn't, the host is overloaded: the games that didn't get their turn skip
+this tick (their game time doesn't move on, they run slower) and go first
+on the next one.  The host never runs a tick late to catch up, so an
+overloaded host slows its games down instead of falling further behind.
+
+A new game has to open its connection to the server before it can do
+anything, which can take as long as the server takes to answer.  That
+happens on a thread of its own, and the game joins the rounds once it's
+connected, so the games already running never wait on it.  With a
+GamePool (see game_pool.py) the host doesn't make the new games it's asked
+for itself, they go to whichever worker process is least loaded."""
+import threading
+from collections import deque
+from time import perf_counter
+from engine.clock import Clock, Histogram
+
+TICK_LEN = 1.0 / 30.0  # tower_game's tick
+BUSY_WEIGHT = 0.05  # how much the latest round counts towards busy
+
+
+class GameHost:
+
+    def __init__(self, tick_len=TICK_LEN, now=perf_counter, pool=None,
+                 new_game=None):
+        self.tick_len = tick_len
+        self.now = now
+        self.pool = pool  # where new games go, if not here
+        # makes a game for this host, connected and waiting in its lobby
+        self.new_game = new_game or connected_game
+        self.games = []
+        # games spawn() started that are done connecting, None for the ones
+        # that couldn't; appended to from their threads
+        self.arrivals = deque()
+        self.connecting = 0  # games spawn() started that haven't arrived
+        self.failed = 0  # games that never got connected
+        self.next = 0  # the game the next round starts with
+        self.clock = None  # paces the rounds once run() is called
+        self.rounds = 0
+        self.skipped = 0  # game ticks skipped because a round ran out of time
+        self.overruns = 0  # game steps that took longer than their share
+        self.step_time = Histogram()  # how long each game step took
+        self.round_time = Histogram()  # how long each whole round took
+        # the part of each tick the rounds take, averaged over the last
+        # second or so; above 1 the host is overloaded
+        self.busy = 0.0
+
+    def add(self, game):
+        game.host = self
+        self.games.append(game)
+
+    def remove(self, game):
+        self.games.remove(game)
+
+    def spawn(self):
+        """Start a new game, waiting in its lobby, here or in the pool.
+        Here, it joins the rounds once it has connected."""
+        if self.pool is not None:
+            self.pool.spawn()
+            return
+        self.connecting += 1
+        t = threading.Thread(target=self.connect_game)
+        t.daemon = True
+        t.start()
+
+    def connect_game(self):
+        """Runs on a thread of its own, see spawn()."""
+        try:
+            game = self.new_game(self)
+        except OSError as e:  # the server refused or never answered
+            print('[game host] a new game could not connect: {}'.format(e))
+            game = None
+        self.arrivals.append(game)
+
+    def take_arrivals(self):
+        """Add the games that have connected since the last round."""
+        while self.arrivals:
+            game = self.arrivals.popleft()
+            self.connecting -= 1
+            if game is None:
+                self.failed += 1
+            else:
+                self.add(game)
+
+    def run(self, after=None):
+        """Step the games forever.  after, if given, is called after every
+        round."""
+        # one tick at a time, never a burst of them to catch up
+        self.clock = Clock(self.tick_len, max_catch_up=1)
+        try:
+            while True:
+                self.clock.run(self.tick)
+                if self.pool is not None:
+                    self.pool.collect()  # or the reports pile up
+                if after is not None:
+                    after()
+        except KeyboardInterrupt:
+            pass
+
+    def tick(self, dt):
+        """Step every game once, as far as the tick's time allows.  Returns
+        how many games were stepped."""
+        self.take_arrivals()
+        games = list(self.games)
+        n = len(games)
+        if not n:
+            # an idle round still counts, so rounds keep time
+            self.rounds += 1
+            self.busy -= BUSY_WEIGHT * self.busy
+            return 0
+        now = self.now
+        start = round_start = now()
+        deadline = start + self.tick_len
+        share = self.tick_len / n
+        first = self.next % n
+        stepped = 0
+        for k in range(n):
+            if k and start >= deadline:
+                # out of time: the rest go first next tick
+                self.skipped += n - k
+                self.next = first + k
+                break
+            game = games[(first + k) % n]
+            if game.started:
+                game.game_loop(dt, share)
+            else:
+                game.poll_lobby()
+            end = now()
+            took = end - start
+            self.step_time.record(took)
+            if took > share:
+                self.overruns += 1
+            start = end
+            stepped += 1
+        else:
+            self.next = first + 1
+        self.next %= n
+        self.rounds += 1
+        took = start - round_start
+        self.round_time.record(took)
+        self.busy += BUSY_WEIGHT * (took / self.tick_len - self.busy)
+        return stepped
+
+    def log_profile(self):
+        """Write how the host and every game in it are doing to the log."""
+        print('[game host] {}'.format(self.stats()))
+        if self.pool is not None:
+            print('[game host] pool: {}'.format(self.pool.stats()))
+        for game in self.games:
+            game.log_profile()
+
+    def stats(self):
+        """How the host is keeping up with its games, times in seconds."""
+        return {
+            'games': len(self.games),
+            'started': sum(1 for game in self.games if game.started),
+            'connecting': self.connecting,
+            'failed': self.failed,
+            'rounds': self.rounds,
+            'skipped': self.skipped,
+            'overruns': self.overruns,
+            'busy': self.busy,
+            'step_time': self.step_time.summary(),
+            'round_time': self.round_time.summary(),
+            'clock': self.clock.stats() if self.clock else None,
+        }
+
+
+def connected_game(host):
+    """A GameRunner for host, once its connection to the server is open."""
+    from engine.tower_game import GameRunner
+    return GameRunner(create_server=False, host=host)
@@ -0,0 +1,129 @@
+import threading
+import time
+import unittest
+from engine.game_host import GameHost
+
+
+class FakeTime:
+
+    def __init__(self):
+        self.t = 0.0
+
+    def now(self):
+        return self.t
+
+
+class Game:
+    """Takes cost seconds of (fake) time per step."""
+
+    def __init__(self, time, cost, started=True):
+        self.time = time
+        self.cost = cost
+        self.started = started
+        self.steps = 0
+        self.budgets = []
+        self.host = None
+
+    def game_loop(self, dt, message_time_budget):
+        self.budgets.append(message_time_budget)
+        self.steps += 1
+        self.time.t += self.cost
+
+    def poll_lobby(self):
+        self.time.t += self.cost
+        self.started = True
+        return True
+
+
+class TestGameHost(unittest.TestCase):
+
+    def setUp(self):
+        self.time = FakeTime()
+        self.host = GameHost(tick_len=1.0, now=self.time.now)
+
+    def test_every_game_steps_every_tick(self):
+        games = [Game(self.time, 0.1) for _ in range(5)]
+        for game in games:
+            self.host.add(game)
+        for _ in range(3):
+            self.assertEqual(self.host.tick(1.0), 5)
+        self.assertEqual([game.steps for game in games], [3] * 5)
+        self.assertEqual(games[0].budgets, [0.2] * 3)  # a fifth of the tick
+        self.assertEqual(games[0].host, self.host)
+        self.assertEqual(self.host.skipped, 0)
+        self.assertEqual(self.host.overruns, 0)
+
+    def test_lobbies_are_polled_until_they_start(self):
+        game = Game(self.time, 0.1, started=False)
+        self.host.add(game)
+        self.host.tick(1.0)
+        self.assertEqual(game.steps, 0)
+        self.host.tick(1.0)
+        self.assertEqual(game.steps, 1)
+
+    def test_overloaded_rounds_skip_and_rotate(self):
+        games = [Game(self.time, 0.4) for _ in range(4)]
+        for game in games:
+            self.host.add(game)
+        self.assertEqual(self.host.tick(1.0), 3)  # the fourth is out of time
+        self.assertEqual(self.host.skipped, 1)
+        self.assertEqual(self.host.overruns, 3)
+        # the one skipped goes first next time
+        self.host.tick(1.0)
+        self.assertEqual([game.steps for game in games], [2, 2, 1, 1])
+        self.assertEqual(self.host.stats()['skipped'], 2)
+
+    def test_idle_rounds_count(self):
+        self.host.busy = 1.0
+        for _ in range(3):
+            self.assertEqual(self.host.tick(1.0), 0)
+        self.assertEqual(self.host.rounds, 3)
+        self.assertLess(self.host.busy, 1.0)
+
+    def test_rounds_start_one_further_along(self):
+        order = []
+        for i in range(3):
+            game = Game(self.time, 0)
+            game.game_loop = lambda dt, budget, i=i: order.append(i)
+            self.host.add(game)
+        self.host.tick(1.0)
+        self.host.tick(1.0)
+        self.assertEqual(order, [0, 1, 2, 1, 2, 0])
+
+    def wait_for_arrival(self):
+        deadline = time.monotonic() + 5
+        while not self.host.arrivals and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def test_spawned_games_join_once_connected(self):
+        running = Game(self.time, 0.1)
+        self.host.add(running)
+        opened = threading.Event()
+
+        def new_game(host):
+            opened.wait(5)  # the server taking its time
+            return Game(self.time, 0.1, started=False)
+        self.host.new_game = new_game
+        self.host.spawn()
+        # the running game goes on while the new one connects
+        self.assertEqual(self.host.tick(1.0), 1)
+        self.assertEqual(self.host.stats()['connecting'], 1)
+        opened.set()
+        self.wait_for_arrival()
+        self.assertEqual(self.host.tick(1.0), 2)
+        self.assertEqual(self.host.stats()['connecting'], 0)
+        self.assertEqual(running.steps, 2)
+
+    def test_games_that_cant_connect_are_counted(self):
+        def new_game(host):
+            raise ConnectionError('no server')
+        self.host.new_game = new_game
+        self.host.spawn()
+        self.wait_for_arrival()
+        self.assertEqual(self.host.tick(1.0), 0)
+        self.assertEqual(self.host.stats()['failed'], 1)
+        self.assertEqual(self.host.games, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Spreads games over worker processes, so they use more than one core.
+
+Each worker is a process of its own running a GameHost.  When the engine
+is asked for a new game, the pool tells the least loaded worker to start
+one, and from then on that game lives in the worker: it opens its own
+connection to ws_server and the server treats it like any other game, so
+nothing in the main process is in the way of its messages.
+
+Every worker reports its load about once a second: how many games it has
+and how much of each tick its rounds take (GameHost.busy).  A new game
+goes to the worker with the least time left to spare, counting the games
+it has been sent since its last report at what its games cost on average;
+workers equally busy (idle, say) get the one with the fewest games."""
+import os
+import queue
+from multiprocessing import Process, Queue
+from engine.game_host import GameHost
+
+REPORT_EVERY = 30  # rounds between a worker's load reports
+
+
+class WorkerLoad:
+    """What the pool knows about how loaded a worker is."""
+    __slots__ = ('games', 'busy', 'round_p90', 'pending')
+
+    def __init__(self):
+        self.games = 0  # games at the last report
+        self.busy = 0.0  # GameHost.busy at the last report
+        self.round_p90 = 0.0  # seconds, GameHost round times
+        self.pending = 0  # games sent since the last report
+
+    def expected(self):
+        """(busy, games) once the pending games have started."""
+        per_game = self.busy / self.games if self.games else 0.0
+        return (self.busy + per_game * self.pending,
+                self.games + self.pending)
+
+
+def least_loaded(loads):
+    """The index of the worker a new game should go to."""
+    return min(range(len(loads)), key=lambda i: loads[i].expected())
+
+
+def run_worker(index, commands, reports):
+    """The main loop of a worker process."""
+    host = GameHost()
+
+    def after():
+        while True:
+            try:
+                command = commands.get_nowait()
+            except queue.Empty:
+                break
+            if command == 'spawn':
+                host.spawn()
+        if host.rounds % REPORT_EVERY == 0:
+            reports.put((index, len(host.games), host.busy,
+                         host.round_time.percentile(90)))
+
+    host.run(after)
+
+
+class GamePool:
+
+    def __init__(self, workers=None):
+        workers = workers or os.cpu_count() or 1
+        self.reports = Queue()
+        self.commands = []
+        self.loads = []
+        self.processes = []
+        for index in range(workers):
+            commands = Queue()
+            p = Process(target=run_worker,
+                        args=(index, commands, self.reports))
+            p.daemon = True
+            p.start()
+            self.commands.append(commands)
+            self.loads.append(WorkerLoad())
+            self.processes.append(p)
+
+    def collect(self):
+        """Take in the load reports the workers have sent."""
+        while True:
+            try:
+                index, games, busy, round_p90 = self.reports.get_nowait()
+            except queue.Empty:
+                return
+            load = self.loads[index]
+            # games sent before the report are in it
+            load.pending = max(0, load.pending - (games - load.games))
+            load.games = games
+            load.busy = busy
+            load.round_p90 = round_p90
+
+    def spawn(self):
+        """Start a new game on the least loaded worker.  Returns its
+        index."""
+        self.collect()
+        index = least_loaded(self.loads)
+        self.loads[index].pending += 1
+        self.commands[index].put('spawn')
+        return index
+
+    def stats(self):
+        """Per worker, its games, how busy it is and its round time p90."""
+        self.collect()
+        return [{'games': load.games, 'pending': load.pending,
+                 'busy': load.busy, 'round_p90': load.round_p90}
+                for load in self.loads]
@@ -0,0 +1,37 @@
+import unittest
+from engine.game_pool import WorkerLoad, least_loaded
+
+
+def load(games, busy, pending=0):
+    worker = WorkerLoad()
+    worker.games = games
+    worker.busy = busy
+    worker.pending = pending
+    return worker
+
+
+class TestPlacement(unittest.TestCase):
+
+    def test_least_busy_worker(self):
+        loads = [load(10, 0.6), load(12, 0.3), load(2, 0.9)]
+        self.assertEqual(least_loaded(loads), 1)
+
+    def test_idle_workers_by_game_count(self):
+        loads = [load(3, 0.0), load(1, 0.0), load(2, 0.0)]
+        self.assertEqual(least_loaded(loads), 1)
+
+    def test_pending_games_count_at_the_workers_average(self):
+        # 0.3 busy with 3 games is 0.1 a game; 3 more on the way make 0.6
+        loads = [load(3, 0.3, pending=3), load(10, 0.5)]
+        self.assertEqual(least_loaded(loads), 1)
+        self.assertEqual(loads[0].expected(), (0.6, 6))
+
+    def test_a_burst_spreads_over_idle_workers(self):
+        loads = [load(0, 0.0) for _ in range(4)]
+        for _ in range(8):
+            loads[least_loaded(loads)].pending += 1
+        self.assertEqual([worker.pending for worker in loads], [2] * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
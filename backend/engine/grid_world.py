@@ -1,63 +1,131 @@
-from engine.tile_effects import tile_effects
+from engine.tile_effects import TileEffects
 from engine.effects import *
+from engine.pathing import tile_table, shortest_distances, next_hops, \
+    flatten, TilePaths, DijkstraSolver
+from engine.path_repair import PathRepair
+from engine.build_index import legal_build_mask, legal_build
+from engine.path_cache import PATH_CACHE, CachedPaths, tile_keys, \
+    layout_hash
+try:
+    from engine.flow_field import FlowFieldSolver
+except ImportError:  # NumPy isn't installed
+    FlowFieldSolver = None
 from queue import *
 from heapq import *
+from array import array
 import math
-import copy
+
+# turns a build mask into its '0'/'1' string form
+MASK_CHARS = bytes.maketrans(b'\x00\x01', b'01')
+
+# the ways GridWorld can keep its paths up to date:
+#   incremental - repair only the tiles a build/remove affects (default)
+#   dijkstra    - re-run Dijkstra over the whole board on every change
+#   flow_field  - re-solve the whole board with vectorized NumPy sweeps,
+#                 which holds up much better than Dijkstra on big boards
+PATH_SOLVERS = {
+    'incremental': PathRepair,
+    'dijkstra': DijkstraSolver,
+}
+if FlowFieldSolver is not None:
+    PATH_SOLVERS['flow_field'] = FlowFieldSolver
 
 
 class GridWorld:
 
-    def __init__(self, width, height, spawnpoint, endpoint):
+    def __init__(self, width, height, spawnpoint, endpoint,
+                 solver='incremental', path_cache=PATH_CACHE):
         self.width = width
         self.height = height
         self.spawnpoint = spawnpoint
         self.endpoint = endpoint
 
-        # this grid is a 2d array of bools, where grid[3][4] means
-        # x,y position (4,3) is either obstructed (True) or traversable (False)
-        self.grid = [[False for x in range(self.width)]
-                     for x in range(self.height)]
-
-        self.vertices = []
-        for i in range(self.width):
-            for j in range(self.height):
-                self.vertices.append((i, j))
-
-        self.tilePaths = self.dijkstras_path(self.grid)
-
-        # Creates the tile effects double array. Sets everything as a tile effect (which holds another array of effects).
-        # Will need to change tile_effect later so that not everything is on
-        # fire.
-        self.effects = []
-        for i in range(0, width):
-            new = []
-            for j in range(0, height):
-                new.append(tile_effects())
-            self.effects.append(new)
-
-    # adds the effect to the effects list on a particular tile
+        # tiles are numbered y * width + x.  The neighbour tables are shared
+        # by every board of this size.
+        self.tile_table = tile_table(width, height)
+        self.spawn = self.tile_table.index(*spawnpoint)
+        self.goal = self.tile_table.index(*endpoint)
+
+        # 1 for every obstructed tile, 0 for every traversable one
+        self.blocked = bytearray(self.tile_table.size)
+
+        # the tile a creep on each tile should move to next, -1 for the
+        # endpoint and for tiles that can't reach it.  tilePaths is a
+        # dict-style view of it keyed by (x, y) tuples.
+        self.next_hop = array('i', [-1]) * self.tile_table.size
+        self.tilePaths = TilePaths(self)
+
+        # what's left of the shortest path from each tile to the endpoint,
+        # in pathing.STEP units per orthogonal step (INF where there's no
+        # way through).  Shared with the path cache, so never written to.
+        self.goal_distance = None
+
+        # keeps next_hop up to date as towers come and go, see PATH_SOLVERS
+        self.path_solver = PATH_SOLVERS[solver](self)
+
+        # the build mask (1 for every tile a tower can be built on) once
+        # it's been asked for, None until then after every change; see
+        # build_mask
+        self.current_mask = None
+        # whether every open tile is known to have a way to the endpoint,
+        # which lets can_build check a tile without the whole mask
+        self.connected = True
+
+        # solved layouts shared between boards (None to always solve), and
+        # the Zobrist hash of the obstructed tiles to look them up by
+        self.path_cache = path_cache
+        self.tile_keys = tile_keys(self.tile_table.size)
+        self.layout_hash = 0
+        # this layout's entry in the path cache, and its key, for the build
+        # mask to go in once there is one
+        self.cache_key = None
+        self.cache_entry = None
+
+        # goes up by one every time the paths are worked out again, so
+        # clients only need sending next_hop when it has moved on
+        self.path_version = 0
+        self.refresh_paths()
+
+        # the effects on the tiles, only for tiles that have any
+        self.effects = TileEffects(self.tile_table)
+
+    # adds the effect to the effects on a particular tile, or refreshes the
+    # one already there
     def add_effect(self, loc, type):
+        tile = self.tile_table.index(loc[0], loc[1])
         if(type == "fire"):
-            self.effects[loc[0]][loc[1]].append(fire(0.5))
+            self.effects.add(tile, fire(0.5))
         if(type == "stun"):
-            self.effects[loc[0]][loc[1]].append(stun(10))
+            self.effects.add(tile, stun(10))
 
-    # Returns a nice version of the effects triple array for json sending in
-    # the format. Grabs the first effect (x,y, string of effect)
-    def process_effects(self):
-        processed_list = []
+    # the effects on tile (x, y)
+    def get_effects(self, x, y):
+        return self.effects.at(y * self.width + x)
+
+    # moves every effect on a tick, dropping the ones that have run out
+    def update_effects(self):
+        self.effects.update()
 
-        for i in range(0, self.width):
-            for k in range(0, self.height):
-                if(len(self.effects[i][k].effects) > 0):
-                    processed_list.append(
-                        (i, k, self.effects[i][k].effects[0].type))
+    # hits every creep in creeps (all live) with the effects on its tile
+    def apply_effects(self, creeps, state):
+        self.effects.apply(creeps, state)
 
-        return processed_list
+    # Returns a nice version of the effects for json sending in the format
+    # (x, y, string of effect), one per tile that has any, ordered by x
+    def process_effects(self):
+        return self.effects.summary()
+
+    # a copy of the board as a 2d array of bools, where grid[3][4] means
+    # x,y position (4,3) is either obstructed (True) or traversable (False)
+    @property
+    def grid(self):
+        blocked = self.blocked
+        width = self.width
+        return [[blocked[y * width + x] == 1 for x in range(width)]
+                for y in range(self.height)]
 
     def is_blocked(self, x, y):
-        return self.grid[y][x]
+        return self.blocked[y * self.width + x] == 1
 
     def get_width(self):
         return self.width
@@ -71,103 +139,133 @@ class GridWorld:
     def get_tiles(self):
         return self.tiles
 
+    # the paths in their compact form for clients: the next hop of every
+    # tile as a tile id (y * width + x), row by row, -1 where there is none
+    def get_path_message(self):
+        return self.next_hop.tolist()
+
+    # 1 for every tile a tower can be built on, 0 for the rest.  Worked out
+    # (one pass over the whole board) the first time it's asked for after
+    # the board changes, so building doesn't pay for it.
+    @property
+    def build_mask(self):
+        if self.current_mask is None:
+            self.current_mask, stranded = legal_build_mask(
+                self.blocked, self.tile_table, self.spawn, self.goal)
+            self.connected = not stranded
+            if self.cache_entry is not None:
+                self.path_cache.add_build_mask(self.cache_key,
+                                               self.cache_entry,
+                                               bytes(self.current_mask))
+        return self.current_mask
+
+    # the build mask as a string of '0's and '1's, one per tile row by row
+    def get_build_mask(self):
+        return self.build_mask.translate(MASK_CHARS).decode()
+
     # returns an array of tuples that are the coordinates of the neighboring
     # tiles of the passed tile
     def get_neighbors(self, xCoord, yCoord):
-        neighbors = []
-        if(xCoord == 0):
-            if(yCoord == 0):
-                neighbors.append((xCoord + 1, yCoord))
-                neighbors.append((xCoord, yCoord + 1))
-            elif(yCoord == self.height - 1):
-                neighbors.append((xCoord, yCoord - 1))
-                neighbors.append((xCoord + 1, yCoord))
-            else:
-                neighbors.append((xCoord, yCoord - 1))
-                neighbors.append((xCoord + 1, yCoord))
-                neighbors.append((xCoord, yCoord + 1))
-        elif(xCoord == self.width - 1):
-            if(yCoord == 0):
-                neighbors.append((xCoord, yCoord + 1))
-                neighbors.append((xCoord - 1, yCoord))
-            elif(yCoord == self.height - 1):
-                neighbors.append((xCoord, yCoord - 1))
-                neighbors.append((xCoord - 1, yCoord))
-            else:
-                neighbors.append((xCoord, yCoord - 1))
-                neighbors.append((xCoord, yCoord + 1))
-                neighbors.append((xCoord - 1, yCoord))
-        else:
-            if(yCoord == 0):
-                neighbors.append((xCoord + 1, yCoord))
-                neighbors.append((xCoord, yCoord + 1))
-                neighbors.append((xCoord - 1, yCoord))
-            elif(yCoord == self.height - 1):
-                neighbors.append((xCoord, yCoord - 1))
-                neighbors.append((xCoord + 1, yCoord))
-                neighbors.append((xCoord - 1, yCoord))
-            else:
-                neighbors.append((xCoord, yCoord - 1))
-                neighbors.append((xCoord + 1, yCoord))
-                neighbors.append((xCoord, yCoord + 1))
-                neighbors.append((xCoord - 1, yCoord))
-
-        return neighbors
-
-    # a get neighbors function that also returns the diagonal neighbors.
-    # Default to returning diagonal first.
+        table = self.tile_table
+        tile = table.index(xCoord, yCoord)
+        return [table.coords[n] for n in table.orthogonal[tile]]
+
+    # a get neighbors function that returns the diagonal neighbors.
     def get_neighbors_diagonal(self, xCoord, yCoord):
-        neighbors = []
-        if(xCoord == 0):
-            if(yCoord == 0):
-                neighbors.append((xCoord + 1, yCoord + 1))
-            elif(yCoord == self.height - 1):
-                neighbors.append((xCoord + 1, yCoord - 1))
-            else:
-                neighbors.append((xCoord + 1, yCoord - 1))
-                neighbors.append((xCoord + 1, yCoord + 1))
-        elif(xCoord == self.width - 1):
-            if(yCoord == 0):
-                neighbors.append((xCoord - 1, yCoord + 1))
-            elif(yCoord == self.height - 1):
-                neighbors.append((xCoord - 1, yCoord - 1))
-            else:
-                neighbors.append((xCoord - 1, yCoord + 1))
-                neighbors.append((xCoord - 1, yCoord - 1))
-        else:
-            if(yCoord == 0):
-                neighbors.append((xCoord + 1, yCoord + 1))
-                neighbors.append((xCoord - 1, yCoord + 1))
-            elif(yCoord == self.height - 1):
-                neighbors.append((xCoord + 1, yCoord - 1))
-                neighbors.append((xCoord - 1, yCoord - 1))
-            else:
-                neighbors.append((xCoord - 1, yCoord + 1))
-                neighbors.append((xCoord - 1, yCoord - 1))
-                neighbors.append((xCoord + 1, yCoord - 1))
-                neighbors.append((xCoord + 1, yCoord + 1))
-
-        return neighbors
+        table = self.tile_table
+        tile = table.index(xCoord, yCoord)
+        return [table.coords[n] for n in table.diagonal[tile]]
 
     # if a tower can be built in the desired location, do so. else return false
     def build_tower(self, xCoord, yCoord):
 
-        if(xCoord >= self.width or yCoord >= self.height):
-            return False
-
         if(self.can_build(xCoord, yCoord)):
-            self.grid[yCoord][xCoord] = True
-            self.tilePaths = self.dijkstras_path(self.grid)
+            tile = self.tile_table.index(xCoord, yCoord)
+            self.toggle(tile)
+            self.refresh_paths(tile)
             return True
         else:
             return False
 
-    def remove_tower(self, x, y):
-        self.grid[y][x] = False
-        self.update_pathing()
+    # builds towers on several tiles, (x, y) each, with one path refresh
+    # for all of them, and returns whether each went in.  Each tile is
+    # judged on the board the ones before it left, as if they were built
+    # one at a time.
+    def build_towers(self, locs):
+        tiles = []
+        built = []
+        for x, y in locs:
+            ok = self.can_build(x, y)
+            if ok:
+                tile = self.tile_table.index(x, y)
+                self.toggle(tile)
+                tiles.append(tile)
+            built.append(ok)
+        if len(tiles) == 1:
+            self.refresh_paths(tiles[0])
+        elif tiles:
+            self.refresh_paths()
+        return built
 
+    def remove_tower(self, x, y):
+        tile = self.tile_table.index(x, y)
+        if not self.blocked[tile]:
+            return
+        # a tower walled in by others leaves an open tile with no way out
+        blocked = self.blocked
+        if not any(not blocked[n] for n in self.tile_table.orthogonal[tile]):
+            self.connected = False
+        self.toggle(tile)
+        self.refresh_paths(tile)
+
+    # builds on an open tile or clears a blocked one, leaving the paths to
+    # refresh_paths
+    def toggle(self, tile):
+        self.blocked[tile] ^= 1
+        self.layout_hash ^= self.tile_keys[tile]
+        self.current_mask = None
+        self.cache_entry = None
+
+    # recompute every path after blocked was changed by hand
     def update_pathing(self):
-        self.tilePaths = self.dijkstras_path(self.grid)
+        self.layout_hash = layout_hash(self.blocked)
+        self.current_mask = None
+        self.connected = False  # until the build mask says otherwise
+        self.refresh_paths()
+
+    # brings next_hop and the path solver up to date with the board (and
+    # the build mask, if it's been worked out before), straight from the
+    # path cache if this layout has been solved before.  tile is the one
+    # tile that changed since the last refresh, if that's all that did.
+    def refresh_paths(self, tile=None):
+        self.path_version += 1
+        cache = self.path_cache
+        if cache is not None:
+            key = (self.width, self.height, self.spawn, self.goal,
+                   self.layout_hash)
+            entry = cache.get(key, self.blocked)
+            if entry is not None:
+                self.next_hop[:] = entry.next_hop
+                self.path_solver.load(entry.dist)
+                self.goal_distance = entry.dist
+                if entry.build_mask is not None:
+                    self.current_mask = bytearray(entry.build_mask)
+                self.cache_key = key
+                self.cache_entry = entry
+                return
+
+        if tile is None:
+            self.path_solver.reset()
+        else:
+            self.path_solver.toggle(tile)
+        self.goal_distance = self.path_solver.distances()
+
+        if cache is not None:
+            self.cache_key = key
+            self.cache_entry = CachedPaths(bytes(self.blocked),
+                                           self.next_hop[:],
+                                           self.goal_distance, None)
+            cache.put(key, self.cache_entry)
 
     # return an array of that represents the tile to move to from any other
     # tile
@@ -195,42 +293,26 @@ class GridWorld:
                         came_from[next] = current
         return came_from
 
+    # solves a whole board (a 2d array of bools like grid, or a blocked
+    # bytearray) from scratch and returns a dict mapping every tile that can
+    # reach the endpoint to the next tile on its shortest path (the endpoint
+    # maps to None)
     def dijkstras_path(self, grid):
-
-        frontier = PriorityQueue()
-        frontier.put(self.endpoint, 0)
-        came_from = {}
-        cost_so_far = {}
-        came_from[self.endpoint] = None
-        cost_so_far[self.endpoint] = 0
-
-        while not frontier.empty():
-            current = frontier.get()
-            neighbors = self.get_neighbors(*current)
-            diagonal_neighbors = self.get_neighbors_diagonal(*current)
-            all_neighbors = neighbors + diagonal_neighbors
-
-            for neighbor in all_neighbors:
-                can_move_diagonally = 0
-                if neighbor in diagonal_neighbors:
-                    intersecting_neighbors = set(self.get_neighbors(
-                        neighbor[0], neighbor[1])).intersection(all_neighbors)
-                    for tile in intersecting_neighbors:
-                        if grid[tile[1]][tile[0]]:
-                            can_move_diagonally += 1
-
-                if not can_move_diagonally == 2:
-                    new_cost = cost_so_far[
-                        current] + math.hypot(neighbor[0] - current[0], neighbor[1] - current[1])
-                    if not grid[neighbor[1]][neighbor[0]]:
-                        if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                            cost_so_far[neighbor] = new_cost
-                            frontier.put(neighbor, new_cost)
-                            came_from[neighbor] = current
-
-        # print came_from
+        blocked = grid if isinstance(grid, bytearray) else flatten(grid)
+        table = self.tile_table
+        cost_so_far = shortest_distances(blocked, table, self.goal)
+        hops = next_hops(blocked, table, self.goal, cost_so_far)
+
+        came_from = {self.endpoint: None}
+        for tile in range(table.size):
+            if hops[tile] >= 0:
+                came_from[table.coords[tile]] = table.coords[hops[tile]]
         return came_from
 
+    # how far (x, y) is from the endpoint along the path, in STEP units
+    def distance_to_goal(self, x, y):
+        return self.goal_distance[y * self.width + x]
+
     def get_single_path(self, location):
         path_return = {}
         myLocation = location
@@ -240,30 +322,19 @@ class GridWorld:
 
         return path_return
 
+    # a tower can't go on the goal, the spawnpoint, another tower, or
+    # anywhere that would leave an open tile with no way to the goal.  A
+    # build mask already worked out answers straight away; otherwise, as
+    # long as every open tile has a way to the goal, only the tiles the
+    # tower would cut off from each other are looked at.
     def can_build(self, xCoord, yCoord):
-        if((xCoord, yCoord) == self.endpoint):  # cant build on the goal
+        if(xCoord < 0 or yCoord < 0 or
+           xCoord >= self.width or yCoord >= self.height):
             return False
 
-        if((xCoord, yCoord) == self.spawnpoint):  # cant build on the spawnpoint
+        tile = yCoord * self.width + xCoord
+        if self.current_mask is not None or not self.connected:
+            return self.build_mask[tile] == 1
+        if self.blocked[tile] or tile == self.spawn or tile == self.goal:
             return False
-
-        if(self.grid[yCoord][xCoord]):  # cant build where there is already a tower
-            return False
-
-        # create a copy of the current came board
-        copy_board = copy.deepcopy(self.grid)
-
-        # place a tower in the desired location
-        copy_board[yCoord][xCoord] = True
-
-        # calculate the paths of the new board
-        copy_path = self.dijkstras_path(copy_board)
-
-        for x in range(self.width):
-            for y in range(self.height):
-                # if a tile in the new board is empty but does not have a path,
-                # the build does not work
-                if(not copy_board[y][x] and (x, y) not in copy_path):
-                    return False
-
-        return True  # otherwise return true
+        return legal_build(self.blocked, self.tile_table, tile)
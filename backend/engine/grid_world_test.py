@@ -75,5 +75,37 @@ class TestGridWorld(unittest.TestCase):
         self.assertTrue(self.grid_world.build_tower(0, 1))
         self.assertFalse(self.grid_world.build_tower(1, 0))
 
+    def test_build_towers(self):
+        from pathing import shortest_distances
+        world = self.grid_world
+        version = world.path_version
+        self.assertEqual(world.build_towers([(0, 1), (1, 1), (2, 1), (2, 1), (9, 9)]),
+                         [True, True, True, False, False])
+        self.assertEqual(world.path_version, version + 1)  # one refresh for all
+        self.assertEqual(list(world.goal_distance), list(
+            shortest_distances(world.blocked, world.tile_table, world.goal)))
+
+    def test_build_towers_that_cut_the_maze(self):
+        # each is legal on its own, but together they'd wall off the top row
+        from pathing import shortest_distances
+        world = self.grid_world
+        built = world.build_towers([(1, 1), (2, 1), (3, 1), (4, 1), (0, 1)])
+        self.assertEqual(built, [True, True, True, True, False])
+        self.assertEqual(list(world.goal_distance), list(
+            shortest_distances(world.blocked, world.tile_table, world.goal)))
+
+    def test_distance_to_goal(self):
+        from pathing import STEP, shortest_distances
+        world = self.grid_world
+        self.assertEqual(world.distance_to_goal(*world.endpoint), 0)
+        self.assertEqual(world.distance_to_goal(4, 4), STEP)
+        for x, y in [(2, 1), (2, 2), (1, 3)]:
+            world.build_tower(x, y)
+            self.assertEqual(list(world.goal_distance), list(
+                shortest_distances(world.blocked, world.tile_table, world.goal)))
+        world.remove_tower(2, 2)  # back to a layout the path cache has
+        self.assertEqual(list(world.goal_distance), list(
+            shortest_distances(world.blocked, world.tile_table, world.goal)))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
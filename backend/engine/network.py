@@ -30,18 +30,11 @@ class Network:
             # sleeping probably not necessary, but can't hurt
             time.sleep(1)
 
-        # set the gameloops client running on a different thread.
-        client.start_client_thread(address, port)
-
-        # there is actually a time-dependent operation going on here
-        # the client starts in a new thread, so we need to give it adequate
-        # time to spin up.
-        time.sleep(3)  # TODO: this will block the server, create setter method
-
-        # this is the main handle for communicating with the server.
-        # this Network class will abstract it into accessible methods like
-        # send(), receive(), etc
-        self.client_protocol = client.get_client_protocol()
+        # the gameloop's client; every game's client runs on one shared
+        # thread in the background.  This is the main handle for
+        # communicating with the server.  This Network class will abstract
+        # it into accessible methods like send(), receive(), etc
+        self.client_protocol = client.connect(address, port)
         assert self.client_protocol is not None
 
         # identify this client as the gameloop server
@@ -61,10 +54,21 @@ class Network:
         # info('received (type {}): {}'.format(as_obj['type'], as_json), INFO_ID)
         return as_obj
 
+    def pending(self):
+        """How many messages are waiting to be received."""
+        return len(self.client_protocol.message_que)
+
     def send_message(self, data):
         """Given a Python object, convert it to JSON and send it."""
         assert 'type' in data, 'cannot send a message without giving it a type (e.g., the message dict needs an entry called "type"). (data object: {})'.format(
             str(data))
-        as_json = json.dumps(data, default=dump_obj_dict)
+        self.send_json(self.encode(data))
+
+    def encode(self, data):
+        """The JSON send_message() would send for data."""
+        return json.dumps(data, default=dump_obj_dict)
+
+    def send_json(self, as_json):
+        """Send a message that's already JSON."""
         # info('sending message: {}'.format(as_json), INFO_ID)
         self.client_protocol.sendMessage(utf(as_json), isBinary=False)
@@ -0,0 +1,127 @@
+"""Process-wide cache of solved boards, shared by every GridWorld.
+
+Every player starts on the same empty board and a lot of openings are the
+same few towers, so many boards end up solving layouts some other board
+already solved.  Solved layouts are kept here, least recently used first
+out once they take more memory than the cache is allowed.  A 16x12 board
+takes about 3 KiB, a 256x256 one about 900 KiB.
+
+Layouts are keyed by (width, height, spawn, goal, obstruction hash).  The
+obstruction hash is a Zobrist hash: every tile of a board size gets a
+random 64 bit key, and the hash is the XOR of the keys of the obstructed
+tiles, so building or removing a tower updates it with a single XOR.  Two
+different layouts can share a hash, so a hit also compares the board."""
+import random
+from collections import OrderedDict
+
+DEFAULT_CAPACITY = 64 * 1024 * 1024  # bytes of solved layouts kept
+
+KEYS = {}  # board size -> per-tile Zobrist keys
+
+
+def tile_keys(size):
+    """The Zobrist keys for every tile of a board with size tiles.  Seeded
+    by the size so they're the same every run."""
+    keys = KEYS.get(size)
+    if keys is None:
+        rng = random.Random(size)
+        keys = [rng.getrandbits(64) for _ in range(size)]
+        KEYS[size] = keys
+    return keys
+
+
+def layout_hash(blocked):
+    """The obstruction hash of a whole board, from scratch."""
+    keys = tile_keys(len(blocked))
+    h = 0
+    for tile, b in enumerate(blocked):
+        if b:
+            h ^= keys[tile]
+    return h
+
+
+class CachedPaths:
+    """Everything a GridWorld works out from its layout."""
+
+    __slots__ = ('blocked', 'next_hop', 'dist', 'build_mask')
+
+    def __init__(self, blocked, next_hop, dist, build_mask):
+        self.blocked = blocked  # bytes, to check hits against
+        self.next_hop = next_hop  # array('i')
+        self.dist = dist  # array('q'), distance to the endpoint per tile
+        # bytes, or None until a board with this layout works it out
+        self.build_mask = build_mask
+
+    def nbytes(self):
+        """The memory the entry's buffers take."""
+        mask = len(self.build_mask) if self.build_mask is not None else 0
+        return (len(self.blocked) + memoryview(self.next_hop).nbytes +
+                memoryview(self.dist).nbytes + mask)
+
+
+class PathCache:
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity  # bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0  # what the entries take
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, blocked):
+        """The CachedPaths for key, or None.  blocked is the board asking,
+        to rule out hash collisions."""
+        entry = self.entries.get(key)
+        if entry is None or entry.blocked != blocked:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        entries = self.entries
+        old = entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes()
+        entries[key] = entry
+        self.nbytes += entry.nbytes()
+        self.trim()
+
+    def add_build_mask(self, key, entry, build_mask):
+        """Fill in the build mask of an entry that was put without one."""
+        if entry.build_mask is not None:
+            return
+        entry.build_mask = build_mask
+        if self.entries.get(key) is entry:
+            self.nbytes += len(build_mask)
+            self.trim()
+
+    def trim(self):
+        # the newest entry stays even if it's bigger than the whole cache
+        entries = self.entries
+        while self.nbytes > self.capacity and len(entries) > 1:
+            _, evicted = entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes()
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and zero the counters."""
+        self.entries.clear()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        return {
+            'size': len(self.entries),
+            'bytes': self.nbytes,
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+# the cache every GridWorld uses unless it's given another one
+PATH_CACHE = PathCache()
@@ -0,0 +1,117 @@
+import unittest
+from engine.grid_world import GridWorld
+from engine.path_cache import PathCache, CachedPaths, layout_hash
+
+# blocked is a byte a tile, next_hop 4 and dist 8; the build mask, a byte a
+# tile, only comes in once it's asked for
+ENTRY_BYTES = 6 * 5 * (1 + 4 + 8)
+
+
+class TestPathCache(unittest.TestCase):
+
+    def setUp(self):
+        # room for eight 6x5 layouts
+        self.cache = PathCache(capacity=8 * ENTRY_BYTES)
+
+    def new_world(self, solver='incremental'):
+        return GridWorld(6, 5, (0, 0), (5, 4), solver=solver,
+                         path_cache=self.cache)
+
+    def assertMatchesFullSolve(self, world):
+        self.assertEqual(world.tilePaths, world.dijkstras_path(world.grid))
+
+    def test_same_start_hits(self):
+        self.new_world()
+        self.assertEqual(self.cache.misses, 1)
+        self.new_world()
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.stats()['size'], 1)
+
+    def test_same_opening_hits(self):
+        first = self.new_world()
+        second = self.new_world()
+        for x, y in [(2, 1), (2, 2), (3, 3)]:
+            first.build_tower(x, y)
+        hits = self.cache.hits
+        for x, y in [(3, 3), (2, 2), (2, 1)]:
+            second.build_tower(x, y)
+        # the first two builds are layouts first never had, the last is
+        # the one it ended on
+        self.assertEqual(self.cache.hits, hits + 1)
+        self.assertEqual(second.layout_hash, first.layout_hash)
+        self.assertEqual(second.get_build_mask(), first.get_build_mask())
+        self.assertMatchesFullSolve(second)
+
+    def test_repair_after_hit(self):
+        # the incremental solver has to pick up from a cached field
+        first = self.new_world()
+        first.build_tower(2, 2)
+        second = self.new_world()
+        second.build_tower(2, 2)
+        second.build_tower(2, 3)
+        self.assertMatchesFullSolve(second)
+        second.remove_tower(2, 2)
+        self.assertMatchesFullSolve(second)
+
+    def test_hash_follows_board(self):
+        world = self.new_world()
+        world.build_tower(1, 3)
+        world.build_tower(4, 2)
+        world.remove_tower(1, 3)
+        world.remove_tower(0, 4)  # not a tower, nothing to undo
+        self.assertEqual(world.layout_hash, layout_hash(world.blocked))
+
+    def test_eviction(self):
+        world = self.new_world()
+        for x in range(1, 5):
+            for y in range(1, 4):
+                world.build_tower(x, y)
+                world.remove_tower(x, y)
+        self.assertEqual(len(self.cache.entries), 8)
+        self.assertEqual(self.cache.nbytes, 8 * ENTRY_BYTES)
+        self.assertGreater(self.cache.evictions, 0)
+
+    def test_sized_in_bytes(self):
+        world = self.new_world()
+        self.assertEqual(self.cache.stats()['bytes'], ENTRY_BYTES)
+        world.get_build_mask()
+        self.assertEqual(self.cache.stats()['bytes'], ENTRY_BYTES + 6 * 5)
+        # a bigger board pushes out as many small ones as it has to, and
+        # stays even when it doesn't fit at all
+        cache = PathCache(capacity=ENTRY_BYTES)
+        GridWorld(6, 5, (0, 0), (5, 4), path_cache=cache)
+        GridWorld(12, 10, (0, 0), (11, 9), path_cache=cache)
+        self.assertEqual(len(cache.entries), 1)
+        self.assertEqual(cache.nbytes, 4 * ENTRY_BYTES)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_build_mask_comes_from_the_cache(self):
+        first = self.new_world()
+        first.build_tower(2, 2)
+        mask = first.get_build_mask()
+        second = self.new_world()
+        second.build_tower(2, 2)
+        self.assertIsNotNone(second.current_mask)
+        self.assertEqual(second.get_build_mask(), mask)
+
+    def test_collision_is_a_miss(self):
+        world = self.new_world()
+        key = (6, 5, world.spawn, world.goal, world.layout_hash)
+        entry = self.cache.entries[key]
+        # the same key stored for some other board
+        self.cache.entries[key] = CachedPaths(
+            b'\x01' * len(entry.blocked), entry.next_hop, entry.dist,
+            entry.build_mask)
+        self.assertIsNone(self.cache.get(key, world.blocked))
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_shared_between_solvers(self):
+        self.new_world().build_tower(3, 1)
+        world = self.new_world('dijkstra')
+        world.build_tower(3, 1)
+        world.build_tower(3, 2)
+        self.assertMatchesFullSolve(world)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""Incremental shortest-path repair for GridWorld (Lifelong Planning A*
+without a heuristic, run until every tile is consistent).
+
+Rather than running Dijkstra over the whole board every time a tower is
+built or removed, this keeps the distance-to-endpoint of every tile around
+and only re-examines tiles whose distance can actually change.  A toggled
+tile only touches edges inside its 3x3 neighbourhood (its own edges, plus
+the diagonals that cut past it), so those nine tiles seed the repair.
+
+g is the current distance of a tile, rhs is the one-step lookahead value
+min(g[neighbour] + step cost).  A tile is consistent when g == rhs; the
+repair pops inconsistent tiles in order of min(g, rhs) until none are left,
+which leaves g equal to what a full Dijkstra would compute."""
+from heapq import heappush, heappop
+from engine.pathing import INF, shortest_distances, next_hop, next_hops
+
+
+class PathRepair:
+
+    def __init__(self, world):
+        self.world = world
+        self.g = None
+        self.rhs = None
+        self.queue = []
+
+    def reset(self):
+        """Throw away the repair state and solve the whole board from
+        scratch, rewriting world.next_hop in place."""
+        world = self.world
+        self.g = shortest_distances(world.blocked, world.tile_table, world.goal)
+        self.rhs = self.g[:]
+        self.queue = []
+        world.next_hop[:] = next_hops(world.blocked, world.tile_table,
+                                      world.goal, self.g)
+
+    def toggle(self, tile):
+        """Repair the paths after tile was blocked or cleared.
+        world.next_hop is updated in place."""
+        around = self.world.tile_table.around
+
+        self.update_tile(tile)
+        for n in around[tile]:
+            self.update_tile(n)
+
+        changed = self.compute()
+
+        # a tile's next hop depends on its own edges and on the distances
+        # of its neighbours, so refresh everything next to a changed tile
+        stale = set(around[tile])
+        stale.add(tile)
+        for c in changed:
+            stale.add(c)
+            stale.update(around[c])
+
+        world = self.world
+        blocked, table, g, hops = \
+            world.blocked, world.tile_table, self.g, world.next_hop
+        for t in stale:
+            if g[t] == INF or t == world.goal:
+                hops[t] = -1
+            else:
+                hops[t] = next_hop(blocked, table, g, t)
+
+    def distances(self):
+        """A copy of the distance of every tile, for the path cache."""
+        return self.g[:]
+
+    def load(self, dist):
+        """Take over a solved distance field (world.next_hop is the
+        caller's job).  Every tile of a solved field is consistent."""
+        self.g = dist[:]
+        self.rhs = dist[:]
+        self.queue = []
+
+    def update_tile(self, tile):
+        """Recompute the lookahead value of a tile and queue it if it no
+        longer agrees with its distance."""
+        world = self.world
+        g = self.g
+        if tile != world.goal:
+            best = INF
+            blocked = world.blocked
+            if not blocked[tile]:
+                for n, step, a, b in world.tile_table.moves[tile]:
+                    if blocked[n] or (blocked[a] and blocked[b]):
+                        continue
+                    cost = g[n] + step
+                    if cost < best:
+                        best = cost
+            self.rhs[tile] = best
+
+        rhs = self.rhs[tile]
+        if g[tile] != rhs:
+            heappush(self.queue, (min(g[tile], rhs), tile))
+
+    def compute(self):
+        """Process inconsistent tiles until the board is consistent again.
+        Returns the set of tiles whose distance changed."""
+        around = self.world.tile_table.around
+        g, rhs = self.g, self.rhs
+        changed = set()
+        queue = self.queue
+
+        while queue:
+            key, tile = heappop(queue)
+            if g[tile] == rhs[tile] or key != min(g[tile], rhs[tile]):
+                continue  # stale queue entry
+
+            if g[tile] > rhs[tile]:
+                # over-consistent: a shorter route was found, settle it
+                g[tile] = rhs[tile]
+            else:
+                # under-consistent: the old route is gone, so forget it and
+                # let the neighbours offer a new one
+                g[tile] = INF
+                self.update_tile(tile)
+            changed.add(tile)
+
+            for n in around[tile]:
+                self.update_tile(n)
+
+        return changed
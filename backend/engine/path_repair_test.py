@@ -0,0 +1,62 @@
+import random
+import unittest
+from engine.grid_world import GridWorld
+
+
+class TestPathRepair(unittest.TestCase):
+
+    def setUp(self):
+        self.width = 9
+        self.height = 7
+        self.grid_world = GridWorld(self.width, self.height, (0, 0),
+                                    (self.width - 1, self.height - 1),
+                                    path_cache=None)
+
+    def assertMatchesFullSolve(self):
+        world = self.grid_world
+        self.assertEqual(world.tilePaths, world.dijkstras_path(world.grid))
+
+    def test_build_and_remove(self):
+        self.assertTrue(self.grid_world.build_tower(3, 3))
+        self.assertMatchesFullSolve()
+        self.grid_world.remove_tower(3, 3)
+        self.assertMatchesFullSolve()
+
+    def test_wall_then_gap(self):
+        for y in range(self.height - 1):
+            self.assertTrue(self.grid_world.build_tower(4, y))
+        self.assertMatchesFullSolve()
+        self.grid_world.remove_tower(4, 2)
+        self.assertMatchesFullSolve()
+
+    def test_enclosed_tile(self):
+        # removing a tower whose neighbours are all towers leaves a tile
+        # that can't reach the endpoint
+        for x, y in [(2, 2), (2, 1), (1, 2), (3, 2), (2, 3)]:
+            self.assertTrue(self.grid_world.build_tower(x, y))
+        for x, y in [(1, 1), (3, 1), (1, 3), (3, 3)]:
+            self.assertTrue(self.grid_world.build_tower(x, y))
+        self.grid_world.remove_tower(2, 2)
+        self.assertNotIn((2, 2), self.grid_world.tilePaths)
+        self.assertMatchesFullSolve()
+
+    def test_random_toggles(self):
+        rng = random.Random(7)
+        world = self.grid_world
+        for _ in range(300):
+            x = rng.randrange(self.width)
+            y = rng.randrange(self.height)
+            if world.grid[y][x]:
+                world.remove_tower(x, y)
+            else:
+                world.build_tower(x, y)
+            self.assertMatchesFullSolve()
+
+    def test_update_pathing(self):
+        self.grid_world.build_tower(1, 1)
+        self.grid_world.update_pathing()
+        self.assertMatchesFullSolve()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+"""Shortest-path helpers shared by the GridWorld path solvers.
+
+Tiles are plain ints, y * width + x.  The board is a bytearray with a 1 for
+every obstructed tile, and the neighbours of every tile are worked out once
+per board size in a TileTable that all boards of that size share.
+
+Creeps walk toward the endpoint over the 8 neighbouring tiles.  A diagonal
+step is only allowed if at least one of the two tiles it cuts past is open,
+and it costs sqrt(2) instead of 1.  Costs are whole numbers of 1/STEP
+tiles, so every solver adds them up exactly, whatever order it goes in.
+
+Every solver finds the distance from each tile to the endpoint and then
+picks the next hop with next_hop(), so they all hand creeps the same path."""
+import math
+from array import array
+from collections.abc import Mapping
+from heapq import heappush, heappop
+
+STEP = 1 << 16  # the cost of moving one tile across
+DIAGONAL_STEP = round(math.sqrt(2) * STEP)
+INF = 1 << 40  # the distance of a tile that can't reach the endpoint
+
+# (dx, dy, cost) for every move a creep can make.  Orthogonal moves come
+# first, and this order is what breaks ties between equally short next hops.
+MOVES = (
+    (0, -1, STEP),
+    (1, 0, STEP),
+    (0, 1, STEP),
+    (-1, 0, STEP),
+    (-1, -1, DIAGONAL_STEP),
+    (1, -1, DIAGONAL_STEP),
+    (1, 1, DIAGONAL_STEP),
+    (-1, 1, DIAGONAL_STEP),
+)
+
+# (dx, dy) of the 8 tiles around a tile, clockwise from the one above it,
+# so each is orthogonally next to the ones before and after it
+RING = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+
+TABLES = {}  # (width, height) -> TileTable
+
+
+def tile_table(width, height):
+    """The shared TileTable for a board size."""
+    table = TABLES.get((width, height))
+    if table is None:
+        table = TileTable(width, height)
+        TABLES[(width, height)] = table
+    return table
+
+
+class TileTable:
+    """Neighbour lookups for one board size."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.coords = [(i % width, i // width) for i in range(self.size)]
+
+        # per tile, a tuple of (neighbour, cost, corner, corner) in MOVES
+        # order.  The corners are the two tiles a diagonal cuts past; an
+        # orthogonal move lists its own target twice, which is always open
+        # by the time the corners get checked.
+        self.moves = []
+        # per tile, the in-bounds orthogonal and diagonal neighbours
+        self.orthogonal = []
+        self.diagonal = []
+
+        for x, y in self.coords:
+            moves = []
+            orthogonal = []
+            diagonal = []
+            for dx, dy, cost in MOVES:
+                nx, ny = x + dx, y + dy
+                if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                    continue
+                n = ny * width + nx
+                if dx and dy:
+                    moves.append((n, cost, y * width + nx, ny * width + x))
+                    diagonal.append(n)
+                else:
+                    moves.append((n, cost, n, n))
+                    orthogonal.append(n)
+            self.moves.append(tuple(moves))
+            self.orthogonal.append(tuple(orthogonal))
+            self.diagonal.append(tuple(diagonal))
+
+        # every neighbour, orthogonal first
+        self.around = [o + d for o, d in zip(self.orthogonal, self.diagonal)]
+
+        # per tile, the tiles around it in RING order, -1 off the board
+        self.ring = [tuple((y + dy) * width + x + dx
+                           if 0 <= x + dx < width and 0 <= y + dy < height
+                           else -1 for dx, dy in RING)
+                     for x, y in self.coords]
+
+    def index(self, x, y):
+        return y * self.width + x
+
+
+def shortest_distances(blocked, table, goal):
+    """Dijkstra outward from the goal tile.  Returns the path cost of every
+    tile as an array, INF for tiles that can't reach the goal."""
+    dist = array('q', [INF]) * table.size
+    dist[goal] = 0
+    moves = table.moves
+    frontier = [(0, goal)]
+
+    while frontier:
+        cost, current = heappop(frontier)
+        if cost > dist[current]:
+            continue  # stale entry, a shorter route was already found
+        for n, step, a, b in moves[current]:
+            if blocked[n] or (blocked[a] and blocked[b]):
+                continue
+            new_cost = cost + step
+            if new_cost < dist[n]:
+                dist[n] = new_cost
+                heappush(frontier, (new_cost, n))
+
+    return dist
+
+
+def next_hop(blocked, table, dist, tile):
+    """The neighbour of tile that lies on a shortest path to the goal, or -1
+    if there is none."""
+    best = -1
+    best_cost = INF
+    for n, step, a, b in table.moves[tile]:
+        if blocked[n] or (blocked[a] and blocked[b]):
+            continue
+        cost = dist[n] + step
+        if cost < best_cost:
+            best_cost = cost
+            best = n
+    return best
+
+
+def next_hops(blocked, table, goal, dist):
+    """The next hop of every tile as an int array.  The goal and tiles that
+    can't reach it get -1."""
+    hops = array('i', [-1]) * table.size
+    for tile in range(table.size):
+        if tile != goal and dist[tile] != INF:
+            hops[tile] = next_hop(blocked, table, dist, tile)
+    return hops
+
+
+class DijkstraSolver:
+    """Solves the whole board again after every change."""
+
+    def __init__(self, world):
+        self.world = world
+        self.dist = None
+
+    def reset(self):
+        world = self.world
+        self.dist = shortest_distances(world.blocked, world.tile_table,
+                                       world.goal)
+        world.next_hop[:] = next_hops(world.blocked, world.tile_table,
+                                      world.goal, self.dist)
+
+    def toggle(self, tile):
+        self.reset()
+
+    def distances(self):
+        return self.dist[:]
+
+    def load(self, dist):
+        self.dist = dist[:]
+
+
+def flatten(grid):
+    """Turn a nested grid[y][x] board of bools into a blocked bytearray."""
+    return bytearray(1 if cell else 0 for row in grid for cell in row)
+
+
+class TilePaths(Mapping):
+    """Read-only dict-style view of a GridWorld's next-hop array, keyed by
+    (x, y) like the old tilePaths dict: every tile that can reach the
+    endpoint maps to the next tile on its path, and the endpoint maps to
+    None."""
+
+    def __init__(self, world):
+        self.world = world
+
+    def __getitem__(self, tile):
+        world = self.world
+        x, y = tile
+        if 0 <= x < world.width and 0 <= y < world.height:
+            hop = world.next_hop[y * world.width + x]
+            if hop >= 0:
+                return world.tile_table.coords[hop]
+            if tile == world.endpoint:
+                return None
+        raise KeyError(tile)
+
+    def __iter__(self):
+        world = self.world
+        coords = world.tile_table.coords
+        hops = world.next_hop
+        for i in range(len(hops)):
+            if hops[i] >= 0 or coords[i] == world.endpoint:
+                yield coords[i]
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
@@ -0,0 +1,63 @@
+import unittest
+from engine.grid_world import GridWorld
+from engine.pathing import tile_table
+
+
+class TestPathing(unittest.TestCase):
+
+    def setUp(self):
+        self.grid_world = GridWorld(5, 4, (0, 0), (4, 3))
+
+    def test_tables_are_shared(self):
+        other = GridWorld(5, 4, (0, 0), (4, 3))
+        self.assertIs(self.grid_world.tile_table, other.tile_table)
+        self.assertIs(tile_table(5, 4), other.tile_table)
+
+    def test_corner_moves(self):
+        table = self.grid_world.tile_table
+        # tile 0 is (0, 0): right, down, then the diagonal down-right which
+        # cuts past (1, 0) and (0, 1)
+        self.assertEqual(table.moves[0][0][0], 1)
+        self.assertEqual(table.moves[0][1][0], 5)
+        self.assertEqual(table.moves[0][2][0], 6)
+        self.assertEqual(sorted(table.moves[0][2][2:]), [1, 5])
+
+    def test_tile_paths_view(self):
+        paths = self.grid_world.tilePaths
+        self.assertIsNone(paths[(4, 3)])
+        self.assertEqual(paths[(3, 2)], (4, 3))
+        self.assertEqual(len(paths), 20)
+        self.assertEqual(paths, self.grid_world.dijkstras_path(
+            self.grid_world.grid))
+
+        self.grid_world.build_tower(2, 2)
+        self.assertNotIn((2, 2), paths)
+        self.assertRaises(KeyError, lambda: paths[(2, 2)])
+        self.assertRaises(KeyError, lambda: paths[(5, 0)])
+        self.assertEqual(len(paths), 19)
+
+    def test_grid_view(self):
+        self.grid_world.build_tower(1, 2)
+        self.assertTrue(self.grid_world.grid[2][1])
+        self.assertTrue(self.grid_world.is_blocked(1, 2))
+        self.assertEqual(self.grid_world.blocked[2 * 5 + 1], 1)
+
+    def test_path_version(self):
+        world = self.grid_world
+        version = world.path_version
+        self.assertFalse(world.build_tower(4, 3))  # the endpoint
+        self.assertEqual(world.path_version, version)
+        world.build_tower(2, 2)
+        self.assertEqual(world.path_version, version + 1)
+        world.remove_tower(2, 2)
+        self.assertEqual(world.path_version, version + 2)
+
+    def test_path_message(self):
+        message = self.grid_world.get_path_message()
+        self.assertEqual(len(message), 20)
+        self.assertEqual(message[19], -1)  # the endpoint
+        self.assertEqual(message[2 * 5 + 3], 3 * 5 + 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
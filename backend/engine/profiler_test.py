@@ -0,0 +1,44 @@
+import unittest
+from engine.profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.t = 0.0
+        self.profiler = Profiler(window=10, clock=lambda: self.t)
+
+    def tick(self, *durations):
+        t = self.profiler.start()
+        for name, duration in durations:
+            self.t += duration
+            t = self.profiler.lap(name, t)
+
+    def test_laps_are_timed_per_phase(self):
+        self.tick(('creeps', 0.002), ('towers', 0.005))
+        self.tick(('creeps', 0.004), ('towers', 0.001))
+        report = self.profiler.report()
+        self.assertEqual(list(report), ['creeps', 'towers'])
+        self.assertEqual(report['creeps']['count'], 2)
+        self.assertAlmostEqual(report['creeps']['mean'], 0.003)
+        self.assertAlmostEqual(report['creeps']['max'], 0.004)
+        self.assertAlmostEqual(report['towers']['p50'], 0.001)
+
+    def test_percentiles_roll_over_the_window(self):
+        for _ in range(10):
+            self.tick(('towers', 1.0))
+        for i in range(10):
+            self.tick(('towers', 0.001 * (i + 1)))
+        stats = self.profiler.report()['towers']
+        self.assertEqual(stats['count'], 10)  # the slow laps are gone
+        self.assertAlmostEqual(stats['max'], 0.010)
+        self.assertAlmostEqual(stats['p50'], 0.005)
+        self.assertAlmostEqual(stats['p90'], 0.009)
+
+    def test_line(self):
+        self.tick(('messages', 0.0015))
+        self.assertIn('messages: p50 1.500', self.profiler.line())
+
+
+if __name__ == '__main__':
+    unittest.main()
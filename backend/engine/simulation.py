@@ -0,0 +1,180 @@
+"""Games without the network or the wall clock, as fast as the CPU goes.
+
+A Simulation is a GameRunner whose Network is a ScriptedNetwork: the
+messages it receives come from a script of (tick, message) pairs, written
+the way clients and the server send them, and what it sends is encoded to
+JSON (so that cost is still counted) and then counted, or kept if asked.
+Time is virtual: every tick is exactly TICK_LEN of game time, and the next
+one starts as soon as the last is done.
+
+    sim = Simulation(players=[1, 2], script=random_script([1, 2], 3000))
+    report = sim.run(3000)
+    report['ticks_per_second'], report['speedup']
+
+The same script always plays out the same way, so simulations can be
+soak tests, benchmarks and regression tests of the game logic.  From the
+command line, with a JSON lines script of {"tick": n, ...message}:
+
+    python -m engine.simulation script.jsonl --ticks 10000 --players 1 2
+"""
+import argparse
+import json
+import random
+from collections import deque
+from time import perf_counter
+from engine.message_enum import MSG
+from engine.tower_game import GameRunner, TICK_LEN
+from engine.util import dump_obj_dict
+from game_pieces.tower_factory import TOWER_CLASSES
+
+
+class ScriptedNetwork:
+    """Stands in for Network, without any sockets."""
+
+    def __init__(self, keep=False):
+        self.inbox = deque()
+        self.sent = 0  # messages sent
+        self.sent_bytes = 0  # characters of JSON sent
+        self.outbox = [] if keep else None  # the JSON sent, if kept
+
+    def deliver(self, msg):
+        """msg arrives, as if from the server."""
+        self.inbox.append(msg)
+
+    def receive(self):
+        if self.inbox:
+            return self.inbox.popleft()
+        return None
+
+    def pending(self):
+        return len(self.inbox)
+
+    def send_message(self, data):
+        self.send_json(self.encode(data))
+
+    def encode(self, data):
+        return json.dumps(data, default=dump_obj_dict)
+
+    def send_json(self, as_json):
+        self.sent += 1
+        self.sent_bytes += len(as_json)
+        if self.outbox is not None:
+            self.outbox.append(as_json)
+
+
+class Simulation:
+
+    def __init__(self, players=(1,), script=(), keep_output=False,
+                 tick_len=TICK_LEN, **runner_args):
+        self.network = ScriptedNetwork(keep_output)
+        # a time budget for messages would make how many get handled a
+        # tick depend on how fast the machine is; only count them
+        runner_args.setdefault('message_time_budget', float('inf'))
+        self.runner = GameRunner(network=self.network, **runner_args)
+        for player_id in players:
+            self.runner.add_player(player_id)
+        self.runner.started = True
+        self.tick_len = tick_len
+        self.tick = 0  # ticks run so far
+        # stable, so messages for the same tick arrive in script order
+        self.script = deque(sorted(script, key=lambda entry: entry[0]))
+
+    def run(self, ticks):
+        """Run ticks more ticks, delivering each scripted message at the
+        start of its tick.  Returns report() for these ticks."""
+        script = self.script
+        network = self.network
+        step = self.runner.game_loop
+        sent = network.sent
+        start = perf_counter()
+        for _ in range(ticks):
+            while script and script[0][0] <= self.tick:
+                network.deliver(script.popleft()[1])
+            step(self.tick_len)
+            self.tick += 1
+        return self.report(ticks, perf_counter() - start, network.sent - sent)
+
+    def report(self, ticks, seconds, sent):
+        rate = ticks / seconds if seconds else float('inf')
+        players = {}
+        for player_id in self.runner.player_states:
+            state = self.runner.playing(player_id)
+            if state is None:
+                players[player_id] = {'lost': True}
+                continue
+            players[player_id] = {
+                'lost': False,
+                'lives': state.lives,
+                'gold': state.gold,
+                'towers': len(state.all_towers),
+                'creeps': len(state.all_creeps),
+            }
+        return {
+            'ticks': ticks,
+            'seconds': seconds,
+            'ticks_per_second': rate,
+            'speedup': rate * self.tick_len,  # times faster than real time
+            'messages_sent': sent,
+            'game_time': self.tick * self.tick_len,
+            'players': players,
+        }
+
+
+def random_script(players, ticks, seed=0, builds=0.02, sends=0.002,
+                  width=16, height=12):
+    """A script of players building random towers (each tick, with chance
+    builds) and sending creeps at each other (chance sends)."""
+    rng = random.Random(seed)
+    towers = sorted(TOWER_CLASSES)
+    script = []
+    for tick in range(ticks):
+        for player_id in players:
+            if rng.random() < builds:
+                script.append((tick, {
+                    'type': MSG.tower_request.name,
+                    'player_id': player_id,
+                    'msg': {'x': rng.randrange(width),
+                            'y': rng.randrange(height),
+                            'towerID': rng.choice(towers)},
+                }))
+            if rng.random() < sends:
+                script.append((tick, {
+                    'type': MSG.creep_request.name,
+                    'player_id': player_id,
+                    'msg': {'creepID': 'Default'},
+                }))
+    return script
+
+
+def load_script(path):
+    """A script from a JSON lines file of {"tick": n, ...message}."""
+    script = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                msg = json.loads(line)
+                script.append((msg.pop('tick'), msg))
+    return script
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run a game headless from a script, as fast as possible.')
+    parser.add_argument('script', nargs='?',
+                        help='JSON lines of {"tick": n, ...message}; '
+                             'random builds and sends if left out')
+    parser.add_argument('--ticks', type=int, default=10000)
+    parser.add_argument('--players', type=int, nargs='+', default=[1])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.script:
+        script = load_script(args.script)
+    else:
+        script = random_script(args.players, args.ticks, args.seed)
+    sim = Simulation(args.players, script)
+    print(json.dumps(sim.run(args.ticks), indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
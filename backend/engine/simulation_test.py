@@ -0,0 +1,58 @@
+import json
+import time
+import unittest
+from engine.simulation import Simulation, random_script
+
+
+class TestSimulation(unittest.TestCase):
+
+    def test_scripted_build(self):
+        script = [(2, {'type': 'tower_request', 'player_id': 1,
+                       'msg': {'x': 5, 'y': 5, 'towerID': 'wall_tower'}})]
+        sim = Simulation(players=[1], script=script, keep_output=True)
+        report = sim.run(2)
+        self.assertEqual(report['players'][1]['towers'], 0)
+        self.assertEqual(report['messages_sent'], 2)  # the game updates
+
+        report = sim.run(1)
+        self.assertEqual(report['players'][1]['towers'], 1)
+        answer = json.loads(sim.network.outbox[2])
+        self.assertEqual(answer['type'], 'tower_update')
+        self.assertEqual(answer['towerAccepted'], 'true')
+        self.assertAlmostEqual(report['game_time'], 3 / 30.0)
+        self.assertGreater(report['ticks_per_second'], 0)
+
+    def test_same_script_same_game(self):
+        runs = []
+        for _ in range(2):
+            sim = Simulation(players=[1, 2], keep_output=True,
+                             script=random_script([1, 2], 600, seed=4))
+            report = sim.run(600)
+            runs.append((report['players'], sim.network.outbox))
+        self.assertEqual(runs[0], runs[1])
+
+
+    def test_bursts_play_out_the_same_however_slow_the_machine(self):
+        # more builds in one tick than the message budget, each one slow to
+        # arrive, enough that a time budget would have cut the tick short
+        script = [(0, {'type': 'tower_request', 'player_id': 1,
+                       'msg': {'x': x, 'y': y, 'towerID': 'wall_tower'}})
+                  for x in range(1, 15) for y in (3, 7)]
+        runs = []
+        for slow in (False, True):
+            sim = Simulation(players=[1], script=script, keep_output=True,
+                             message_budget=10)
+            if slow:
+                receive = sim.network.receive
+
+                def slow_receive(receive=receive):
+                    time.sleep(0.01)
+                    return receive()
+                sim.network.receive = slow_receive
+            sim.run(5)
+            runs.append(sim.network.outbox)
+        self.assertEqual(runs[0], runs[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Where the creeps of one board are, bucketed for towers to search.
+
+The board is cut into square cells of CELL tiles a side, and every creep is
+kept in the bucket of the cell its tile is in.  A tower looking for targets
+only visits the buckets its range overlaps, and checks squared distances,
+so finding targets costs the creeps near the tower instead of every creep
+on the board.  GameplayState moves a creep between buckets when it changes
+tiles, which is a lot rarer than every tick.  The index also counts the
+creeps on every tile, so GameplayState can tell which tiles have creeps on
+them without looking at the creeps.
+
+Creeps in range come back in the order they spawned (every creep is
+numbered as it's added), so towers can break ties between targets by who
+spawned first."""
+from itertools import count
+
+CELL = 4  # tiles per bucket side
+
+
+class CreepIndex:
+
+    def __init__(self, width, height, cell=CELL):
+        self.cell = cell
+        self.columns = -(-width // cell)
+        self.rows = -(-height // cell)
+        # per cell, creep -> the order it was added in
+        self.buckets = [{} for _ in range(self.columns * self.rows)]
+        self.where = {}  # creep -> (its bucket, its tile)
+        self.occupied = {}  # tile -> creeps on it, for tiles with any
+        self.order = count()
+
+    def bucket(self, loc):
+        return (loc[1] // self.cell) * self.columns + loc[0] // self.cell
+
+    def add(self, creep):
+        loc = creep.loc
+        b = self.bucket(loc)
+        self.buckets[b][creep] = next(self.order)
+        self.where[creep] = (b, loc)
+        self.occupied[loc] = self.occupied.get(loc, 0) + 1
+
+    def move(self, creep):
+        """The creep may have changed tiles."""
+        loc = creep.loc
+        old, old_loc = self.where[creep]
+        if loc == old_loc:
+            return
+        self.leave(old_loc)
+        self.occupied[loc] = self.occupied.get(loc, 0) + 1
+        b = self.bucket(loc)
+        if b != old:
+            self.buckets[b][creep] = self.buckets[old].pop(creep)
+        self.where[creep] = (b, loc)
+
+    def remove(self, creep):
+        b, loc = self.where.pop(creep)
+        del self.buckets[b][creep]
+        self.leave(loc)
+
+    def leave(self, loc):
+        left = self.occupied[loc] - 1
+        if left:
+            self.occupied[loc] = left
+        else:
+            del self.occupied[loc]
+
+    def candidates(self, x, y, reach):
+        """(order, creep) for every live creep within reach of tile (x, y),
+        in no particular order."""
+        cell = self.cell
+        reach2 = reach * reach
+        left = max(0, int((x - reach) // cell))
+        right = min(self.columns - 1, int((x + reach) // cell))
+        top = max(0, int((y - reach) // cell))
+        bottom = min(self.rows - 1, int((y + reach) // cell))
+        found = []
+        for row in range(top, bottom + 1):
+            start = row * self.columns
+            for bucket in self.buckets[start + left:start + right + 1]:
+                for creep, order in bucket.items():
+                    cx, cy = creep.loc
+                    if (cx - x) ** 2 + (cy - y) ** 2 <= reach2 and creep.live:
+                        found.append((order, creep))
+        return found
+
+    def in_range(self, x, y, reach):
+        """Every live creep within reach of tile (x, y), in spawn order."""
+        found = self.candidates(x, y, reach)
+        found.sort(key=lambda pair: pair[0])
+        return [creep for _, creep in found]
+
+    def first_in_range(self, x, y, reach):
+        """The first creep to spawn of the live ones within reach, or None."""
+        found = self.candidates(x, y, reach)
+        if not found:
+            return None
+        return min(found, key=lambda pair: pair[0])[1]
+
+    def any_at(self, loc):
+        """True if a live creep is on tile loc."""
+        for creep in self.buckets[self.bucket(loc)]:
+            if creep.loc == loc and creep.live:
+                return True
+        return False
+
+    def __len__(self):
+        return len(self.where)
@@ -0,0 +1,78 @@
+import random
+import unittest
+from engine.spatial_index import CreepIndex
+
+
+class Creep:
+
+    def __init__(self, loc):
+        self.loc = loc
+        self.live = True
+
+
+class TestCreepIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(3)
+        self.index = CreepIndex(23, 17, cell=4)
+        self.creeps = []
+        for _ in range(300):
+            self.add(self.random_loc())
+
+    def random_loc(self):
+        return (self.rng.randrange(23), self.rng.randrange(17))
+
+    def add(self, loc):
+        creep = Creep(loc)
+        self.creeps.append(creep)
+        self.index.add(creep)
+
+    def scan(self, x, y, reach):
+        return [c for c in self.creeps if c.live and
+                ((c.loc[0] - x) ** 2 + (c.loc[1] - y) ** 2) ** .5 <= reach]
+
+    def test_same_as_scan(self):
+        for reach in [0, 1, 1.5, 2, 3.5, 7, 40]:
+            for _ in range(20):
+                x, y = self.random_loc()
+                self.assertEqual(self.index.in_range(x, y, reach),
+                                 self.scan(x, y, reach))
+
+    def test_moves_and_deaths(self):
+        for creep in self.rng.sample(self.creeps, 100):
+            creep.loc = self.random_loc()
+            self.index.move(creep)
+        for creep in self.rng.sample(self.creeps, 50):
+            creep.live = False
+        for creep in self.rng.sample(self.creeps, 50):
+            if not creep.live:
+                self.index.remove(creep)
+        for _ in range(50):
+            x, y = self.random_loc()
+            expected = self.scan(x, y, 3)
+            self.assertEqual(self.index.in_range(x, y, 3), expected)
+            self.assertEqual(self.index.first_in_range(x, y, 3),
+                             expected[0] if expected else None)
+
+    def test_occupied(self):
+        for creep in self.rng.sample(self.creeps, 100):
+            creep.loc = self.random_loc()
+            self.index.move(creep)
+        for creep in self.creeps[:50]:
+            self.index.remove(creep)
+        counts = {}
+        for creep in self.creeps[50:]:
+            counts[creep.loc] = counts.get(creep.loc, 0) + 1
+        self.assertEqual(self.index.occupied, counts)
+
+    def test_any_at(self):
+        creep = self.creeps[0]
+        self.assertTrue(self.index.any_at(creep.loc))
+        for other in self.creeps:
+            if other.loc == creep.loc:
+                other.live = False
+        self.assertFalse(self.index.any_at(creep.loc))
+
+
+if __name__ == '__main__':
+    unittest.main()
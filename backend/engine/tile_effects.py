@@ -1,16 +1,114 @@
-#this class keeps an array of tile effects that are currently affecting a tile.
-class tile_effects():
+"""The effects (fire, stun, ...) burning on the tiles of a GridWorld.
 
+Only tiles that have an effect on them are stored, so a mostly empty board
+costs nothing per tick.  Every effect lasts effect.counter ticks from when
+it's added and expires off a heap, and adding an effect of a type the tile
+already has refreshes the one that's there instead of stacking another.
 
-    def __init__(self):
-        self.effects = []
-        #self.effects.append(fire(25)) #Please note that this is for testing purposes. It sets everything on fire.
+What the effects do to creeps is kept as two per-tile fields, the damage a
+creep standing there takes each tick and whether it gets stunned.  They're
+rewritten for a tile only when its effects change, and apply() hits every
+creep with them in one gather by tile, instead of asking every effect
+about every creep.  The fields are NumPy arrays when NumPy is installed
+and plain arrays when it isn't."""
+from array import array
+from heapq import heappush, heappop
+from engine.effects import stun_creep
+try:
+    import numpy as np
+except ImportError:  # NumPy isn't installed
+    np = None
 
-    #adds the effect to the effects on the tile
-    def append(self, effect):
-        self.effects.append(effect)
 
-        #iterates through the effects and calls their update methods
+class TileEffects:
+
+    def __init__(self, table):
+        self.table = table
+        self.now = 0  # ticks since the board was made
+        # tile -> {effect type: effect}, in the order they were first added
+        self.active = {}
+        # (tick it runs out, tile, effect type).  A refresh pushes a new
+        # entry and leaves the old one to be skipped when it comes up.
+        self.expiry = []
+
+        # per tile, damage per tick and 1 where creeps get stunned
+        if np is not None:
+            self.damage = np.zeros(table.size)
+            self.stuns = np.zeros(table.size, dtype=bool)
+        else:
+            self.damage = array('d', bytes(8 * table.size))
+            self.stuns = bytearray(table.size)
+
+    def add(self, tile, effect):
+        effects = self.active.setdefault(tile, {})
+        current = effects.get(effect.type)
+        if current is None:
+            effects[effect.type] = current = effect
+        else:
+            current.refresh(effect)
+        current.expires = self.now + current.counter
+        heappush(self.expiry, (current.expires, tile, current.type))
+        self.update_fields(tile)
+
+    def at(self, tile):
+        """The effects on a tile."""
+        effects = self.active.get(tile)
+        return list(effects.values()) if effects else []
+
     def update(self):
-        for i in range(0,len(self.effects)): 
-            self.effects[i].update()
\ No newline at end of file
+        """Move on a tick and drop every effect that has run out."""
+        self.now += 1
+        active = self.active
+        expiry = self.expiry
+        while expiry and expiry[0][0] <= self.now:
+            expires, tile, kind = heappop(expiry)
+            effects = active.get(tile)
+            if effects is None or kind not in effects:
+                continue
+            if effects[kind].expires != expires:
+                continue  # refreshed since, a later entry covers it
+            del effects[kind]
+            if not effects:
+                del active[tile]
+            self.update_fields(tile)
+
+    def update_fields(self, tile):
+        effects = self.at(tile)
+        self.damage[tile] = sum(e.damage for e in effects)
+        self.stuns[tile] = any(e.stuns for e in effects)
+
+    def apply(self, creeps, state):
+        """Hit every creep in creeps (all live) with the effects on its
+        tile."""
+        if not self.active or not creeps:
+            return
+        width = self.table.width
+        if np is not None:
+            tiles = np.fromiter((c.loc[1] * width + c.loc[0] for c in creeps),
+                                dtype=np.intp, count=len(creeps))
+            damage = self.damage[tiles]
+            stuns = self.stuns[tiles]
+            hit = np.flatnonzero((damage > 0) | stuns).tolist()
+            damage = damage.tolist()
+            stuns = stuns.tolist()
+        else:
+            tiles = [c.loc[1] * width + c.loc[0] for c in creeps]
+            damage = [self.damage[t] for t in tiles]
+            stuns = [self.stuns[t] for t in tiles]
+            hit = [i for i in range(len(tiles)) if damage[i] > 0 or stuns[i]]
+
+        for i in hit:
+            creep = creeps[i]
+            creep.take_damage(damage[i], state)
+            if stuns[i]:
+                stun_creep(creep, state)
+
+    def summary(self):
+        """(x, y, type of its first effect) for every tile with effects,
+        ordered by x then y."""
+        coords = self.table.coords
+        return sorted(coords[tile] + (next(iter(effects)),)
+                      for tile, effects in self.active.items())
+
+    def __len__(self):
+        return sum(len(effects) for effects in self.active.values())
@@ -0,0 +1,98 @@
+import unittest
+from engine.effects import fire, stun
+from engine.grid_world import GridWorld
+from game_pieces.creep import Creep
+from modifiers.modifier_engine import ModifierEngine
+
+
+class Gold:
+    gold = 0
+
+    def __init__(self):
+        self.modifier_engine = ModifierEngine()
+
+
+class TestTileEffects(unittest.TestCase):
+
+    def setUp(self):
+        self.grid_world = GridWorld(5, 4, (0, 0), (4, 3))
+        self.effects = self.grid_world.effects
+
+    def tick(self, times):
+        for _ in range(times):
+            self.grid_world.update_effects()
+
+    def test_only_tiles_with_effects_are_kept(self):
+        self.assertEqual(len(self.effects.active), 0)
+        self.grid_world.add_effect((2, 1), 'fire')
+        self.assertEqual(list(self.effects.active), [1 * 5 + 2])
+        self.assertEqual(self.grid_world.process_effects(), [(2, 1, 'fire')])
+        self.assertEqual(self.grid_world.get_effects(0, 0), [])
+
+    def test_expiry(self):
+        self.effects.add(3, fire(1, counter=5))
+        self.tick(4)
+        self.assertEqual(len(self.effects), 1)
+        self.tick(1)
+        self.assertEqual(len(self.effects), 0)
+        self.assertEqual(self.effects.active, {})
+
+    def test_same_type_refreshes(self):
+        self.effects.add(3, fire(1, counter=5))
+        self.tick(3)
+        self.effects.add(3, fire(2, counter=5))
+        self.assertEqual(len(self.effects), 1)
+        self.assertEqual(self.effects.at(3)[0].damage, 2)
+        # the first add's expiry comes and goes without taking it away
+        self.tick(4)
+        self.assertEqual(len(self.effects), 1)
+        self.tick(1)
+        self.assertEqual(len(self.effects), 0)
+        self.assertEqual(self.effects.expiry, [])
+
+    def test_different_types_stack(self):
+        self.grid_world.add_effect((1, 1), 'fire')
+        self.grid_world.add_effect((1, 1), 'stun')
+        self.grid_world.add_effect((1, 1), 'stun')
+        kinds = [e.type for e in self.grid_world.get_effects(1, 1)]
+        self.assertEqual(kinds, ['fire', 'stun'])
+        self.assertEqual(self.grid_world.process_effects(), [(1, 1, 'fire')])
+
+    def test_summary_order(self):
+        self.effects.add(2 * 5 + 0, stun(1))
+        self.effects.add(0 * 5 + 3, fire(1))
+        self.effects.add(1 * 5 + 0, fire(1))
+        self.assertEqual(self.grid_world.process_effects(),
+                         [(0, 1, 'fire'), (0, 2, 'stun'), (3, 0, 'fire')])
+
+    def test_fields_follow_effects(self):
+        self.effects.add(7, fire(1.5, counter=2))
+        self.effects.add(7, stun(2, counter=1))
+        self.assertEqual(self.effects.damage[7], 3.5)
+        self.assertTrue(self.effects.stuns[7])
+        self.tick(1)
+        self.assertEqual(self.effects.damage[7], 1.5)
+        self.assertFalse(self.effects.stuns[7])
+        self.tick(1)
+        self.assertEqual(self.effects.damage[7], 0)
+
+    def test_apply(self):
+        creeps = [Creep.factory('Default', i) for i in range(3)]
+        creeps[1].loc = (2, 1)
+        creeps[2].loc = (3, 3)
+        self.grid_world.add_effect((0, 0), 'fire')
+        self.grid_world.add_effect((2, 1), 'fire')
+        self.grid_world.add_effect((2, 1), 'stun')
+        state = Gold()
+        for _ in range(2):
+            self.grid_world.apply_effects(creeps, state)
+        self.assertEqual(creeps[0].health, 99)
+        self.assertEqual(creeps[1].health, 100 - 2 * 10.5)
+        self.assertEqual(creeps[2].health, 100)
+        # stunned twice, but it's the one stun refreshed
+        self.assertEqual(len(creeps[1].modifiers), 1)
+        self.assertEqual(creeps[1].speed, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,10 @@
 """This file acts as the main entrance point to the server."""
 import threading
-from engine.clock import Clock
+from time import perf_counter
+from engine.clock import Clock, Histogram, COUNTS
+from engine.profiler import Profiler
 # from game_states.main_menu import MainMenu
 # from game_states.gameplay_state import GameplayState
-from engine.network import Network
 from game_pieces.levels import Levels
 from game_states.gameplay_state import GameplayState
 from game_states.lose_state import LoseState
@@ -11,7 +12,10 @@ from engine.message_enum import MSG
 
 # Define our globals
 TPS = 30  # ticks per second
-TICK_LEN = 1.0 / TPS  # never update more fequently than this interval
+TICK_LEN = 1.0 / TPS  # game time every update moves on by
+MAX_CATCH_UP = 5  # most ticks run back to back when the loop falls behind
+MESSAGE_BUDGET = 100  # most messages handled in one tick
+MESSAGE_TIME_BUDGET = 0.005  # seconds a tick may spend handling messages
 WORLD_WIDTH = 16
 WORLD_HEIGHT = 12
 
@@ -23,12 +27,31 @@ class GameRunner:
     to the game engine loop to the websocket client that connects the
     game engine loop to the server."""
 
-    def __init__(self, print_gametick=False, print_on_receive=False, create_server=True):
-        self.network = Network(create_server)
+    def __init__(self, print_gametick=False, print_on_receive=False, create_server=True,
+                 message_budget=MESSAGE_BUDGET, message_time_budget=MESSAGE_TIME_BUDGET,
+                 host=None, network=None):
+        if network is None:
+            # only imported here so headless games (see simulation.py) don't
+            # need the websocket server
+            from engine.network import Network
+            network = Network(create_server)
+        self.network = network
+        # the GameHost stepping this game along with others, if there is
+        # one; new games are then handed to it instead of getting a thread
+        self.host = host
+        self.started = False  # the lobby has started the game
         self.print_gametick = print_gametick
         self.print_on_receive = print_on_receive
+        # every tick handles what came in until the queue is empty or one of
+        # these runs out; the rest waits for the next tick
+        self.message_budget = message_budget
+        self.message_time_budget = message_time_budget
+        self.queue_depth = Histogram(COUNTS)  # messages waiting, every tick
+        self.drained = Histogram(COUNTS)  # messages handled, every tick
         self.game_states = []
         self.player_states = {}
+        self.clock = None  # paces the game loop once the game has started
+        self.profiler = Profiler()  # how long each phase of game_loop takes
 
     def add_player(self, player_id):
         """Add a player to the game by giving them their own state."""
@@ -50,38 +73,50 @@ class GameRunner:
 
     def run(self):
         # wait until a request comes in to start the game, then start the game
-        while True:
+        while not self.poll_lobby():
+            pass
+        self.start_game()
+
+    def poll_lobby(self):
+        """Handle the messages waiting for a game that hasn't started yet,
+        until there are none left or one starts the game.  Returns whether
+        the game has started."""
+        while not self.started:
             message = self.network.receive()
-            if message:
-                print('game received message: {}'.format(message))
-            if message and message['type'] == MSG.game_start_request.name:
-                self.start_game()
+            if not message:
                 break
-            elif message and message['type'] == MSG.instance_request.name:
+            print('game received message: {}'.format(message))
+            if message['type'] == MSG.game_start_request.name:
+                self.started = True
+                print('starting game.')
+            elif message['type'] == MSG.instance_request.name:
                 self.spawn_new_game()
-            elif message and message['type'] == MSG.game_add_player.name:
+            elif message['type'] == MSG.game_add_player.name:
                 player_id = message['player_id']
                 self.add_player(player_id)
-            elif message and message['type'] == MSG.game_remove_player.name:
+            elif message['type'] == MSG.game_remove_player.name:
                 player_id = message['player_id']
                 self.remove_player(player_id)
+        return self.started
 
     def spawn_new_game(self):
         print('spawning new game instance')
+        if self.host is not None:
+            self.host.spawn()
+            return
         new_game = GameRunner(create_server=False)
         t = threading.Thread(target=new_game.run)
         t.daemon = True
         t.start()
 
     def start_game(self):
-        print('starting game.')
-        clock = Clock(TICK_LEN)
-        clock.tick()  # tick once to initialize counter
+        self.clock = Clock(TICK_LEN, MAX_CATCH_UP)
 
         try:
             while True:
-                dt = clock.tick()
-                self.game_loop(dt)
+                self.clock.run(self.game_loop)
+                if self.print_gametick:
+                    print('game tick {}: {}'.format(self.clock.steps, self.timing()))
 
         except KeyboardInterrupt:
             pass
@@ -89,12 +124,53 @@ class GameRunner:
             # do any cleanup you want to do here
             pass
 
+    def timing(self):
+        """How the game loop is keeping up: steps run and dropped, and
+        histograms of how late each tick started and how long each took.
+        None before the game starts."""
+        return self.clock.stats() if self.clock else None
+
+    def message_stats(self):
+        """How many messages were waiting at the start of each tick and how
+        many each tick got through, and how many are waiting now."""
+        return {
+            'pending': self.network.pending(),
+            'queue_depth': self.queue_depth.summary(),
+            'drained': self.drained.summary(),
+        }
+
+    def profile(self):
+        """The rolling percentiles of every phase of the game loop, and of
+        every phase of each player's update."""
+        return {
+            'game': self.profiler.report(),
+            'players': {player: state.profiler.report()
+                        for player, state in self.player_states.items()
+                        if hasattr(state, 'profiler')},
+        }
+
+    def log_profile(self):
+        """Write the profile to the log, a line for the game loop and one
+        per player."""
+        print('[{}] game loop: {}'.format(INFO_ID, self.profiler.line()))
+        for player, state in self.player_states.items():
+            if hasattr(state, 'profiler'):
+                print('[{}] player {}: {}'.format(
+                    INFO_ID, player, state.profiler.line()))
+
+    def playing(self, player_id):
+        """The player's GameplayState, or None once they've lost."""
+        state = self.player_states.get(player_id)
+        return state if isinstance(state, GameplayState) else None
+
     def process_message(self, msg):
         if msg['type'] == MSG.tower_request.name:
             player_id = msg['player_id']
-            state = self.player_states[player_id]
             x, y = msg['msg']['x'], msg['msg']['y']
             if msg['msg']['towerID'] == 'delete_tower':
+                state = self.playing(player_id)
+                if state is None:
+                    return
                 # request to delete a tower that's already present
                 state.delete_tower((x, y))
                 self.network.send_message(
@@ -107,23 +183,7 @@ class GameRunner:
                     }
                 )
             else:
-                tower = state.build_tower((x, y), msg['msg']['towerID'])
-                towerUpdate = None
-                if tower:
-                    towerUpdate = {
-                        'type': 'tower_update',
-                        'towerAccepted': 'true',
-                        'tower': tower,
-                        'player_id': player_id
-                    }
-                else:
-                    towerUpdate = {
-                        'type': 'tower_update',
-                        'towerAccepted': 'false',
-                        'reason': 'TODO',
-                        'player_id': player_id
-                    }
-                self.network.send_message(towerUpdate)
+                self.build_towers(player_id, [msg])
         elif msg['type'] == MSG.instance_request.name:
             self.spawn_new_game()
         elif msg['type'] == MSG.game_add_player.name:
@@ -136,15 +196,86 @@ class GameRunner:
             player_id = msg['player_id']
             creep_type = msg['msg']['creepID']
             for player in self.player_states:
-                if player != player_id:
-                    state = self.player_states[player]
+                state = self.playing(player)
+                if player != player_id and state is not None:
                     state.spawn_creep(creep_type)
+        elif msg['type'] == MSG.resync_request.name:
+            # updates go to the whole lobby, so everyone's board is resent
+            for state in self.player_states.values():
+                state.resync()
+        elif msg['type'] == MSG.profile_request.name:
+            self.log_profile()
+
+    def build_towers(self, player_id, msgs):
+        """Build what a player's tower requests ask for, all with one path
+        recompute, and answer each."""
+        state = self.playing(player_id)
+        if state is None:
+            towers = [False] * len(msgs)
+        else:
+            towers = state.build_towers(
+                [((msg['msg']['x'], msg['msg']['y']), msg['msg']['towerID'])
+                 for msg in msgs])
+        for tower in towers:
+            towerUpdate = None
+            if tower:
+                towerUpdate = {
+                    'type': 'tower_update',
+                    'towerAccepted': 'true',
+                    'tower': tower,
+                    'player_id': player_id
+                }
+            else:
+                towerUpdate = {
+                    'type': 'tower_update',
+                    'towerAccepted': 'false',
+                    'reason': 'TODO',
+                    'player_id': player_id
+                }
+            self.network.send_message(towerUpdate)
+
+    def drain_messages(self, time_budget=None):
+        """Handle the messages that came in since the last tick, oldest
+        first, until there are none left or the tick's budget runs out.
+
+        A player's tower builds are held back and built together, with one
+        path recompute, just before the next of that player's other
+        messages (so a delete and a build on the same tile still happen in
+        order) or at the end.  time_budget, if given, is used instead of
+        message_time_budget.  Returns how many messages were handled."""
+        if time_budget is None:
+            time_budget = self.message_time_budget
+        network = self.network
+        self.queue_depth.record(network.pending())
+        deadline = perf_counter() + time_budget
+        builds = {}  # player -> their tower builds waiting to go in
+        handled = 0
+        while handled < self.message_budget:
+            msg = network.receive()
+            if msg is None:
+                break
+            handled += 1
+            player_id = msg.get('player_id')
+            if (msg['type'] == MSG.tower_request.name and
+                    msg['msg']['towerID'] != 'delete_tower'):
+                builds.setdefault(player_id, []).append(msg)
+            else:
+                if player_id in builds:
+                    self.build_towers(player_id, builds.pop(player_id))
+                self.process_message(msg)
+            if perf_counter() >= deadline:
+                break
+        for player_id, msgs in builds.items():
+            self.build_towers(player_id, msgs)
+        self.drained.record(handled)
+        return handled
 
-    def game_loop(self, dt):
+    def game_loop(self, dt, message_time_budget=None):
+        profiler = self.profiler
+        start = t = profiler.start()
         # Receive and process messages from clients
-        message = self.network.receive()
-        if message:
-            self.process_message(message)
+        self.drain_messages(message_time_budget)
+        t = profiler.lap('messages', t)
 
         # Update game 1 tick and pass to clients
         for player in self.player_states:
@@ -152,6 +283,11 @@ class GameRunner:
             data = state.update(dt, [])
             if state.is_dead():
                 self.player_states[player] = LoseState()
+            t = profiler.lap('update', t)
 
             if data is not None:  # will be None if the player is dead
-                self.network.send_message(data)
+                as_json = self.network.encode(data)
+                t = profiler.lap('encode', t)
+                self.network.send_json(as_json)
+                t = profiler.lap('send', t)
+        profiler.lap('tick', start)
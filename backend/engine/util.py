@@ -118,6 +118,13 @@ def dump_obj_dict(obj):
     # if isinstance(obj, type(enum)): # TODO: eventually support raw enums and not their string names
         # return obj.name
     if isinstance(obj, list):
-        return [it.__dict__ for it in obj]
+        return [obj_dict(it) for it in obj]
     else:
-        return obj.__dict__
+        return obj_dict(obj)
+
+
+def obj_dict(obj):
+    # objects without a __dict__ of their own (like creep views) say what to send
+    if hasattr(obj, 'json_dict'):
+        return obj.json_dict()
+    return obj.__dict__
@@ -13,39 +13,42 @@ with the server.  The organization looks like of like this:
 
 import asyncio
 import threading
-from multiprocessing import Process
 from autobahn.asyncio.websocket import WebSocketClientProtocol, WebSocketClientFactory
 from collections import deque
 from engine.util import info
 
-# the event loop on which this client will run; this is a threading thing
-# i.e., the spawned thread runs the methods in this loop forever
-# we can make the thread do stuff by adding them to the loop, which is sort of
-# like a "to do" queue
+# the event loop every gameloop client runs on, in one background thread
+# however many games there are; this is a threading thing i.e., the thread
+# runs the methods in this loop forever, and we can make it do stuff by adding
+# them to the loop, which is sort of like a "to do" queue
 client_loop = None
-client_protocol = None
+client_lock = threading.Lock()
 
 INFO_ID = 'client'
+OPEN_TIMEOUT = 10  # seconds to wait for the server to accept a connection
 
 
-def get_client_protocol():
-    assert client_protocol is not None
-    return client_protocol
-
+def get_client_loop():
+    """The shared client loop, started the first time it's asked for."""
+    global client_loop
+    with client_lock:
+        if client_loop is None:
+            client_loop = asyncio.new_event_loop()
+            t = threading.Thread(target=run_client_loop, args=(client_loop,))
+            t.daemon = True
+            t.start()
+    return client_loop
 
-def start_client_thread(address="127.0.0.1", port=9000):
-    # address and port are those of the server
 
-    # start the client running in a new process
-    # p = Process(target=start_client, args=(address, port))
-    # p.start()
-    # print("client was started.")
-    t = threading.Thread(target=start_client, args=(address, port))
-    t.daemon = True
-    t.start()
+def run_client_loop(loop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
 
 
-def start_client(address, port):
+def connect(address="127.0.0.1", port=9000):
+    """Opens a new connection to the server (at address and port) on the
+    shared client loop, and returns its protocol once the server has
+    accepted it.  Must not be called from the client loop itself."""
     # see http://autobahn.ws/python/websocket/programming.html
 
     # because starting a client requires an integer port,
@@ -53,25 +56,18 @@ def start_client(address, port):
     if isinstance(port, str):
         port = int(port)
 
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop = asyncio.get_event_loop()
-
-    global client_loop
-    client_loop = loop
-
+    loop = get_client_loop()
     composite_address = 'ws://' + address + ':' + str(port)
     info('client connecting to {}'.format(composite_address), INFO_ID)
-    factory = WebSocketClientFactory(composite_address)
+    factory = WebSocketClientFactory(composite_address, loop=loop)
     factory.protocol = GameClientProtocol
 
-    info("client creating connection to address {} and port {}".format(
-        address, str(port)), INFO_ID)
     coro = loop.create_connection(factory, address, port)
-
-    global client_protocol
-    transport, client_protocol = loop.run_until_complete(coro)
-    loop.run_forever()
+    transport, protocol = asyncio.run_coroutine_threadsafe(coro, loop).result()
+    if not protocol.opened.wait(OPEN_TIMEOUT):
+        raise ConnectionError('server at {} never opened the connection'.format(
+            composite_address))
+    return protocol
 
 
 class GameClientProtocol(WebSocketClientProtocol):
@@ -79,6 +75,7 @@ class GameClientProtocol(WebSocketClientProtocol):
     def __init__(self):
         super(self.__class__, self).__init__()
         self.message_que = deque([])
+        self.opened = threading.Event()  # set once the handshake is done
 
     def receive_message(self):
         if self.message_que:
@@ -87,6 +84,7 @@ class GameClientProtocol(WebSocketClientProtocol):
 
     def onOpen(self):
         info("opened connection {}".format(self), INFO_ID)
+        self.opened.set()
 
     def onMessage(self, payload, isBinary):
         assert isBinary is False
@@ -1,58 +1,61 @@
 # this will store data about the different varieties of creeps
-# I don't know if I like this way of designating types, but it works for now
+# One CreepType is shared by every creep of that type; creeps only keep what changes as they go.
+from collections import namedtuple
 import engine.util
+
+CreepType = namedtuple('CreepType', ['name', 'speed', 'health', 'bounty'])
+
+# the types Creep.factory makes, by the names clients and levels use
 CREEP_TYPES = {
-    'basic': {'speed': 10, 'health': 100},
-    'medium': {'speed': 10, 'health': 150},
-    'advanced': {'speed': 10, 'health': 300},
+    "Default": CreepType("default", .05, 100, 15),
+    "Strong": CreepType("strong", .01, 500, 30),
+    "Weak": CreepType("weak", .02, 50, 30),
 }
 
 
 class Creep:
     """So far this is just an example implementation"""
 
+    __slots__ = ('kind', 'loc', 'speed', 'health', 'cellPos', 'id', 'live', 'modifiers')
+
     def factory(type,id):
-        if type == "Default": return Creep((0,0),"default",.05,100,id, 15)
-        if type == "Strong": return Creep((0,0),"strong",.01,500,id,30)
-        if type == "Weak": return Creep((0,0),"weak",.02,50,id,30)
+        if type in CREEP_TYPES:
+            return Creep(CREEP_TYPES[type], id)
 
     factory = staticmethod(factory)
 
-    def __init__(self, loc, creep_type, speed, health,id, bounty):
+    def __init__(self, kind, id, loc=(0,0)):
+        self.reset(kind, id, loc)
+
+    # sets the creep up from scratch, so dead creeps can be used again (see CreepPool)
+    def reset(self, kind, id, loc=(0,0)):
+        self.kind = kind
         self.loc = loc
-        self.type = creep_type
-        self.speed = speed # Gotta go fast
-        self.base_speed = speed # needed for slow modifiers
-        self.health = health
+        self.speed = kind.speed # Gotta go fast
+        self.health = kind.health
         self.cellPos = (0,0)
         self.id = id # The unique ID of the creep
-        self.bounty = bounty
         self.live = True
         self.modifiers = []
 
+    # the same for every creep of a type, so they're read off the kind
+    @property
+    def type(self):
+        return self.kind.name
+
+    @property
+    def base_speed(self): # needed for slow modifiers
+        return self.kind.speed
+
+    @property
+    def bounty(self):
+        return self.kind.bounty
 
-    #Calls creep move on all the effect tiles.????
-    def creepMove(self, gamestate):
-        temp = gamestate.world.effects[self.loc[0]][self.loc[1]].effects
-        for i in range(0, len(temp)):
-            gamestate.world.effects[self.loc[0]][self.loc[1]].effects[i].on_move(self,gamestate)
 
     # We generate a json for movement. Passed up to the gameplay_state
     def update(self, path, dt, gameState):
         if self.live:
-
-            #Update counters for creep modifiers
-            for i in range(0, len(self.modifiers)):
-                self.modifiers[i].update(self.id, gameState)
-
-            # Remove the expired modifiers
-            a = self.modifiers
-            for b in reversed(a):
-                if b.counter <0:
-                    a.remove(b)
-            self.modifiers = a
-
-
+            # modifiers have already set the speed, see ModifierEngine
 
          #   print(self.cellPos)
             direction = (self.dest(path)[0]-self.loc[0], self.dest(path)[1]-self.loc[1])    #figure out in-cell movement vector
@@ -78,7 +81,6 @@ class Creep:
             else: #then edgeConf[1] holds the direction
                 self.cellPos = (self.cellPos[0] + (self.speed*edgeConf[1][0]), self.cellPos[1] + (self.speed*edgeConf[1][1])) # move position in cell
 
-            self.creepMove(gameState)
             return {self.id : self.loc} , {self.id : (self.cellPos)}
 
     def move_to_dest(self, dest):
@@ -92,11 +94,6 @@ class Creep:
     def dest(self, path):
         return path[self.loc]
 
-    #The creep has an array of modifiers and we append the modifications to this array. For each tick, we check if the modifier has expired.
-    #If it has not expired, we renew the effect for another tick.
-    def modify(self, modification):
-        self.modifiers.append(modification)
-
     def take_damage(self, amount, gameState):
         self.health -= amount
         if (self.health <= 0):
@@ -119,5 +116,51 @@ class Creep:
     def get_position(self):
         return self.loc[0], self.loc[1]
 
+    # what gets sent to clients, the fields creeps used to keep in __dict__
+    def json_dict(self):
+        return {
+            'loc': self.loc,
+            'type': self.type,
+            'speed': self.speed,
+            'base_speed': self.base_speed,
+            'health': self.health,
+            'cellPos': self.cellPos,
+            'id': self.id,
+            'bounty': self.bounty,
+            'live': self.live,
+            'modifiers': self.modifiers,
+        }
+
     def __str__(self):  # like toString() in Java
         return 'speed,loc,health,cellpos: ' + str(self.speed) + ',' + str(self.loc) + ',' + str(self.health) + ',' + str(self.cellPos)
+
+
+class CreepPool:
+    """Creeps that have died or escaped, kept to be handed out again instead
+    of making new ones.  Every Levels has its own, so games on different
+    threads never share one; the level gets its creeps from it and
+    GameplayState gives them back once they're off the board."""
+
+    def __init__(self, limit=10000):
+        self.limit = limit  # most free creeps kept around
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    # a creep of a Creep.factory type, None if there's no such type
+    def get(self, type, id):
+        if type not in CREEP_TYPES:
+            return None
+        if not self.free:
+            self.created += 1
+            return Creep.factory(type, id)
+        self.reused += 1
+        creep = self.free.pop()
+        creep.reset(CREEP_TYPES[type], id)
+        return creep
+
+    # takes a creep back; nothing else may still be using it
+    def release(self, creep):
+        if len(self.free) < self.limit:
+            self.free.append(creep)
+
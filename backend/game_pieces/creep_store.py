@@ -0,0 +1,279 @@
+"""Creeps kept as parallel NumPy arrays, for boards with a lot of them.
+
+Instead of one Creep object each, every creep is a row in a set of arrays
+(tile, position in the cell, speed, health, alive, bounty), and a tick moves
+all of them along the board's next-hop field at once.  The movement is the
+same as Creep.update and engine.util.edge, worked per axis:
+
+- a creep heading -1 along an axis is at that edge when its cell position
+  is <= 0, heading +1 when it is >= 1, and always when it isn't moving
+  along the axis
+- at the edge on both axes it crosses into the next tile, landing on the
+  opposite edge of the axes it moves along (or escapes, if the next tile
+  is the endpoint)
+- otherwise it moves speed along every axis it isn't at the edge of yet
+
+Towers, modifiers and the JSON sent to clients still want creep objects, so
+each creep gets a CreepView that reads and writes its row."""
+import numpy as np
+from engine.effects import stun_creep
+
+
+class CreepStore:
+
+    def __init__(self, table, capacity=64):
+        self.table = table
+        self.count = 0  # rows in use
+        self.views = []
+
+        self.tile = np.zeros(capacity, dtype=np.intp)
+        self.cell_x = np.zeros(capacity)
+        self.cell_y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.base_speed = np.zeros(capacity)
+        self.health = np.zeros(capacity)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.bounty = np.zeros(capacity, dtype=np.int64)
+
+    COLUMNS = ('tile', 'cell_x', 'cell_y', 'speed', 'base_speed', 'health',
+               'live', 'bounty')
+
+    def add(self, creep):
+        """Take a creep into the store.  Returns the view that stands in for
+        it from now on."""
+        i = self.count
+        if i == len(self.tile):
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                grown = np.zeros(2 * len(column), dtype=column.dtype)
+                grown[:i] = column
+                setattr(self, name, grown)
+        self.count += 1
+
+        self.tile[i] = self.table.index(*creep.loc)
+        self.cell_x[i], self.cell_y[i] = creep.cellPos
+        self.speed[i] = creep.speed
+        self.base_speed[i] = creep.base_speed
+        self.health[i] = creep.health
+        self.live[i] = creep.live
+        self.bounty[i] = creep.bounty
+
+        view = CreepView(self, i, creep.id, creep.type)
+        self.views.append(view)
+        return view
+
+    def retire(self):
+        """Drop every creep that isn't live and close up the rows behind
+        it.  Returns (view, escaped) for each dropped creep; the views are
+        no use after this except for their ids."""
+        n = self.count
+        live = self.live[:n]
+        if live.all():
+            return []
+        keep = np.flatnonzero(live)
+        dead = np.flatnonzero(~live)
+        views = self.views
+        gone = [(views[i], escaped) for i, escaped in
+                zip(dead.tolist(), (self.health[dead] > 0).tolist())]
+        for i in dead.tolist():
+            # the view's row is about to be someone else's
+            views[i].modifiers = []
+
+        k = len(keep)
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[:k] = column[keep]
+        self.views = [views[i] for i in keep.tolist()]
+        for row, view in enumerate(self.views):
+            view.row = row
+        self.live[k:n] = False
+        self.count = k
+        return gone
+
+    def live_count(self):
+        return int(np.count_nonzero(self.live[:self.count]))
+
+    def any_at(self, tile):
+        """True if a live creep is on tile."""
+        n = self.count
+        return bool(np.any(self.live[:n] & (self.tile[:n] == tile)))
+
+    def update(self, world, state):
+        """One tick for every live creep: movement, then the effects on
+        the tiles they end up on.  Returns the views of the creeps that
+        moved to another tile."""
+        moved = self.advance(world, state)
+        self.apply_effects(world.effects, state)
+        views = self.views
+        return [views[i] for i in moved]
+
+    def advance(self, world, state):
+        rows = np.flatnonzero(self.live[:self.count])
+        if not len(rows):
+            return []
+        width = self.table.width
+        hops = np.frombuffer(world.next_hop, dtype=np.int32)
+
+        # the endpoint and cut off tiles have no next hop; nothing live is
+        # ever on one, but don't send anything off the board if it is
+        rows = rows[hops[self.tile[rows]] >= 0]
+        tile = self.tile[rows]
+        hop = hops[tile]
+        dx = hop % width - tile % width
+        dy = hop // width - tile // width
+        x = self.cell_x[rows]
+        y = self.cell_y[rows]
+
+        at_x = np.where(dx < 0, x <= 0, np.where(dx > 0, x >= 1, True))
+        at_y = np.where(dy < 0, y <= 0, np.where(dy > 0, y >= 1, True))
+        crossing = at_x & at_y
+        escaping = crossing & (hop == world.goal)
+        moving = ~crossing
+
+        # cross into the next tile, onto the edge facing the way it came
+        entering = crossing & ~escaping
+        moved = rows[entering]
+        self.tile[moved] = hop[entering]
+        self.cell_x[moved] = np.where(dx[entering] < 0, 1.0,
+                                      np.where(dx[entering] > 0, 0.0,
+                                               x[entering]))
+        self.cell_y[moved] = np.where(dy[entering] < 0, 1.0,
+                                      np.where(dy[entering] > 0, 0.0,
+                                               y[entering]))
+
+        # or move on inside this one
+        speed = self.speed[rows]
+        step_x = np.where(at_x, 0, dx)
+        step_y = np.where(at_y, 0, dy)
+        inside = rows[moving]
+        self.cell_x[inside] = x[moving] + speed[moving] * step_x[moving]
+        self.cell_y[inside] = y[moving] + speed[moving] * step_y[moving]
+
+        for i in rows[escaping].tolist():
+            self.views[i].killPlayer(state)
+        return moved.tolist()
+
+    def apply_effects(self, effects, state):
+        """TileEffects.apply(), straight off the tile column."""
+        if not effects.active:
+            return
+        rows = np.flatnonzero(self.live[:self.count])
+        tiles = self.tile[rows]
+        damage = effects.damage[tiles]
+        stuns = effects.stuns[tiles]
+        hit = np.flatnonzero((damage > 0) | stuns)
+        for k in hit.tolist():
+            view = self.views[rows[k]]
+            view.take_damage(float(damage[k]), state)
+            if stuns[k]:
+                stun_creep(view, state)
+
+
+class CreepView:
+    """Stands in for a Creep whose numbers live in a CreepStore."""
+
+    __slots__ = ('store', 'row', 'id', 'type', 'modifiers')
+
+    def __init__(self, store, row, id, creep_type):
+        self.store = store
+        self.row = row
+        self.id = id
+        self.type = creep_type
+        self.modifiers = []
+
+    @property
+    def loc(self):
+        return self.store.table.coords[self.store.tile[self.row]]
+
+    @loc.setter
+    def loc(self, loc):
+        self.store.tile[self.row] = self.store.table.index(*loc)
+
+    @property
+    def cellPos(self):
+        return (float(self.store.cell_x[self.row]),
+                float(self.store.cell_y[self.row]))
+
+    @cellPos.setter
+    def cellPos(self, pos):
+        self.store.cell_x[self.row], self.store.cell_y[self.row] = pos
+
+    @property
+    def speed(self):
+        return float(self.store.speed[self.row])
+
+    @speed.setter
+    def speed(self, speed):
+        self.store.speed[self.row] = speed
+
+    @property
+    def base_speed(self):
+        return float(self.store.base_speed[self.row])
+
+    @base_speed.setter
+    def base_speed(self, speed):
+        self.store.base_speed[self.row] = speed
+
+    @property
+    def health(self):
+        return float(self.store.health[self.row])
+
+    @health.setter
+    def health(self, health):
+        self.store.health[self.row] = health
+
+    @property
+    def live(self):
+        return bool(self.store.live[self.row])
+
+    @live.setter
+    def live(self, live):
+        self.store.live[self.row] = live
+
+    @property
+    def bounty(self):
+        return int(self.store.bounty[self.row])
+
+    def take_damage(self, amount, gameState):
+        self.health -= amount
+        if (self.health <= 0):
+            self.die(gameState)
+            return 0
+        else:
+            return self.health
+
+    def die(self, gameState):
+        gameState.gold += self.bounty
+        self.live = False
+
+    def killPlayer(self, gameState):
+        gameState.lose_life()
+        self.live = False
+
+    def move_to_dest(self, dest):
+        self.loc = dest
+        return self.loc
+
+    def adjust_speed(self, amount):
+        self.speed += amount
+
+    def get_position(self):
+        return self.loc[0], self.loc[1]
+
+    def json_dict(self):
+        """What a Creep's __dict__ would have held, for sending to clients."""
+        return {
+            'loc': self.loc,
+            'type': self.type,
+            'speed': self.speed,
+            'base_speed': self.base_speed,
+            'health': self.health,
+            'cellPos': self.cellPos,
+            'id': self.id,
+            'bounty': self.bounty,
+            'live': self.live,
+            'modifiers': self.modifiers,
+        }
+
+    def __str__(self):
+        return 'speed,loc,health,cellpos: ' + str(self.speed) + ',' + str(self.loc) + ',' + str(self.health) + ',' + str(self.cellPos)
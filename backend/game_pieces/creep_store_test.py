@@ -0,0 +1,60 @@
+import json
+import random
+import unittest
+from engine.util import dump_obj_dict
+from game_pieces.creep import Creep
+from game_pieces.levels import Levels
+from game_states.gameplay_state import GameplayState
+
+TOWERS = ['laser_tower', 'fire_tower', 'stun_tower', 'ice_tower',
+          'wall_tower']
+
+
+def game(creep_store, seed):
+    rng = random.Random(seed)
+    levels = Levels.createLevel(5, 0.5, 10, 5, 3, "Default")
+    state = GameplayState(levels, 16, 12, 100, 10000, 1,
+                          creep_store=creep_store)
+    for _ in range(25):
+        state.build_tower((rng.randrange(16), rng.randrange(12)),
+                          rng.choice(TOWERS))
+    return state
+
+
+class TestCreepStore(unittest.TestCase):
+
+    def test_same_game_as_creep_objects(self):
+        for seed in range(3):
+            objects = game(False, seed)
+            store = game(True, seed)
+            for _ in range(900):
+                expected = json.dumps(objects.update(1 / 30, []),
+                                      default=dump_obj_dict)
+                actual = json.dumps(store.update(1 / 30, []),
+                                    default=dump_obj_dict)
+                self.assertEqual(json.loads(actual), json.loads(expected))
+            self.assertEqual(store.lives, objects.lives)
+            self.assertEqual(store.gold, objects.gold)
+
+    def test_view(self):
+        state = game(True, 0)
+        view = state.creep_store.add(Creep.factory('Weak', 7))
+        view.loc = (3, 2)
+        self.assertEqual(state.creep_store.tile[view.row], 2 * 16 + 3)
+        self.assertTrue(state.creep_in_loc((3, 2)))
+        view.take_damage(60, state)
+        self.assertFalse(view.live)
+        self.assertFalse(state.creep_in_loc((3, 2)))
+        self.assertEqual(view.json_dict()['id'], 7)
+
+    def test_grows(self):
+        state = game(True, 0)
+        views = [state.creep_store.add(Creep.factory('Default', i))
+                 for i in range(200)]
+        views[150].health = 5
+        self.assertEqual(views[150].health, 5)
+        self.assertEqual(state.creep_store.live_count(), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
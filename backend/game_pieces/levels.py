@@ -1,50 +1,76 @@
-"""This file contains metadata describing the swarms in each level."""
+"""This file contains metadata describing the swarms in each level.
+
+Creeps aren't made until they're due.  A level is a heap of spawn sources
+keyed by when each one next spawns: a wave is a generator of spawn times
+(and types) that's pushed back on with its next time every time it spawns,
+and a PvP send is a single creep with the time it was sent.  So a level
+only ever holds one entry per wave and per pending send, however many
+creeps it spawns in the end, and scheduling is a heap push or pop."""
+from heapq import heappush, heappop
+from itertools import count
 from game_pieces.creep import CREEP_TYPES
-from game_pieces.creep import Creep
+from game_pieces.creep import CreepPool
+
+level_one = {'creep_type': CREEP_TYPES['Default'], 'amount': 3}
+level_two = {'creep_type': CREEP_TYPES['Default'], 'amount': 5}
+level_three = {'creep_type': CREEP_TYPES['Default'], 'amount': 7}
+
+
+# the spawn times of numWaves waves of numCreeps creeps each, made as they're asked for, as (time, creep type)
+def waves(initialDelay, delayBetweenCreeps, delayBetweenWaves, numCreeps, numWaves, creepType):
+    spawn = initialDelay
+    k = 0
+    while k < numWaves:
+        for i in range(0, numCreeps):
+            yield spawn, creepType
+            spawn += delayBetweenCreeps
+        spawn += delayBetweenWaves
+        k += 1
 
-level_one = {'creep_type': CREEP_TYPES['basic'], 'amount': 3}
-level_two = {'creep_type': CREEP_TYPES['basic'], 'amount': 5}
-level_three = {'creep_type': CREEP_TYPES['basic'], 'amount': 7}
 
 class Levels:
 
-    #Method to spawn creeps used for pvp
-    def spawnCreep(self, creepType, creepID):
-        #spawn_timers = []
-        self.spawnTimers.insert(self.begin,0)
-        #spawn_creeps = []
-        self.creeps.insert(self.begin,Creep.factory(creepType, creepID))
+    #Method to spawn creeps used for pvp. The creep spawns with the first tick after spawnTime.
+    def spawnCreep(self, creepType, spawnTime):
+        if creepType not in CREEP_TYPES:
+            return False
+        self.schedule(iter([(spawnTime, creepType)]))
+        return True
 
 
-    #Auto generates leveled based on parameters
+    #Auto generates leveled based on parameters. numWaves can be float('inf') for a level that never ends.
     def createLevel(initialDelay, delayBetweenCreeps, delayBetweenWaves, numCreeps, numWaves, creepType):
-        level_creep_spawn_timers =[]
-        spawnCreeps = []
-        spawn = initialDelay
-
-        for k in range (0,numWaves):
-            for i in range (0,numCreeps):
-                level_creep_spawn_timers.append(spawn)
-                spawn += delayBetweenCreeps
-                spawnCreeps.append(Creep.factory(creepType,k*numCreeps + i))
-            spawn += delayBetweenWaves
+        level = Levels()
+        level.schedule(waves(initialDelay, delayBetweenCreeps, delayBetweenWaves, numCreeps, numWaves, creepType))
+        return level
 
-        return Levels(level_creep_spawn_timers,spawnCreeps)
+    def __init__(self):
+        # (next spawn time, tie breaker, generator of (time, creep type)). Ties spawn in the order they were
+        # scheduled.
+        self.queue = []
+        self.order = count()
+        self.next_id = 0  # creeps get ids in the order they spawn
+        self.creep_pool = CreepPool()  # where this game's creeps come from
 
-    def __init__(self, timer, creeps):
-        self.spawnTimers = timer
-        self.creeps = creeps
-        self.begin = 0; #position of next creep to be spawned (shouldn't have spawned yet)
+    # adds a source of (time, creep type) spawns, in time order
+    def schedule(self, spawns):
+        for time, creepType in spawns:
+            heappush(self.queue, (time, next(self.order), creepType, spawns))
+            return
 
     #Builds waves to spawn for tick
     def spawnWave(self,totalTime):
         spawningThisTick = []
-        for i in range(self.begin, len(self.creeps)):
-            if(self.spawnTimers[i] < totalTime):
-                spawningThisTick.append(self.creeps[i])
-                self.begin += 1
-            else:
-                break
+        queue = self.queue
+        while queue and queue[0][0] < totalTime:
+            time, _, creepType, spawns = heappop(queue)
+            # the game owns it now, it goes back to the pool when it's gone
+            spawningThisTick.append(
+                self.creep_pool.get(creepType, self.next_id))
+            self.next_id += 1
+            self.schedule(spawns)
         return spawningThisTick #Returns the spawning creeps for this tick
 
-
+    def pending(self):
+        """Spawn sources still to go (waves and PvP sends, not creeps)."""
+        return len(self.queue)
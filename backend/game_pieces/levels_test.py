@@ -0,0 +1,45 @@
+import unittest
+from game_pieces.levels import Levels
+
+
+class TestLevels(unittest.TestCase):
+
+    def spawned(self, level, until, dt=0.25):
+        creeps = []
+        time = 0
+        while time < until:
+            time += dt
+            creeps += [(time, c.id, c.type) for c in level.spawnWave(time)]
+        return creeps
+
+    def test_waves(self):
+        level = Levels.createLevel(1, 0.5, 10, 3, 2, "Weak")
+        creeps = self.spawned(level, 20)
+        # waves at 1, 1.5, 2 and 12.5, 13, 13.5, each creep the first tick
+        # after its time
+        self.assertEqual([t for t, _, _ in creeps],
+                         [1.25, 1.75, 2.25, 12.75, 13.25, 13.75])
+        self.assertEqual([i for _, i, _ in creeps], list(range(6)))
+        self.assertEqual(level.pending(), 0)
+
+    def test_pvp_sends_keep_their_time(self):
+        level = Levels.createLevel(1, 0.5, 10, 3, 1, "Default")
+        level.spawnCreep("Strong", 1.6)
+        level.spawnCreep("Weak", 0.1)
+        self.assertFalse(level.spawnCreep("Nothing", 0))
+        creeps = self.spawned(level, 5)
+        self.assertEqual([(t, c) for t, _, c in creeps],
+                         [(0.25, 'weak'), (1.25, 'default'),
+                          (1.75, 'default'), (1.75, 'strong'),
+                          (2.25, 'default')])
+
+    def test_endless(self):
+        level = Levels.createLevel(0, 0.5, 1, 10, float('inf'), "Weak")
+        creeps = self.spawned(level, 1000, dt=1)
+        self.assertGreater(len(creeps), 1000)
+        # one wave generator is all it ever holds
+        self.assertEqual(level.pending(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,4 @@
-from game_pieces.tower import Tower
-import engine.util
+from game_pieces.tower import Tower, TowerType
 from shots.shot import shot
 from shots.poison import poison
 from modifiers.dot_modifier import Dot_modifier
@@ -7,48 +6,25 @@ import json
 
 # ice_tower is a subclass of tower. It fires a frozen shot at a creep that slows its speed by half.
 class Poison_tower (Tower):
-    def __init__(self,id, loc):
-        # TODO, make tower_type control other values
+    kind = TowerType(tower_type='poison_tower', price=30, health=25,
+                     cooldown=1, fire_range=2, damage=10, upgrade_price=10,
+                     max_upgrade_level=3, ready_to_fire=False)
 
-        self.loc = loc
-        self.health = 25 #?
-        self.cooldown = 1
-        self.fire_range = 2
-        self.id = id; # we need the towers to know where they are in the array of towers.
-        self.tower_type = "poison_tower"
+    __slots__ = ('dot_amount',)
 
-        self.price = 30
-        self.damage = 10
-        self.time_since_last_fire = 0
-        self.upgrade_level = 0
-        self.max_upgrade_level = 3
+    def __init__(self, id, loc):
+        Tower.__init__(self, id, loc)
         self.dot_amount = 10
-        self.upgrade_price = 10
 
-        pass
+    #Override for firing poison at a creep
+    def attack(self, target, gameState):
+        self.fire(target, gameState)
+        return [poison(self.id, target.loc)]
 
-    #Override for firing ice at a creep
-    def update(self, dt, living_creeps, gameState):
-        self.time_since_last_fire += dt
-        myAttacks = [];
-
-        x2, y2 = self.get_position()
-        for creep in living_creeps:
-                if creep.live:
-                    x1, y1 = creep.loc[0] , creep.loc[1]
-                    if engine.util.distance(x1, y1, x2, y2) <= self.fire_range:
-                        if self.can_fire():
-                            self.fire(creep.loc, gameState)
-                            # adds in all the fireable creeps to an array
-                            myAttacks.append(poison(self.id, creep.loc))
-        return myAttacks;
-
-    #Override for ice_tower
-    def fire(self, target, gameState):
-        """Fire at a target creep."""
-        self.time_since_last_fire = 0
+    #Override for poison_tower
+    def hit(self, target, gameState):
         target.take_damage(self.damage , gameState);
-        target.modify(Dot_modifier(target, gameState, self.dot_amount))
+        gameState.modifier_engine.add(target, Dot_modifier(self.dot_amount))
 
     def upgrade(self):
         if self.upgrade_level < self.max_upgrade_level:
@@ -1,54 +1,94 @@
-# Defines the base for a projectile class.
-#This takes a speed that is used to define the max ||v||
-#The update call causes the projectile to move towards it's target
-#Once it has it it's target, hit == True and class to update will do nothing
-#Calls to update will also do nothing if it's target is dead, and hit will be set to True
+# Shots that take time to reach their target, for towers with a projectile_speed.
+# Every projectile in flight on a board is a row in a few NumPy arrays (where it is, how fast it goes), and one
+# update moves all of them at once: each heads straight for where its target creep is now, and hits it once it's
+# within a tick's travel. Only the projectiles that hit go back into Python, to the tower that fired them (its hit()).
+# A projectile whose target dies before it lands is dropped.
 
 import numpy as np
 
-class Projectile:
-
-    def __init__(self, start, creep, speed):
-        self.loc = np.array(start).astype(float)
-        self.velocity = np.array([0.0, 0.0])
-        self.speed = speed
-        self.creep = creep
-        self.hit = False
-
-    def update(self):
-        if self.creep.live and not self.hit:
-            creepPos = np.array(self.creep.get_position()).astype(float)
-            direction = creepPos - self.loc
-            direction /= np.linalg.norm(direction)
-            acceleration = np.copy(direction)
-
-            acceleration *= self.speed
-            self.velocity = 2.0*acceleration + self.velocity
-            velocityMag = np.linalg.norm(self.velocity)
-            self.velocity *= self.speed/velocityMag
-
-            newLoc = self.loc + self.velocity
-            currentDistance = np.linalg.norm(creepPos - self.loc)
-            newDistance = np.linalg.norm(creepPos - newLoc)
-            # checks to see if the projectile will hit with a fudge factro
-            # of 3 units
-            if abs(currentDistance + newDistance - self.speed) < 3.0:
-                #If it will hit, change the velocity so that the
-                #projectile will not overshoot the target
-                self.velocity /= np.linalg.norm(self.velocity)
-                self.velocity *= currentDistance
-                self.hit = True
-
-            self.loc += self.velocity
-        elif not self.creep.live:
-            self.hit = True
-
-    def get_position(self):
-        return self.loc[0], self.loc[1]
-
-    def has_hit(self):
-        return self.hit
-
-    def __str__(self):
-        return 'pos:' + str(self.loc) + ' velocity: ' + str(self.velocity)
 
+class Projectiles:
+
+    def __init__(self, capacity=64):
+        self.count = 0  # projectiles in flight
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)  # tiles per tick
+        # per projectile, the tower that fired it and the creep it's after
+        self.sources = []
+        self.targets = []
+
+    COLUMNS = ('x', 'y', 'speed')
+
+    def launch(self, source, start, target, speed):
+        i = self.count
+        if i == len(self.x):
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                grown = np.zeros(2 * len(column))
+                grown[:i] = column
+                setattr(self, name, grown)
+        self.count += 1
+        self.x[i], self.y[i] = start
+        self.speed[i] = speed
+        self.sources.append(source)
+        self.targets.append(target)
+
+    # Moves every projectile on a tick and lands the ones that reach their target. Returns how many hit.
+    def update(self, gameState):
+        n = self.count
+        if not n:
+            return 0
+        targets = self.targets
+        tx = np.fromiter((t.loc[0] for t in targets), dtype=float, count=n)
+        ty = np.fromiter((t.loc[1] for t in targets), dtype=float, count=n)
+        live = np.fromiter((t.live for t in targets), dtype=bool, count=n)
+
+        x = self.x[:n]
+        y = self.y[:n]
+        speed = self.speed[:n]
+        dx = tx - x
+        dy = ty - y
+        distance = np.hypot(dx, dy)
+        landing = live & (distance <= speed)
+        flying = live & ~landing
+
+        step = np.zeros(n)
+        np.divide(speed, distance, out=step, where=flying)
+        x += dx * step
+        y += dy * step
+
+        hits = 0
+        for i in np.flatnonzero(landing).tolist():
+            target = targets[i]
+            if target.live:  # an earlier hit this tick may have killed it
+                self.sources[i].hit(target, gameState)
+                hits += 1
+        self.keep(flying)
+        return hits
+
+    # Drops the projectiles whose target isn't live any more. Has to happen before dead creeps are reused.
+    def retire(self):
+        n = self.count
+        if n:
+            self.keep(np.fromiter((t.live for t in self.targets), dtype=bool, count=n))
+
+    def keep(self, keep):
+        if keep.all():
+            return
+        rows = np.flatnonzero(keep)
+        k = len(rows)
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[:k] = column[rows]
+        rows = rows.tolist()
+        self.sources = [self.sources[i] for i in rows]
+        self.targets = [self.targets[i] for i in rows]
+        self.count = k
+
+    def positions(self):
+        """(x, y) of every projectile in flight."""
+        return list(zip(self.x[:self.count].tolist(), self.y[:self.count].tolist()))
+
+    def __len__(self):
+        return self.count
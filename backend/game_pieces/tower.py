@@ -1,41 +1,125 @@
-import engine.util
+from collections import namedtuple
 from shots.laser import laser
 
+# The numbers every tower of one type starts with. One of these is shared by
+# all the towers of a type; cooldown, fire_range, damage and upgrade_price
+# are only starting values, since upgrades change them per tower.
+# ready_to_fire says whether a new tower can shoot straight away, and policy
+# is the TARGETING_POLICIES entry new towers pick their targets with.
+# projectile_speed (tiles per tick) makes the tower's shots fly to their
+# target instead of hitting straight away.
+TowerType = namedtuple('TowerType', [
+    'tower_type', 'price', 'health', 'cooldown', 'fire_range', 'damage',
+    'upgrade_price', 'max_upgrade_level', 'ready_to_fire', 'policy',
+    'projectile_speed'], defaults=['first', None])
+
+
+# How a tower picks which of the creeps in range to shoot. Each one gives a
+# creep a key on a board (a GridWorld) and the creep with the smallest key
+# is shot; ties go to the creep that spawned first. How far a creep has left
+# to go is a lookup in the board's distance-to-goal field.
+def left_to_go(creep, world):
+    return world.distance_to_goal(creep.loc[0], creep.loc[1])
+
+
+TARGETING_POLICIES = {
+    'first': left_to_go,  # closest to the endpoint
+    'last': lambda creep, world: -left_to_go(creep, world),
+    'strongest': lambda creep, world: -creep.health,
+    'weakest': lambda creep, world: creep.health,
+}
+
 
 class Tower:
-    """Basic implementation of a tower"""
+    """Basic implementation of a tower (the laser tower). Subclasses set
+    their own kind and only keep per-tower values in slots."""
 
-    def __init__(self, loc, health, cooldown, fire_range, id, tower_type="laser_tower"):
-        # TODO, make tower_type control other values
+    kind = TowerType(tower_type="laser_tower", price=20, health=100,
+                     cooldown=1, fire_range=3, damage=40, upgrade_price=10,
+                     max_upgrade_level=3, ready_to_fire=True)
 
+    __slots__ = ('loc', 'id', 'cooldown', 'fire_range', 'damage',
+                 'upgrade_price', 'upgrade_level', 'time_since_last_fire',
+                 'last_update', 'policy')
+
+    def __init__(self, id, loc):
+        kind = self.kind
         self.loc = loc
-        self.health = health
-        self.cooldown = cooldown
-        self.fire_range = fire_range
         # we need the towers to know where they are in the array of towers.
         self.id = id
-        self.tower_type = tower_type
-
-        self.price = 20
-        self.damage = 40
-        self.time_since_last_fire = cooldown
+        self.cooldown = kind.cooldown
+        self.fire_range = kind.fire_range
+        self.damage = kind.damage
+        self.upgrade_price = kind.upgrade_price
         self.upgrade_level = 0
-        self.max_upgrade_level = 3
+        self.time_since_last_fire = kind.cooldown if kind.ready_to_fire else 0
+        # game time the tower was last updated at. GameplayState only
+        # updates towers with creeps in range, and catches them up from this
+        self.last_update = 0
+        self.policy = kind.policy
+
+    # the same for every tower of a type, so they're read off the kind
+    @property
+    def tower_type(self):
+        return self.kind.tower_type
+
+    @property
+    def price(self):
+        return self.kind.price
 
+    @property
+    def health(self):
+        return self.kind.health
+
+    @property
+    def max_upgrade_level(self):
+        return self.kind.max_upgrade_level
+
+    # A tower fires at most once a tick, at the creep in range its policy
+    # picks. Only the creeps near the tower are looked at (see
+    # engine.spatial_index), and none at all while it's cooling down.
     def update(self, dt, living_creeps, gameState):
         self.time_since_last_fire += dt
-        myAttacks = []
-
-        x2, y2 = self.get_position()
-        for creep in living_creeps:
-            if creep.live:
-                x1, y1 = creep.loc[0], creep.loc[1]
-                if engine.util.distance(x1, y1, x2, y2) <= self.fire_range:
-                    if self.can_fire():
-                        self.fire(creep, gameState)
-                        # adds in all the fireable creeps to an array
-                        myAttacks.append(laser(self.id, creep.id))
-        return myAttacks
+        if not self.can_fire():
+            return []
+
+        x, y = self.get_position()
+        in_range = gameState.creep_index.in_range(x, y, self.fire_range)
+        if not in_range:
+            return []
+        return self.attack(self.choose_target(in_range, gameState.world),
+                           gameState)
+
+    # The creep to shoot out of candidates (live, in range, in the order
+    # they spawned), by the tower's policy.
+    def choose_target(self, candidates, world):
+        key = TARGETING_POLICIES[self.policy]
+        return min(candidates, key=lambda creep: key(creep, world))
+
+    # Changes how the tower picks its targets, False if there's no such
+    # policy.
+    def set_policy(self, policy):
+        if policy not in TARGETING_POLICIES:
+            return False
+        self.policy = policy
+        return True
+
+    # Every tile (x, y) on a width x height board that's in range. Creeps
+    # are always on whole tiles, so these are the only tiles the tower can
+    # ever hit anything on.
+    def coverage(self, width, height):
+        x, y = self.get_position()
+        reach = int(self.fire_range)
+        reach2 = self.fire_range * self.fire_range
+        return [(i, j)
+                for j in range(max(0, y - reach), min(height, y + reach + 1))
+                for i in range(max(0, x - reach), min(width, x + reach + 1))
+                if (i - x) ** 2 + (j - y) ** 2 <= reach2]
+
+    # Fires at the target creep and returns the shots to send to clients.
+    def attack(self, target, gameState):
+        self.fire(target, gameState)
+        return [laser(self.id, target.id)]
 
     def can_fire(self):
         """True if the cooldown has warn off."""
@@ -45,11 +129,32 @@ class Tower:
     def fire(self, target, gameState):
         """Fire at a target creep."""
         self.time_since_last_fire = 0
+        speed = self.kind.projectile_speed
+        if speed and gameState.projectiles is not None:
+            # hit() is called when the shot lands (see game_pieces.projectile)
+            gameState.projectiles.launch(self, self.loc, target, speed)
+        else:
+            self.hit(target, gameState)
+
+    # What a shot does to the creep it hits.
+    def hit(self, target, gameState):
         target.take_damage(self.damage, gameState)
 
     def get_position(self):
         return self.loc[0], self.loc[1]
 
+    # what gets sent to clients, the fields towers used to keep in __dict__
+    def json_dict(self):
+        fields = {name: getattr(self, name) for name in
+                  ('loc', 'health', 'cooldown', 'fire_range', 'id',
+                   'tower_type', 'price', 'damage', 'upgrade_price',
+                   'time_since_last_fire', 'upgrade_level',
+                   'max_upgrade_level', 'policy')}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                fields[name] = getattr(self, name)
+        return fields
+
     # Upgrades the damage per shot
     def upgrade(self):
         if self.upgrade_level < self.max_upgrade_level:
@@ -0,0 +1,112 @@
+"""Targeting for every tower of a board at once, for boards with a lot of
+towers and creeps.
+
+Which tiles every tower covers (a tiles x towers table, the same tiles as
+GameplayState.coverage) and the towers' cooldowns are kept as NumPy
+arrays, rebuilt only when a tower is built, upgraded or deleted.  Every
+tick the towers awake, the towers ready to fire and, for those, the creeps
+they have in range are all worked out with a few gathers from that
+table.  Only the towers that shoot go back into Python,
+to their own attack() (and fire()), one at a time in build order so a
+creep killed by one tower isn't shot again by the next.
+
+It picks the same targets and keeps the same time as the per-tower update
+in GameplayState: a tower with a creep on one of its tiles catches up on
+the time since it was last looked at, and shoots the live creep in range
+its policy picks.  While it's in use the arrays hold the
+towers' time_since_last_fire and last_update; they're written back to the
+towers before the arrays are rebuilt."""
+import numpy as np
+
+
+class TowerBatch:
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.towers = []
+        self.dirty = True  # the towers have changed since the last rebuild
+
+        # tiles x towers, True where the tile is in the tower's range
+        self.cover = None
+        self.cooldown = None
+        self.time_since_last_fire = self.last_update = None
+
+    def changed(self):
+        """A tower was built, upgraded or deleted."""
+        self.flush()
+        self.dirty = True
+
+    def flush(self):
+        """Write the times kept here back to the towers."""
+        if self.time_since_last_fire is None:
+            return
+        for i, tower in enumerate(self.towers):
+            tower.time_since_last_fire = float(self.time_since_last_fire[i])
+            tower.last_update = float(self.last_update[i])
+
+    def rebuild(self, towers):
+        width = self.width
+        self.towers = list(towers)
+        self.cover = np.zeros((width * self.height, len(towers)), dtype=bool)
+        for i, tower in enumerate(towers):
+            for x, y in tower.coverage(width, self.height):
+                self.cover[y * width + x, i] = True
+        self.cooldown = np.array([t.cooldown for t in towers], dtype=float)
+        self.time_since_last_fire = np.array(
+            [t.time_since_last_fire for t in towers], dtype=float)
+        self.last_update = np.array([t.last_update for t in towers],
+                                    dtype=float)
+        self.dirty = False
+
+    def creep_arrays(self, gameState):
+        """The tile and live flag of every creep GameplayState has, in
+        all_creeps order, which is the order they spawned in."""
+        store = gameState.creep_store
+        if store is not None:
+            n = store.count
+            return store.tile[:n], store.live[:n]
+        creeps = gameState.all_creeps
+        n = len(creeps)
+        width = self.width
+        tile = np.fromiter((c.loc[1] * width + c.loc[0] for c in creeps),
+                           dtype=np.intp, count=n)
+        live = np.fromiter((c.live for c in creeps), dtype=bool, count=n)
+        return tile, live
+
+    def update(self, gameState):
+        """Every tower's turn for this tick.  Returns the shots made."""
+        if self.dirty:
+            self.rebuild(gameState.all_towers)
+        if not self.towers or not gameState.all_creeps:
+            return []
+        tile, live = self.creep_arrays(gameState)
+
+        # towers with a creep (dead or alive) on one of their tiles catch up
+        now = gameState.counter
+        occupied = np.zeros(len(self.cover), dtype=bool)
+        occupied[tile] = True
+        awake = self.cover[occupied].any(axis=0)
+        self.time_since_last_fire[awake] += now - self.last_update[awake]
+        self.last_update[awake] = now
+
+        ready = np.flatnonzero(awake &
+                               (self.time_since_last_fire >= self.cooldown))
+        if not len(ready):
+            return []
+        # ready towers x creeps, True where the creep is live and in range
+        targets = (self.cover[:, ready][tile] & live[:, None]).T
+
+        attacks = []
+        creeps = gameState.all_creeps
+        for k in np.flatnonzero(targets.any(axis=1)).tolist():
+            i = int(ready[k])
+            # an earlier tower may have killed some of them
+            candidates = [creeps[j] for j in np.flatnonzero(targets[k]).tolist()
+                          if creeps[j].live]
+            if candidates:
+                tower = self.towers[i]
+                target = tower.choose_target(candidates, gameState.world)
+                attacks += tower.attack(target, gameState)
+                self.time_since_last_fire[i] = tower.time_since_last_fire
+        return attacks
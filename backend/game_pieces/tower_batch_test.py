@@ -0,0 +1,60 @@
+import json
+import random
+import unittest
+from engine.util import dump_obj_dict
+from game_pieces.levels import Levels
+from game_states.gameplay_state import GameplayState
+
+TOWERS = ['laser_tower', 'fire_tower', 'stun_tower', 'ice_tower',
+          'wall_tower', 'sniper_tower', 'gattling_tower', 'poison_tower']
+
+
+def game(tower_batch, creep_store, seed):
+    rng = random.Random(seed)
+    levels = Levels.createLevel(5, 0.5, 10, 8, 3, "Default")
+    state = GameplayState(levels, 16, 12, 100, 10000, 1,
+                          creep_store=creep_store, tower_batch=tower_batch)
+    for _ in range(25):
+        state.build_tower((rng.randrange(16), rng.randrange(12)),
+                          rng.choice(TOWERS))
+    return state, rng
+
+
+class TestTowerBatch(unittest.TestCase):
+
+    def test_same_game_as_tower_by_tower(self):
+        for creep_store in (False, True):
+            for seed in range(3):
+                towers, rng = game(False, creep_store, seed)
+                batch, _ = game(True, creep_store, seed)
+                for tick in range(900):
+                    if tick % 150 == 75:
+                        # the tower set changes mid game
+                        loc = rng.choice(towers.all_towers).loc
+                        for state in (towers, batch):
+                            state.upgrade_tower(loc)
+                    if tick == 450:
+                        loc = towers.all_towers[0].loc
+                        for state in (towers, batch):
+                            state.delete_tower(loc)
+                    expected = json.dumps(towers.update(1 / 30, []),
+                                          default=dump_obj_dict)
+                    actual = json.dumps(batch.update(1 / 30, []),
+                                        default=dump_obj_dict)
+                    self.assertEqual(json.loads(actual), json.loads(expected))
+                self.assertEqual(batch.lives, towers.lives)
+                self.assertEqual(batch.gold, towers.gold)
+
+    def test_times_written_back(self):
+        towers, _ = game(False, False, 1)
+        batch, _ = game(True, False, 1)
+        for _ in range(400):
+            towers.update(1 / 30, [])
+            batch.update(1 / 30, [])
+        batch.tower_batch.flush()
+        for expected, actual in zip(towers.all_towers, batch.all_towers):
+            self.assertEqual(actual.json_dict(), expected.json_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
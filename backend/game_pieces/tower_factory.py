@@ -7,28 +7,25 @@ from game_pieces.gattling_tower import Gattling_tower
 from game_pieces.poison_tower import Poison_tower
 from game_pieces.stun_tower import Stun_tower
 
+# the tower class for each tower type clients can ask for
+TOWER_CLASSES = {
+    "laser_tower": Tower,  # lazer tower
+    "fire_tower": Fire_tower,
+    "wall_tower": Wall_tower,
+    "ice_tower": Ice_tower,
+    "sniper_tower": Sniper_tower,
+    "gattling_tower": Gattling_tower,
+    "poison_tower": Poison_tower,
+    "stun_tower": Stun_tower,
+}
+
 
 class Tower_factory:
 
+    # a new tower of the given type, or None if there's no such type
     def factory(type, coordinate, id):
-        if type == "laser_tower":
-            return Tower(coordinate, 100, 1, 3, id)  # lazer tower
-        if type == "fire_tower":
-            return Fire_tower(id, coordinate)  # fire tower
-        if type == "wall_tower":
-            return Wall_tower(id, coordinate)
-        if type == "ice_tower":
-            return Ice_tower(id, coordinate)
-        if type == "sniper_tower":
-            return Sniper_tower(id, coordinate)
-        if type == "gattling_tower":
-            return Gattling_tower(id, coordinate)
-        if type == "poison_tower":
-            return Poison_tower(id, coordinate)
-        if type == "stun_tower":
-            return Stun_tower(id, coordinate)
-
-        dummy = Tower(0, 0, 0, 0, 0)
-        dummy.tower_type = "failure"
-        return dummy
+        tower_class = TOWER_CLASSES.get(type)
+        if tower_class is None:
+            return None
+        return tower_class(id, coordinate)
     factory = staticmethod(factory)
@@ -1,27 +1,18 @@
-from game_pieces.tower import Tower
+from game_pieces.tower import Tower, TowerType
 import engine.util
 from shots.shot import shot
 from shots.fire import fire
 from shots.laser import laser
+from modifiers.dot_modifier import Dot_modifier
 import json
 
 # ice_tower is a subclass of tower. It fires a frozen shot at a creep that slows its speed by half.
 class Wall_tower (Tower):
-    def __init__(self,id, loc):
-        # TODO, make tower_type control other values
+    kind = TowerType(tower_type='wall_tower', price=5, health=25, cooldown=1,
+                     fire_range=0, damage=0, upgrade_price=0,
+                     max_upgrade_level=0, ready_to_fire=False)
 
-        self.loc = loc
-        self.health = 25 #?
-        self.cooldown = 1
-        self.fire_range = 0
-        self.id = id; # we need the towers to know where they are in the array of towers.
-        self.tower_type = "wall_tower"
-
-        self.price = 5
-        self.damage = 0
-        self.time_since_last_fire = 0
-
-        pass
+    __slots__ = ()
 
     #Override for firing ice at a creep
     def update(self, dt, living_creeps, gameState):
@@ -40,9 +31,7 @@ class Wall_tower (Tower):
         return myAttacks;
 
     #Override for ice_tower
-    def fire(self, target, gameState):
-        """Fire at a target creep."""
-        self.time_since_last_fire = 0
+    def hit(self, target, gameState):
         target.take_damage(self.damage , gameState);
-        target.modify(Dot_modifier(target, gameState, 10))
+        gameState.modifier_engine.add(target, Dot_modifier(10))
 
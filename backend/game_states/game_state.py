@@ -11,5 +11,9 @@ class GameState:
         # if they don't
         raise NotImplementedError
 
+    def resync(self):
+        # states that only send changes resend everything after this
+        pass
+
     def is_dead(self):
         return True
@@ -1,8 +1,18 @@
 from game_states.game_state import GameState
 from engine.grid_world import GridWorld
+from engine.spatial_index import CreepIndex
+from engine.profiler import Profiler
 
-from game_pieces.creep import Creep
 from game_pieces.tower_factory import Tower_factory
+from modifiers.modifier_engine import ModifierEngine
+try:
+    from game_pieces.creep_store import CreepStore
+    from game_pieces.tower_batch import TowerBatch
+    from game_pieces.projectile import Projectiles
+except ImportError:  # NumPy isn't installed
+    CreepStore = None
+    TowerBatch = None
+    Projectiles = None
 from engine.message_enum import MSG  # message type enum
 
 LOCATION_INDEX = 0
@@ -15,23 +25,68 @@ class GameplayState(GameState):
     """This is the state the game is in during real gameplay,
     and manages all creeps, towers, scores, etc."""
 
-    def __init__(self, level, width, height, lives, gold, player_id):
+    def __init__(self, level, width, height, lives, gold, player_id,
+                 creep_store=False, tower_batch=False):
         self.cur_level = level
         self.world = GridWorld(width, height, (0, 0), (width - 1, height - 1))
         self.all_creeps = []
+        # the live creeps bucketed by where they are, for towers to find
+        # targets in
+        self.creep_index = CreepIndex(width, height)
+        # with creep_store, creeps are kept in NumPy arrays and all move at
+        # once; all_creeps then holds views of them.  Worth it for boards
+        # with thousands of creeps.
+        self.creep_store = None
+        if creep_store:
+            self.creep_store = CreepStore(self.world.tile_table)
+        # every slow, stun and damage over time on the creeps
+        self.modifier_engine = ModifierEngine()
+        # shots still on their way to their targets.  Without NumPy every
+        # shot hits straight away.
+        self.projectiles = Projectiles() if Projectiles is not None else None
         self.all_towers = []
+        # tile -> the towers that have it in range.  Only towers covering a
+        # tile with a creep on it get updated, the rest cost nothing.
+        self.coverage = {}
+        self.tower_order = {}  # tower -> when it was built, to update in
+        self.towers_built = 0
+        # with tower_batch, every tower's targeting is done at once in NumPy
+        # instead of tower by tower.  Worth it with a lot of towers.
+        self.tower_batch = None
+        if tower_batch:
+            self.tower_batch = TowerBatch(width, height)
         self.lives = lives
         self.gold = gold  # starting gold
         self.counter = 0
         self.player_id = player_id
+        self.sent_build_mask = None  # the build mask clients last saw
+        self.sent_path_version = None  # the path version clients last saw
+        self.profiler = Profiler()  # how long each phase of update() takes
 
     # Calls all update methods within the game and returns dictionaries to be
     # converted to json with the player status (gold lives enemies left) and
     # other stats
     def update(self, dt, client_info):
+        profiler = self.profiler
+        t = profiler.start()
         self.counter += dt  # the total amount of time that has elapsed
 
-        self.all_creeps.extend(self.cur_level.spawnWave(self.counter))
+        # creeps that died or escaped last tick were sent out one last time
+        # with live false; now they're dropped for good
+        deaths = self.retire_creeps()
+        t = profiler.lap('retire', t)
+
+        spawned = self.cur_level.spawnWave(self.counter)
+        if self.creep_store is not None:
+            views = [self.creep_store.add(creep) for creep in spawned]
+            for creep in spawned:
+                # the store copied what it needs
+                self.cur_level.creep_pool.release(creep)
+            spawned = views
+        self.all_creeps.extend(spawned)
+        for creep in spawned:
+            self.creep_index.add(creep)
+        t = profiler.lap('spawn', t)
 
         creepLoc = {}  # Dicitonary of creep locations
         creepProgress = {}  # Dictionary of creep progresses
@@ -40,21 +95,44 @@ class GameplayState(GameState):
         # Update all creeps and get location location and movement progress
         bestPath = self.world.tilePaths
 
-        for creep in self.all_creeps:
-            cUpdate = creep.update(bestPath, dt, self)
-            if cUpdate is not None:
-                creepLoc.update(cUpdate[LOCATION_INDEX])
-                creepProgress.update(cUpdate[PROGRESS_INDEX])
+        # run out modifiers, set speeds back and burn the poisoned
+        self.modifier_engine.update(self)
+        t = profiler.lap('modifiers', t)
 
-        # Updates the attacks made by the towers on the creeps
-        for tower in self.all_towers:
-            # attacksMade.update({tower.id : tower.update(dt, self.all_creeps , self)})
-            attacksMade = attacksMade + tower.update(dt, self.all_creeps, self)
+        if self.creep_store is not None:
+            # moves every creep at once and hits them with tile effects
+            for creep in self.creep_store.update(self.world, self):
+                self.creep_index.move(creep)
+        else:
+            for creep in self.all_creeps:
+                loc = creep.loc
+                cUpdate = creep.update(bestPath, dt, self)
+                if cUpdate is not None:
+                    creepLoc.update(cUpdate[LOCATION_INDEX])
+                    creepProgress.update(cUpdate[PROGRESS_INDEX])
+                if creep.loc != loc:
+                    self.creep_index.move(creep)
 
-        enemies = 0
-        for creep in self.all_creeps:
-            if creep.live:
-                enemies += 1
+            # Burns, stuns, etc. the creeps standing on tiles with effects
+            self.world.apply_effects(
+                [creep for creep in self.all_creeps if creep.live], self)
+        t = profiler.lap('creeps', t)
+
+        # Lands the shots fired on earlier ticks that reach their targets,
+        # then updates the attacks made by the towers on the creeps
+        if self.projectiles is not None:
+            self.projectiles.update(self)
+            t = profiler.lap('projectiles', t)
+        attacksMade = self.update_towers()
+        t = profiler.lap('towers', t)
+
+        if self.creep_store is not None:
+            enemies = self.creep_store.live_count()
+        else:
+            enemies = 0
+            for creep in self.all_creeps:
+                if creep.live:
+                    enemies += 1
 
         effects_json = self.world.process_effects()
 
@@ -71,49 +149,154 @@ class GameplayState(GameState):
             'creeps': self.all_creeps,
             'attacksMade': attacksMade,
             'effects': effects_json,
-            'path': str(bestPath),
+            'pathVersion': self.world.path_version,
             'player_id': self.player_id
         }
 
-        # Updates all effects in the world (decreases their counter by one).
-        # Each gridworld holds an effects 2d array that stores a tile_effects
-        # object.
-        for i in range(0, self.world.width):
-            for j in range(0, self.world.height):
-                self.world.effects[i][j].update()
+        if deaths:
+            update['creepDeaths'] = deaths
+
+        # the path itself only goes out when it has changed since the last
+        # one clients were sent
+        if self.world.path_version != self.sent_path_version:
+            self.sent_path_version = self.world.path_version
+            update['path'] = self.world.get_path_message()
+
+            # tell clients where towers can go whenever that changes, so
+            # they don't send tower requests that would be turned down.  It
+            # can only change with the paths, and is only worked out then.
+            if self.world.build_mask != self.sent_build_mask:
+                self.sent_build_mask = bytes(self.world.build_mask)
+                update['buildMask'] = self.world.get_build_mask()
+
+        # Moves the effects in the world on a tick, dropping the ones that
+        # have run out.
+        self.world.update_effects()
+        profiler.lap('message', t)
 
         return update
 
-    def set_level(self, level):
-        self.cur_level = level
+    # Gives every tower with a creep in range its turn, returns the shots
+    # they made
+    def update_towers(self):
+        if self.tower_batch is not None:
+            return self.tower_batch.update(self)
+
+        attacksMade = []
+        for tower in self.awake_towers():
+            # attacksMade.update({tower.id : tower.update(dt, self.all_creeps , self)})
+            # a tower that sat idle catches up on the time it missed
+            elapsed = self.counter - tower.last_update
+            tower.last_update = self.counter
+            attacksMade = attacksMade + tower.update(elapsed, self.all_creeps, self)
+        return attacksMade
+
+    # the towers with a creep on one of their tiles, in the order they were
+    # built
+    def awake_towers(self):
+        awake = set()
+        coverage = self.coverage
+        for loc in self.creep_index.occupied:
+            towers = coverage.get(loc)
+            if towers:
+                awake.update(towers)
+        return sorted(awake, key=self.tower_order.__getitem__)
+
+    def cover(self, tower):
+        if self.tower_batch is not None:
+            self.tower_batch.changed()
+        for loc in tower.coverage(self.world.width, self.world.height):
+            self.coverage.setdefault(loc, []).append(tower)
 
-        # should clean this up; 'amount' means amount of creeps
-        for _ in range(self.cur_level['amount']):
-            creep = Creep(creep_type=self.cur_level['creep_type'])
-            self.all_creeps.append(creep)
+    def uncover(self, tower):
+        if self.tower_batch is not None:
+            self.tower_batch.changed()
+        for loc in tower.coverage(self.world.width, self.world.height):
+            towers = self.coverage[loc]
+            towers.remove(tower)
+            if not towers:
+                del self.coverage[loc]
+
+    # takes creeps that aren't live any more off the board and gives them
+    # back to the creep pool.  Returns a death event for each one, saying
+    # whether it escaped or was killed
+    def retire_creeps(self):
+        self.modifier_engine.retire()
+        if self.projectiles is not None:
+            self.projectiles.retire()
+        if self.creep_store is not None:
+            gone = self.creep_store.retire()
+            if gone:
+                self.all_creeps = list(self.creep_store.views)
+        else:
+            dead = [c for c in self.all_creeps if not c.live]
+            gone = [(creep, creep.health > 0) for creep in dead]
+            if dead:
+                self.all_creeps = [c for c in self.all_creeps if c.live]
+
+        for creep, _ in gone:
+            self.creep_index.remove(creep)
+            if self.creep_store is None:
+                self.cur_level.creep_pool.release(creep)
+
+        return [{'id': creep.id, 'escaped': escaped} for creep, escaped in gone]
+
+    # a client lost track of the board (joined late, missed a path), so send
+    # everything again with the next update
+    def resync(self):
+        self.sent_build_mask = None
+        self.sent_path_version = None
 
     # Changed, should only take in coordinates and tower type
     def build_tower(self, coordinates, towerType):
-        tower = Tower_factory.factory(
-            towerType, coordinates, len(self.all_towers))
-
-        # TODO, send why build_tower failed (money, illegal position, etc)
-        if tower.tower_type == "failure":
-            print(tower.tower_type)
-            return False
+        return self.build_towers([(coordinates, towerType)])[0]
 
-        if tower.price > self.gold:
-            return False
+    # Builds several towers, (coordinates, tower type) each, with one path
+    # recompute for all of them. Returns the tower or False for each, as
+    # build_tower would have building them in order.
+    def build_towers(self, requests):
+        towers = []
+        gold = self.gold
+        tower_id = len(self.all_towers)
+        taken = set()
+        for coordinates, towerType in requests:
+            tower = Tower_factory.factory(towerType, coordinates, tower_id)
 
-        if self.creep_in_loc(tower.loc):
-            return False
+            # TODO, send why build_tower failed (money, illegal position, etc)
+            if tower is None:
+                print("failure")
+            elif (tower.price <= gold and tower.loc not in taken and
+                  self.world.can_build(*tower.loc) and
+                  not self.creep_in_loc(tower.loc)):
+                gold -= tower.price
+                tower_id += 1
+                taken.add(tower.loc)
+                towers.append(tower)
+                continue
+            towers.append(False)
 
-        if not self.world.build_tower(tower.loc[X_INDEX], tower.loc[Y_INDEX]):
-            return False
-        else:
+        built = iter(self.world.build_towers(
+            [tower.loc for tower in towers if tower]))
+        for i, tower in enumerate(towers):
+            if not tower:
+                continue
+            if not next(built):
+                # only when towers together would cut the maze.  The gold
+                # held for it may have turned later requests down, so take
+                # back what the world built after it and go again from the
+                # next request
+                for later in towers[i + 1:]:
+                    if later and next(built):
+                        self.world.remove_tower(*later.loc)
+                return (towers[:i] + [False] +
+                        self.build_towers(requests[i + 1:]))
             self.gold -= tower.price
             self.all_towers.append(tower)
-            return tower
+            tower.last_update = self.counter
+            self.tower_order[tower] = self.towers_built
+            self.towers_built += 1
+            self.cover(tower)
+        return towers
 
     def lose_life(self):
         self.lives -= 60
@@ -128,26 +311,39 @@ class GameplayState(GameState):
             if tower.loc == coordinates:
                 if tower.upgrade_price < self.gold:
                     self.gold -= tower.upgrade_price
-                    return tower.upgrade()
+                    # upgrades can change the range
+                    self.uncover(tower)
+                    upgraded = tower.upgrade()
+                    self.cover(tower)
+                    return upgraded
+
+    # Sets how the tower at coordinates picks its targets (see
+    # TARGETING_POLICIES), False if there's no tower there or no such policy
+    def set_tower_policy(self, coordinates, policy):
+        for tower in self.all_towers:
+            if tower.loc == coordinates:
+                return tower.set_policy(policy)
+        return False
 
     def delete_tower(self, coordinates):
+        for tower in self.all_towers:
+            if tower.loc == coordinates:
+                self.uncover(tower)
+                del self.tower_order[tower]
         self.all_towers = [t for t in self.all_towers if t.loc != coordinates]
         self.world.remove_tower(coordinates[0], coordinates[1])
 
-    # Assigns an id to spawn creep for pvp use. Hook this up to a button and
-    # deal with it.
+    # Spawns a creep sent by another player (pvp) with the next tick; the
+    # level gives it an id when it spawns.
     def spawn_creep(self, creepType):
-        id = len(self.all_creeps)
-        self.cur_level.spawnCreep(creepType, id)
-        print('Added {} creep'.format(creepType))
+        if self.cur_level.spawnCreep(creepType, self.counter):
+            print('Added {} creep'.format(creepType))
 
     def creep_in_loc(self, loc):
-        for cr in self.all_creeps:
-            if cr.loc == loc and cr.live:
-                return True
-        return False
+        if self.creep_store is not None:
+            return self.creep_store.any_at(self.world.tile_table.index(*loc))
+        return self.creep_index.any_at(loc)
 
     def apply_mod_loc(self, loc, mod):
-        for cr in self.all_creeps:
-            if cr.loc == loc and cr.live:
-                cr.modify(mod)
+        for cr in self.creep_index.in_range(loc[X_INDEX], loc[Y_INDEX], 0):
+            self.modifier_engine.add(cr, mod)
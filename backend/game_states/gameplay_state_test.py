@@ -0,0 +1,190 @@
+import unittest
+from game_pieces.levels import Levels
+from game_states.gameplay_state import GameplayState
+
+
+class TestGameplayState(unittest.TestCase):
+
+    def setUp(self):
+        levels = Levels.createLevel(5, 0.5, 10, 5, 3, "Default")
+        self.state = GameplayState(levels, 16, 12, 100, 10000, 1)
+
+    def test_path_sent_on_change(self):
+        first = self.state.update(0.01, [])
+        self.assertIn('path', first)
+        self.assertEqual(len(first['path']), 16 * 12)
+
+        steady = self.state.update(0.01, [])
+        self.assertNotIn('path', steady)
+        self.assertEqual(steady['pathVersion'], first['pathVersion'])
+
+        self.state.build_tower((5, 5), 'wall_tower')
+        changed = self.state.update(0.01, [])
+        self.assertIn('path', changed)
+        self.assertGreater(changed['pathVersion'], first['pathVersion'])
+
+    def test_build_towers(self):
+        state = self.state
+        state.gold = 30
+        version = state.world.path_version
+        built = state.build_towers([((5, 5), 'wall_tower'),
+                                    ((6, 5), 'no_such_tower'),
+                                    ((5, 5), 'wall_tower'),
+                                    ((7, 5), 'laser_tower'),
+                                    ((8, 5), 'laser_tower')])
+        self.assertEqual([bool(tower) for tower in built],
+                         [True, False, False, True, False])  # out of gold
+        self.assertEqual(state.world.path_version, version + 1)
+        self.assertEqual(state.all_towers, [built[0], built[3]])
+        self.assertEqual(state.gold, 30 - built[0].price - built[3].price)
+
+    def test_build_towers_turned_down_by_the_world(self):
+        # the goal can't be built on; its price mustn't be held against the
+        # next request
+        self.state.gold = 30
+        built = self.state.build_towers([((15, 11), 'laser_tower'),
+                                         ((5, 5), 'laser_tower'),
+                                         ((6, 5), 'laser_tower')])
+        self.assertEqual([bool(tower) for tower in built],
+                         [False, True, False])
+        self.assertEqual(self.state.gold, 10)
+        self.assertEqual(self.state.all_towers, [built[1]])
+        self.assertTrue(self.state.world.is_blocked(5, 5))
+        self.assertFalse(self.state.world.is_blocked(6, 5))
+
+    def test_build_towers_that_cut_the_maze(self):
+        # together they'd wall the spawn in, so the second is turned down
+        # and the third gets its gold
+        self.state.gold = 40
+        built = self.state.build_towers([((1, 0), 'laser_tower'),
+                                         ((0, 1), 'laser_tower'),
+                                         ((5, 5), 'laser_tower')])
+        self.assertEqual([bool(tower) for tower in built],
+                         [True, False, True])
+        self.assertEqual(self.state.gold, 0)
+        self.assertEqual(self.state.all_towers, [built[0], built[2]])
+        self.assertFalse(self.state.world.is_blocked(0, 1))
+
+    def test_resync(self):
+        self.state.update(0.01, [])
+        self.state.resync()
+        update = self.state.update(0.01, [])
+        self.assertIn('path', update)
+        self.assertIn('buildMask', update)
+
+    def test_dead_creeps_retired_once(self):
+        for creep_store in (False, True):
+            levels = Levels.createLevel(0, 0.5, 10, 2, 1, "Weak")
+            self.state = GameplayState(levels, 16, 12, 100, 10000, 1,
+                                       creep_store=creep_store)
+            self.state.update(0.6, [])
+            creeps = list(self.state.all_creeps)
+            self.assertEqual(len(creeps), 2)
+
+            # as if a tower and the endpoint got them during the last tick
+            creeps[0].take_damage(1000, self.state)
+            creeps[1].killPlayer(self.state)
+
+            gone = self.state.update(0.01, [])
+            self.assertEqual(gone['creepDeaths'],
+                             [{'id': 0, 'escaped': False},
+                              {'id': 1, 'escaped': True}])
+            self.assertEqual(gone['creeps'], [])
+            self.assertNotIn('creepDeaths', self.state.update(0.01, []))
+
+    def test_creeps_recycled(self):
+        levels = Levels.createLevel(0, 0.5, 10, 1, 1, "Weak")
+        self.state = GameplayState(levels, 16, 12, 100, 10000, 1)
+        self.state.update(0.01, [])
+        creep = self.state.all_creeps[0]
+        creep.take_damage(1000, self.state)
+        self.state.update(0.01, [])
+
+        # the pool is the game's own, other games make their own creeps
+        self.assertIsNot(Levels().creep_pool.get("Weak", 0), creep)
+        levels.spawnCreep("Strong", self.state.counter)
+        self.state.update(0.01, [])
+        reused = self.state.all_creeps[0]
+        self.assertIs(reused, creep)
+        self.assertEqual(reused.health, 500)
+        self.assertTrue(reused.live)
+        self.assertEqual(reused.modifiers, [])
+
+    def test_pvp_creep_ids_unique(self):
+        self.state.update(5.2, [])  # the level's first creep is out
+        self.state.spawn_creep('Weak')
+        self.state.spawn_creep('Weak')
+        self.state.spawn_creep('Nothing')
+        self.state.update(0.01, [])
+        ids = [c.id for c in self.state.all_creeps]
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_tower_coverage(self):
+        tower = self.state.build_tower((5, 5), 'fire_tower')
+        covered = {loc for loc, towers in self.state.coverage.items()
+                   if tower in towers}
+        self.assertEqual(covered, {(5, 4), (4, 5), (5, 5), (6, 5), (5, 6)})
+
+        self.state.upgrade_tower((5, 5))  # range 1.5, the diagonals too
+        covered = {loc for loc, towers in self.state.coverage.items()
+                   if tower in towers}
+        self.assertEqual(len(covered), 9)
+
+        self.state.delete_tower((5, 5))
+        self.assertEqual(self.state.coverage, {})
+
+    def test_idle_towers_skipped(self):
+        tower = self.state.build_tower((10, 2), 'laser_tower')
+        tower.time_since_last_fire = 0
+        self.state.update(1, [])
+        self.assertEqual(self.state.awake_towers(), [])
+        self.assertEqual(tower.time_since_last_fire, 0)
+
+        # a creep walks into range: the tower catches up on the time it
+        # sat idle
+        self.state.update(4.5, [])
+        creep = self.state.all_creeps[0]
+        creep.loc = (9, 1)
+        self.state.creep_index.move(creep)
+        self.assertEqual(self.state.awake_towers(), [tower])
+        update = self.state.update(0.5, [])
+        self.assertEqual(len(update['attacksMade']), 1)
+        self.assertEqual(tower.time_since_last_fire, 0)
+
+    def test_targeting_policies(self):
+        tower = self.state.build_tower((5, 5), 'laser_tower')
+        self.state.update(5.6, [])  # the first two creeps are out
+        near, far = self.state.all_creeps
+        near.loc, far.loc = (7, 6), (3, 4)
+        near.health, far.health = 60, 90
+        for creep in (near, far):
+            self.state.creep_index.move(creep)
+
+        picks = {}
+        for policy in ['first', 'last', 'strongest', 'weakest']:
+            self.assertTrue(self.state.set_tower_policy((5, 5), policy))
+            picks[policy] = tower.choose_target([near, far], self.state.world)
+        self.assertEqual(picks, {'first': near, 'last': far,
+                                 'strongest': far, 'weakest': near})
+        self.assertFalse(tower.set_policy('random'))
+
+    def test_travel_time_shots(self):
+        tower = self.state.build_tower((8, 6), 'sniper_tower')
+        self.state.update(5.2, [])  # the level's first creep is out
+        creep = self.state.all_creeps[0]
+        creep.loc = (2, 6)
+        self.state.creep_index.move(creep)
+        tower.time_since_last_fire = tower.cooldown
+
+        self.state.update(0.01, [])
+        self.assertEqual(len(self.state.projectiles), 1)
+        self.assertEqual(creep.health, 100)
+        for _ in range(8):
+            self.state.update(0.01, [])
+        self.assertEqual(len(self.state.projectiles), 0)
+        self.assertEqual(creep.health, 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
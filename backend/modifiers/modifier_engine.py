@@ -0,0 +1,81 @@
+"""Keeps track of every modifier on the creeps of one game.
+
+A creep's speed and the damage it takes per tick only change when one of
+its modifiers is added or runs out, so that's the only time they're worked
+out: the creep's base speed times every modifier's speed_factor, and the
+sum of their damage.  Modifiers run out off one heap for the whole game,
+so a tick where nothing runs out costs nothing per creep, apart from
+hurting the creeps that have damage over time on them.
+
+Adding a modifier of a kind the creep already has refreshes the one it has
+instead of stacking another, the same as tile effects."""
+from heapq import heappush, heappop
+from itertools import count
+
+
+class ModifierEngine:
+
+    def __init__(self):
+        self.now = 0  # ticks so far
+        # (tick it runs out after, tie breaker, creep, modifier).  A
+        # refresh pushes a new entry and leaves the old one to be skipped.
+        self.expiry = []
+        self.order = count()
+        # creep -> damage it takes per tick, for creeps that take any
+        self.burning = {}
+
+    def add(self, creep, modifier):
+        current = None
+        for m in creep.modifiers:
+            if m.kind == modifier.kind:
+                current = m
+                current.refresh(modifier)
+                break
+        if current is None:
+            creep.modifiers.append(modifier)
+            current = modifier
+        current.expires = self.now + current.duration
+        heappush(self.expiry,
+                 (current.expires, next(self.order), creep, current))
+        self.recompute(creep)
+
+    def update(self, gameState):
+        """Move on a tick: drop the modifiers that have run out, then hurt
+        every creep that takes damage over time."""
+        self.now += 1
+        expiry = self.expiry
+        while expiry and expiry[0][0] < self.now:
+            expires, _, creep, modifier = heappop(expiry)
+            if modifier.expires != expires:
+                continue  # refreshed since, a later entry covers it
+            # a creep that died since (or was reused) doesn't have it
+            if not creep.live or \
+                    not any(m is modifier for m in creep.modifiers):
+                continue
+            creep.modifiers = [m for m in creep.modifiers
+                               if m is not modifier]
+            self.recompute(creep)
+
+        for creep, damage in list(self.burning.items()):
+            if creep.live:
+                creep.take_damage(damage, gameState)
+            else:
+                del self.burning[creep]
+
+    def recompute(self, creep):
+        speed = creep.base_speed
+        damage = 0
+        for modifier in creep.modifiers:
+            speed *= modifier.speed_factor
+            damage += modifier.damage
+        creep.speed = speed
+        if damage:
+            self.burning[creep] = damage
+        else:
+            self.burning.pop(creep, None)
+
+    def retire(self):
+        """Forget the creeps that aren't live any more.  Has to happen
+        before they're reused or dropped from a CreepStore."""
+        for creep in [c for c in self.burning if not c.live]:
+            del self.burning[creep]
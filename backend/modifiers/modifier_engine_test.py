@@ -0,0 +1,74 @@
+import unittest
+from game_pieces.creep import Creep
+from modifiers.dot_modifier import Dot_modifier
+from modifiers.frozen_modifier import Frozen_modifier
+from modifiers.modifier_engine import ModifierEngine
+from modifiers.stun_modifier import Stun_modifier
+
+
+class Gold:
+    gold = 0
+
+
+class TestModifierEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = ModifierEngine()
+        self.state = Gold()
+        self.creep = Creep.factory('Default', 0)
+
+    def tick(self, times):
+        for _ in range(times):
+            self.engine.update(self.state)
+
+    def test_slow_runs_out(self):
+        self.engine.add(self.creep, Frozen_modifier(duration=3))
+        self.assertAlmostEqual(self.creep.speed, .05 / 20)
+        self.tick(3)
+        self.assertAlmostEqual(self.creep.speed, .05 / 20)
+        self.tick(1)
+        self.assertEqual(self.creep.speed, .05)
+        self.assertEqual(self.creep.modifiers, [])
+        self.assertEqual(self.engine.expiry, [])
+
+    def test_same_kind_refreshes(self):
+        self.engine.add(self.creep, Frozen_modifier(duration=3))
+        self.tick(2)
+        self.engine.add(self.creep, Frozen_modifier(duration=3))
+        self.assertEqual(len(self.creep.modifiers), 1)
+        self.tick(3)
+        self.assertAlmostEqual(self.creep.speed, .05 / 20)
+        self.tick(1)
+        self.assertEqual(self.creep.speed, .05)
+
+    def test_stats_compose(self):
+        self.engine.add(self.creep, Frozen_modifier(duration=5))
+        self.engine.add(self.creep, Stun_modifier(duration=2))
+        self.assertEqual(self.creep.speed, 0)
+        self.tick(3)
+        # the stun ran out, the slow is still on
+        self.assertAlmostEqual(self.creep.speed, .05 / 20)
+
+    def test_damage_over_time(self):
+        self.engine.add(self.creep, Dot_modifier(10, duration=4))
+        self.tick(6)
+        self.assertEqual(self.creep.health, 90)
+        self.assertEqual(self.engine.burning, {})
+
+    def test_dead_creeps_forgotten(self):
+        self.engine.add(self.creep, Dot_modifier(200, duration=4))
+        self.tick(2)
+        self.assertFalse(self.creep.live)
+        self.assertEqual(self.state.gold, 15)
+        self.engine.retire()
+        self.assertEqual(self.engine.burning, {})
+
+        # used again for a new creep, the old modifiers are gone for good
+        self.creep.reset(self.creep.kind, 1)
+        self.tick(4)
+        self.assertEqual(self.creep.health, 100)
+        self.assertEqual(self.creep.modifiers, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,16 @@
 # Parent class for all types of modifiers (ie freeze, stun, burning, poison, cursed, etc)
-# Each modifier holds the original values of the creep variable that it is modify. Upon the conter for the modifier reaching 0,
-# the original value for the creep is restored.
+# Modifiers don't touch creeps themselves. They say what they do to a creep's stats (speed_factor multiplies its
+# base speed, damage is taken every tick) and the ModifierEngine works out the creep's stats from all of its modifiers
+# whenever one is added or runs out. duration is how many ticks the modifier lasts.
 class Modifiers ():
-    def __init__(self, creep):
-        self.creep = creep
-        pass
+    kind = None  # a creep only has one modifier of each kind; another one refreshes it
+    speed_factor = 1
+    damage = 0  # per tick
 
-    def update(self):
-        pass
\ No newline at end of file
+    def __init__(self, duration):
+        self.duration = duration
+        self.expires = None  # the engine tick it runs out after
+
+    # the same kind of modifier was put on the creep again: take on its strength and start its duration over
+    def refresh(self, other):
+        self.duration = other.duration
@@ -1,26 +1,10 @@
 from modifiers.modifiers import Modifiers
-from game_pieces.creep import Creep
 
 
-# Parent class for all types of modifiers (ie freeze, stun, burning, poison, cursed, etc)
-# Each modifier holds the original values of the creep variable that it is modify. Upon the conter for the modifier reaching 0,
-# the original value for the creep is restored.
+# Stops a creep where it is. Stunned again while still stunned, the stun starts over.
 class Stun_modifier (Modifiers):
-    def __init__(self, creep):
-        self.creep = creep
-        self.original_speed = creep.speed
-        creep.speed = 0
-        self.counter = 60
-        pass
-
-    # Counter update for the modifier.
-    def update(self):
-
-        if(self.counter == 0):
-            self.creep.speed = self.original_speed
-            self.creep.modifiers.remove(self)
-        else:
-            self.counter = self.counter-1
-
-
+    kind = 'stun'
+    speed_factor = 0
 
+    def __init__(self, duration=60):
+        Modifiers.__init__(self, duration)
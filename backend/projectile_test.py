@@ -1,25 +1,66 @@
-#Tester for projectile class.  Needs to be moved into backend/ to work
-
 import unittest
-from game_pieces.projectile import Projectile
+from game_pieces.projectile import Projectiles
 from game_pieces.creep import Creep
 from game_pieces.tower import Tower
 
+
+class Gold:
+    gold = 0
+
+
 class ProjectileTest(unittest.TestCase):
 
     def setUp(self):
-        self.creep = Creep.factory("Default", 0)
-        self.projectile = Projectile((20,20), self.creep, 5)
+        self.projectiles = Projectiles(capacity=2)
+        self.state = Gold()
+        self.tower = Tower(0, (0, 0))
+
+    def creep(self, loc):
+        creep = Creep.factory("Default", 0)
+        creep.loc = loc
+        return creep
+
+    def test_flies_then_hits(self):
+        creep = self.creep((3, 4))
+        self.projectiles.launch(self.tower, (0, 0), creep, 1)
+        for _ in range(4):
+            self.assertEqual(self.projectiles.update(self.state), 0)
+        self.assertEqual(self.projectiles.positions(), [(2.4, 3.2)])
+        self.assertEqual(creep.health, 100)
+        self.assertEqual(self.projectiles.update(self.state), 1)
+        self.assertEqual(creep.health, 60)
+        self.assertEqual(len(self.projectiles), 0)
+
+    def test_follows_its_target(self):
+        creep = self.creep((4, 0))
+        self.projectiles.launch(self.tower, (0, 0), creep, 1)
+        self.projectiles.update(self.state)
+        creep.loc = (1, 3)
+        self.projectiles.update(self.state)
+        self.assertEqual(self.projectiles.positions(), [(1, 1)])
+
+    def test_dead_targets_dropped(self):
+        creeps = [self.creep((i, 6)) for i in range(5)]
+        for creep in creeps:
+            self.projectiles.launch(self.tower, (0, 0), creep, 1)
+        creeps[1].live = False
+        creeps[3].live = False
+        self.projectiles.retire()
+        self.assertEqual(self.projectiles.targets,
+                         [creeps[0], creeps[2], creeps[4]])
+        for _ in range(10):
+            self.projectiles.update(self.state)
+        self.assertEqual([c.health for c in creeps], [60, 100, 60, 100, 60])
 
-    def test_update(self):
-        for i in range(0, 7):
-            self.creep.move_to_dest((i, 0))
-            print self.creep
-            self.projectile.update()
-            print self.projectile
-            if self.projectile.has_hit():
-                print "HIT"
+    def test_one_kill_per_creep(self):
+        creep = self.creep((1, 0))
+        creep.health = 50
+        for _ in range(3):
+            self.projectiles.launch(self.tower, (0, 0), creep, 1)
+        self.assertEqual(self.projectiles.update(self.state), 2)
+        self.assertFalse(creep.live)
+        self.assertEqual(self.state.gold, 15)
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -1,18 +1,35 @@
 #!/usr/bin/env python3
 from engine.tower_game import GameRunner
+from engine.game_host import GameHost
+from engine.game_pool import GamePool
+import signal
 import sys
 
 args = sys.argv
 
 print_gametick = True if 'print_gametick' in args else False
 print_on_receive = True if 'print_on_receive' in args else False
+threads = True if 'threads' in args else False
+pool = True if 'pool' in args else False
 
 if '-h' in args or 'help' in args:
     print("currently available options:")
     print("\tprint_gametick: print a message upon each tick of the gameloop.")
     print("\tprint_on_receive: print to terminal every time a message is received from the network to the gameloop.")
+    print("\tthreads: run every game in a thread of its own instead of all of them from one loop.")
+    print("\tpool: run new games in a pool of worker processes, one per core.")
     quit()
 
+# the workers have to be started before this process has any threads
+game_pool = GamePool() if pool else None
 game_runner = GameRunner(print_gametick=print_gametick,
                          print_on_receive=print_on_receive)
-game_runner.run()
+# kill -USR1 <pid> writes where the game loop's time is going to the log
+if threads:
+    signal.signal(signal.SIGUSR1, lambda signum, frame: game_runner.log_profile())
+    game_runner.run()
+else:
+    host = GameHost(pool=game_pool)
+    host.add(game_runner)
+    signal.signal(signal.SIGUSR1, lambda signum, frame: host.log_profile())
+    host.run()
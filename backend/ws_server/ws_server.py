@@ -292,6 +292,10 @@ class GameServerProtocol(WebSocketServerProtocol):
             self.handleStartGame(as_string)
         elif m_type == MSG.creep_request.name:
             self.handleCreepRequest(as_string)
+        elif m_type == MSG.resync_request.name:
+            self.handleResyncRequest(as_string)
+        elif m_type == MSG.profile_request.name:
+            self.handleProfileRequest(as_string)
         else:
             info('warning! server does not handle message with type {}'.format(
                 m_type), INFO_ID)
@@ -385,6 +389,18 @@ class GameServerProtocol(WebSocketServerProtocol):
         lobby = get_players_lobby(self)
         lobby.get_game_client().sendMessage(utf(json_msg), False)
 
+    def handleResyncRequest(self, json_msg):
+        """A client is out of date and wants the game to resend everything."""
+        lobby = get_players_lobby(self)
+        if lobby is not None:
+            lobby.get_game_client().sendMessage(utf(json_msg), False)
+
+    def handleProfileRequest(self, json_msg):
+        """Someone wants the game's tick profile written to its log."""
+        lobby = get_players_lobby(self)
+        if lobby is not None:
+            lobby.get_game_client().sendMessage(utf(json_msg), False)
+
     def broadcast_to_lobby(self, msg, send_self=False):
         """Broadcast a message to rest of the sender's lobby"""
         lobby = get_players_lobby(self)
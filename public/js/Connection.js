@@ -62,6 +62,23 @@ ws.onmessage = function(event) {
             allCreeps[id] = msg['creeps'];
             allEffects[id] = msg['effects'];
 
+            if (msg['buildMask'] && playerGrids[id]) {
+                playerGrids[id].setBuildMask(msg['buildMask']);
+            }
+
+            // the path only comes along when it changes; if the version
+            // moved on and we never got the new one, ask for it again
+            if (playerGrids[id]) {
+                if (msg['path']) {
+                    playerGrids[id].setPath(msg['pathVersion'], msg['path']);
+                } else if (msg['pathVersion'] != playerGrids[id].pathVersion &&
+                           msg['pathVersion'] != playerGrids[id].resyncVersion) {
+                    // only ask once per version, the answer takes a while
+                    playerGrids[id].resyncVersion = msg['pathVersion'];
+                    ws.resyncRequest(userID);
+                }
+            }
+
         }
         if (msg.type == 'tower_update') {
             console.log(msg);
@@ -148,6 +165,14 @@ ws.creepRequest = function(id, msg) {
     }));
 };
 
+ws.resyncRequest = function(id) {
+    ws.send(JSON.stringify({
+        type: "resync_request",
+        player_id: id,
+        msg: {}
+    }));
+};
+
 ws.newLobbyRequest = function(id, msg) {
     // msg format is:
     // {
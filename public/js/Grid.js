@@ -32,6 +32,17 @@ var Grid = function (can, ctx, offset) {
     // Keep track of all towers on grid
     this.towers = [];
 
+    // String of '0'/'1' per cell, row by row, saying where the server will
+    // accept a new tower. Null until the server sends one.
+    this.buildMask = null;
+
+    // Next hop of every cell (row * cols + col of the next cell, -1 for
+    // none) and the server's version number for it. Null until sent.
+    this.path = null;
+    this.pathVersion = null;
+    // The version a resync was last asked for, so it's only asked once.
+    this.resyncVersion = null;
+
     // Mouse move handler
     this.mouseMove = function(x, y) {
         var row = Math.floor((y - this.offset.top) / this.distance);
@@ -54,6 +65,11 @@ var Grid = function (can, ctx, offset) {
         if (tabManager && tabManager.getCurrentTab() == userID) {
            if (towerButtons && towerButtons.wasPressed()) {
                var last = towerButtons.getLastButton();
+               if (last != 'delete_tower' && last != 'upgrade_tower' &&
+                       !this.canBuild(this.focusCell.col, this.focusCell.row)) {
+                   towerDenied('that spot is blocked');
+                   return;
+               }
                var msg = {
                    "towerID": last,
                    "x": this.focusCell.col,
@@ -104,6 +120,22 @@ var Grid = function (can, ctx, offset) {
         }
     };
 
+    this.setBuildMask = function(mask) {
+        this.buildMask = mask;
+    };
+
+    this.setPath = function(version, path) {
+        this.pathVersion = version;
+        this.path = path;
+    };
+
+    this.canBuild = function(col, row) {
+        if (!this.buildMask) {
+            return true;
+        }
+        return this.buildMask.charAt(row * this.cols + col) == '1';
+    };
+
     this.setOffset = function(newOffset) {
         this.offset = newOffset;
     };